@@ -0,0 +1,182 @@
+# src/featurize/batch.py
+from __future__ import annotations
+import csv
+import numpy as np
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from src.featurize.features import FEATURE_NAMES, POS_INDEX, position_label, street_from_board
+from src.featurize.cards_utils import (card_index, HERO_VEC, POPCOUNT13, RUN_LEN,
+                                       board_feats_idx)
+from src.state.compact import CompactState
+
+# ──────────────────────────
+# featurize vectorisé (datasets, replays, logs/decisions*.csv)
+#   - colonnes identiques à featurize() (FEATURE_NAMES)
+#   - one-hot par scatter numpy, features héros par gather dans HERO_VEC,
+#     texture board par masques couleur 13 bits + tables popcount/run
+# Entrées: featurize_arrays(...) (cœur), featurize_batch(states), featurize_decisions(csv...)
+# ──────────────────────────
+D = len(FEATURE_NAMES)
+OFF_POS, OFF_H, OFF_B, OFF_HOH, OFF_BOH = 4, 11, 18, 28, 132
+
+_POP = np.asarray(POPCOUNT13, dtype=np.int16)
+_RUN = np.asarray(RUN_LEN, dtype=np.int16)
+_HIB = np.asarray([m.bit_length() - 1 for m in range(1 << 13)], dtype=np.int16)
+_LOB = np.asarray([(m & -m).bit_length() - 1 for m in range(1 << 13)], dtype=np.int16)
+
+def _hero_block(hv: np.ndarray) -> np.ndarray:
+    """(N,2) cartes héros valides (-1 = absente) → (N,7) colonnes H_*."""
+    out = np.zeros((len(hv), 7), dtype=np.float32)
+    i, j = np.minimum(hv[:, 0], hv[:, 1]), np.maximum(hv[:, 0], hv[:, 1])
+    ok = i >= 0
+    two = ok & (i != j)
+    out[two] = HERO_VEC[j[two] * (j[two] - 1) // 2 + i[two]]
+    same = ok & (i == j)  # même carte lue 2× (OCR)
+    if same.any():
+        r = (i[same] >> 2) + 2
+        out[same] = np.stack([np.ones_like(r), np.ones_like(r), np.ones_like(r), np.zeros_like(r), r, r, r], 1)
+    return out
+
+def _board_block(bv: np.ndarray) -> np.ndarray:
+    """(N,5) cartes board valides (-1 = absente) → (N,10) colonnes B_*."""
+    n = len(bv)
+    out = np.zeros((n, 10), dtype=np.float32)
+    valid = bv >= 0
+    bits = np.where(valid, 1 << np.maximum(bv, 0) // 4, 0).astype(np.int32)
+    suit = bv & 3
+    sm = np.zeros((n, 4), dtype=np.int32)
+    for s in range(4):
+        sm[:, s] = np.bitwise_or.reduce(np.where(valid & (suit == s), bits, 0), axis=1)
+    a, b, c, d = sm[:, 0], sm[:, 1], sm[:, 2], sm[:, 3]
+    ge1 = a | b | c | d
+    ge2 = (a & b) | (a & c) | (a & d) | (b & c) | (b & d) | (c & d)
+    ge3 = (a & b & c) | (a & b & d) | (a & c & d) | (b & c & d)
+    ge4 = a & b & c & d
+    cnt = valid.sum(1)
+    has = cnt > 0
+    n_suits = (sm != 0).sum(1)
+    out[:, 0] = cnt
+    out[:, 1] = _POP[ge2 & ~ge3]
+    out[:, 2] = (ge3 & ~ge4) != 0
+    out[:, 3] = ge4 != 0
+    out[:, 4] = has & (n_suits >= 3)
+    out[:, 5] = n_suits == 2
+    out[:, 6] = n_suits == 1
+    out[:, 7] = _POP[sm].max(1)
+    out[:, 8] = np.where(has, _HIB[ge1] - _LOB[ge1], 0)
+    out[:, 9] = _RUN[ge1]
+    # doublons OCR (même carte 2×) → chemin exact ligne par ligne
+    srt = np.sort(np.where(valid, bv, -1 - np.arange(5)), axis=1)
+    dup = (np.diff(srt, axis=1) == 0).any(1)
+    for r in np.nonzero(dup)[0]:
+        f = board_feats_idx([int(k) for k in bv[r] if k >= 0])
+        out[r] = [f["board_cnt"], f["pairs"], f["trips"], f["quads"], f["is_rainbow"], f["is_two_tone"],
+                  f["is_monotone"], f["max_suit_count"], f["rank_span"], f["consec_run_len"]]
+    return out
+
+def dense_block(hv: np.ndarray, bv: np.ndarray, pot, stack, pos_idx, street=None) -> np.ndarray:
+    """Colonnes denses 0..OFF_HOH-1 (scalaires, position, H_*, B_*) → (N, 28) float32."""
+    n = len(hv)
+    pot, stack = np.asarray(pot, np.float64), np.asarray(stack, np.float64)
+    if street is None:
+        street = np.asarray([0, 1, 1, 1, 2, 3], np.float32)[(bv >= 0).sum(1)]
+    X = np.zeros((n, OFF_HOH), dtype=np.float32)
+    X[:, 0], X[:, 1], X[:, 2] = pot, stack, street
+    X[:, 3] = stack / np.maximum(0.01, pot)
+    X[np.arange(n), OFF_POS + np.asarray(pos_idx, np.int64)] = 1.0
+    X[:, OFF_H:OFF_B] = _hero_block(hv)
+    X[:, OFF_B:OFF_HOH] = _board_block(bv)
+    return X
+
+def onehot_slots(hero_pos: np.ndarray, board_pos: np.ndarray):
+    """[(offset colonne, indices carte (N,))] des 7 blocs one-hot (H1, H2, B1..B5)."""
+    return ([(OFF_HOH, hero_pos[:, 0]), (OFF_HOH + 52, hero_pos[:, 1])]
+            + [(OFF_BOH + 52 * i, board_pos[:, i]) for i in range(5)])
+
+def featurize_arrays(hero_pos: np.ndarray, board_pos: np.ndarray, pot: np.ndarray, stack: np.ndarray,
+                     pos_idx: np.ndarray, street: Optional[np.ndarray] = None,
+                     hero_valid: Optional[np.ndarray] = None, board_valid: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Cœur vectorisé → (N, D) float32.
+      hero_pos (N,2) / board_pos (N,5) : indices 0..51 par slot (-1 = vide/illisible) → blocs one-hot
+      hero_valid / board_valid : cartes valides tassées à gauche (features H_/B_); défaut = *_pos tassés
+      street : défaut = d'après le nb de cartes board
+    """
+    hero_pos, board_pos = np.asarray(hero_pos, np.int16), np.asarray(board_pos, np.int16)
+    n = len(hero_pos)
+    hv = _pack(hero_pos) if hero_valid is None else np.asarray(hero_valid, np.int16)
+    bv = _pack(board_pos) if board_valid is None else np.asarray(board_valid, np.int16)
+
+    X = np.zeros((n, D), dtype=np.float32)
+    X[:, :OFF_HOH] = dense_block(hv, bv, pot, stack, pos_idx, street)
+    rows = np.arange(n)
+    for off, cards in onehot_slots(hero_pos, board_pos):
+        m = cards >= 0
+        X[rows[m], off + cards[m]] = 1.0
+    return X
+
+def _pack(pos: np.ndarray) -> np.ndarray:
+    """Tasse les cartes valides à gauche (ordre conservé), -1 à droite."""
+    key = np.where(pos >= 0, 0, 1) * 8 + np.arange(pos.shape[1])
+    return np.take_along_axis(pos, np.argsort(key, axis=1, kind="stable"), axis=1)
+
+def _pad(rows: List[Sequence[int]], width: int) -> np.ndarray:
+    """Listes d'indices → (N, width) int16, complété par -1 (tronqué à width)."""
+    pad = [-1] * width
+    return np.asarray([(list(r) + pad)[:width] for r in rows], dtype=np.int16).reshape(len(rows), width)
+
+def gather_states(states: Iterable) -> Dict[str, np.ndarray]:
+    """TableState / CompactState → colonnes d'entrée de featurize_arrays (cartes, montants, position, street)."""
+    h_pos, b_pos, h_val, b_val, pot, stack, nb, pos = [], [], [], [], [], [], [], []
+    for r, st in enumerate(states):
+        if isinstance(st, CompactState):
+            h, b = st.hero, st.board
+            h_pos.append(h); b_pos.append(b); h_val.append(h); b_val.append(b)
+            nb.append(len(b))
+        else:
+            h = [card_index(c) for c in st.hero_cards]
+            b = [card_index(c) for c in st.community_cards]
+            bv = [k for k in b if k >= 0]
+            if len(bv) > 5:
+                raise ValueError(f"featurize_batch: board > 5 cartes (ligne {r})")
+            h_pos.append(h); b_pos.append(b); h_val.append([k for k in h if k >= 0]); b_val.append(bv)
+            nb.append(len(b))
+        pot.append(st.pot_size); stack.append(st.hero_stack)
+        pos.append(POS_INDEX.get(position_label(st.seats_n, st.dealer_seat, st.hero_seat), 6))
+    return {
+        "hero_pos": _pad(h_pos, 2), "board_pos": _pad(b_pos, 5),
+        "pot": np.asarray(pot, np.float64), "stack": np.asarray(stack, np.float64),
+        "pos_idx": np.asarray(pos, np.int64),
+        "street": np.asarray([street_from_board(k) for k in nb], np.float32),
+        "hero_valid": _pad(h_val, 2), "board_valid": _pad(b_val, 5),
+    }
+
+def featurize_batch(states: Iterable) -> Tuple[np.ndarray, List[str]]:
+    """TableState / CompactState → (X (N, D) float32, FEATURE_NAMES). Ligne i == featurize(states[i])[0]."""
+    return featurize_arrays(**gather_states(states)), list(FEATURE_NAMES)
+
+def featurize_decisions(paths: Optional[Union[Path, Sequence[Path]]] = None
+                        ) -> Tuple[np.ndarray, List[str], List[str]]:
+    """
+    Journal des décisions → (X, FEATURE_NAMES, actions). Position lue telle quelle (colonne `position`).
+    paths=None → log_files(): archives tournées (decisions-*.csv) puis decisions.csv.
+    """
+    if paths is None:
+        from src.policy.decision_store import log_files
+        paths = log_files()
+    elif isinstance(paths, (str, Path)):
+        paths = [paths]
+    hero, board, pot, stack, pos, actions = [], [], [], [], [], []
+    for path in paths:
+        with Path(path).open(newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                hero.append([card_index(c) for c in (row.get("hero_cards") or "").split()][:2])
+                board.append([card_index(c) for c in (row.get("board_cards") or "").split()][:5])
+                pot.append(float(row.get("pot") or 0.0)); stack.append(float(row.get("stack") or 0.0))
+                pos.append(POS_INDEX.get(row.get("position") or "unknown", 6))
+                actions.append(row.get("action") or "")
+    street = np.asarray([street_from_board(len(b)) for b in board], np.float32)
+    X = featurize_arrays(_pad(hero, 2), _pad(board, 5), np.asarray(pot), np.asarray(stack),
+                         np.asarray(pos, np.int64), street)
+    return X, list(FEATURE_NAMES), actions
@@ -1,4 +1,6 @@
-from typing import List, Tuple, Optional, Dict
+from typing import List, Tuple, Optional, Dict, Sequence
+from functools import lru_cache
+from itertools import permutations
 import numpy as np
 
 RANK_ORDER = "23456789TJQKA"
@@ -14,6 +16,26 @@ def parse_card(card: str) -> Optional[Tuple[int, str]]:
     if r not in RANK_TO_VAL or s not in SUITS: return None
     return RANK_TO_VAL[r], s
 
+# Codage entier des cartes: idx = rank_index*4 + suit_index (0..51), même ordre que onehot_card
+CARD_NONE = -1
+
+def card_index(card: str) -> int:
+    """"Ah" -> 48 ; carte illisible -> CARD_NONE."""
+    pc = parse_card(card)
+    if not pc: return CARD_NONE
+    return (pc[0] - 2) * 4 + SUITS.index(pc[1])
+
+def index_card(idx: int) -> str:
+    """48 -> "Ah"."""
+    return RANK_ORDER[idx >> 2] + SUITS[idx & 3]
+
+def cards_mask(idxs) -> int:
+    """Bitmask 52 bits d'une suite d'indices (CARD_NONE ignoré)."""
+    m = 0
+    for i in idxs:
+        if i >= 0: m |= 1 << i
+    return m
+
 def parse_cards(cards: List[str]) -> List[Tuple[int, str]]:
     out = []
     for c in cards:
@@ -32,14 +54,23 @@ def onehot_card(card: str) -> np.ndarray:
     v[ridx * 4 + sidx] = 1.0
     return v
 
-def hero_hand_feats(hero_cards: List[str]) -> Dict[str, float]:
-    """Retourne des features basiques héros; zeros si <2 cartes."""
-    cards = parse_cards(hero_cards)
+# ──────────────────────────
+# Tables précalculées (import) — features héros/board sans re-parsing
+#   - HERO_FEATS : 1326 combos (i<j) → dict features héros
+#   - masques 13 bits par couleur (bit = rank-2) → paires/brelans via ET/OU + popcount
+#   - RUN_LEN / STRAIGHT_NEED / STRAIGHT_OUTS indexés par masque de rangs (8192)
+# ──────────────────────────
+HERO_KEYS = ("is_pair", "is_suited", "is_connected", "gap", "hi_rank", "lo_rank", "avg_rank")
+N_COMBOS = 1326
+
+def combo_index(i: int, j: int) -> int:
+    """Index 0..1325 d'une paire de cartes distinctes (ordre indifférent)."""
+    if i > j: i, j = j, i
+    return j * (j - 1) // 2 + i
+
+def _hero_from_pair(r1: int, s1, r2: int, s2) -> Dict[str, float]:
     out = dict(is_pair=0.0, is_suited=0.0, is_connected=0.0, gap=0.0,
                hi_rank=0.0, lo_rank=0.0, avg_rank=0.0)
-    if len(cards) < 2:
-        return out
-    (r1, s1), (r2, s2) = cards[0], cards[1]
     hi, lo = max(r1, r2), min(r1, r2)
     out["hi_rank"] = hi; out["lo_rank"] = lo; out["avg_rank"] = (hi + lo) / 2.0
     out["is_pair"] = 1.0 if r1 == r2 else 0.0
@@ -50,9 +81,129 @@ def hero_hand_feats(hero_cards: List[str]) -> Dict[str, float]:
     out["is_connected"] = 1.0 if gap == 0 else 0.0
     return out
 
+def _build_hero_lut():
+    feats = [None] * N_COMBOS
+    for j in range(52):
+        for i in range(j):
+            feats[combo_index(i, j)] = _hero_from_pair((i >> 2) + 2, i & 3, (j >> 2) + 2, j & 3)
+    vec = np.array([[d[k] for k in HERO_KEYS] for d in feats], dtype=np.float32)
+    return feats, vec
+
+HERO_FEATS, HERO_VEC = _build_hero_lut()  # HERO_VEC: (1326, 7) float32, colonnes = HERO_KEYS
+
+def _build_rank_luts():
+    masks = np.arange(1 << 13, dtype=np.int32)
+    popcnt = np.zeros_like(masks)
+    for b in range(13):
+        popcnt += (masks >> b) & 1
+    # plus longue série de bits consécutifs (A=14 seulement haut, comme consec_run_len)
+    run = np.zeros_like(masks); x = masks.copy()
+    while x.any():
+        run += (x != 0)
+        x = x & (x << 1)
+    # quintes: 9 fenêtres 5 rangs + roue A-2-3-4-5
+    windows = [0b11111 << k for k in range(9)] + [(1 << 12) | 0b1111]
+    need = np.min(np.stack([5 - popcnt[masks & w] for w in windows]), axis=0)
+    outs = np.zeros_like(masks)
+    for b in range(13):
+        absent = ((masks >> b) & 1) == 0
+        outs += absent & (need[masks | (1 << b)] == 0) & (need > 0)
+    return popcnt.tolist(), run.tolist(), need.tolist(), outs.tolist()
+
+POPCOUNT13, RUN_LEN, STRAIGHT_NEED, STRAIGHT_OUTS = _build_rank_luts()
+
+def card_indices(cards: List[str]) -> List[int]:
+    out = []
+    for c in cards:
+        i = card_index(c)
+        if i >= 0: out.append(i)
+    return out
+
+def suit_masks(idxs) -> List[int]:
+    """4 masques 13 bits (un par couleur, ordre SUITS)."""
+    sm = [0, 0, 0, 0]
+    for i in idxs:
+        sm[i & 3] |= 1 << (i >> 2)
+    return sm
+
+def hero_hand_feats_idx(idxs: List[int]) -> Dict[str, float]:
+    if len(idxs) < 2:
+        return dict(is_pair=0.0, is_suited=0.0, is_connected=0.0, gap=0.0,
+                    hi_rank=0.0, lo_rank=0.0, avg_rank=0.0)
+    i, j = idxs[0], idxs[1]
+    if i == j:  # même carte lue 2× (OCR)
+        return _hero_from_pair((i >> 2) + 2, 0, (i >> 2) + 2, 0)
+    return dict(HERO_FEATS[combo_index(i, j)])
+
+def hero_hand_feats(hero_cards: List[str]) -> Dict[str, float]:
+    """Retourne des features basiques héros; zeros si <2 cartes."""
+    return hero_hand_feats_idx(card_indices(hero_cards))
+
+def board_feats_idx(idxs: List[int]) -> Dict[str, float]:
+    if len(set(idxs)) != len(idxs):  # doublon OCR → comptage exact par Counter
+        return _board_feats_counter([((i >> 2) + 2, SUITS[i & 3]) for i in idxs])
+    out = {
+        "board_cnt": float(len(idxs)),
+        "pairs": 0.0, "trips": 0.0, "quads": 0.0,
+        "is_rainbow": 0.0, "is_two_tone": 0.0, "is_monotone": 0.0,
+        "max_suit_count": 0.0,
+        "rank_span": 0.0,
+        "consec_run_len": 0.0,
+    }
+    if not idxs:
+        return out
+    a, b, c, d = suit_masks(idxs)
+    ge1 = a | b | c | d
+    ge2 = (a & b) | (a & c) | (a & d) | (b & c) | (b & d) | (c & d)
+    ge3 = (a & b & c) | (a & b & d) | (a & c & d) | (b & c & d)
+    ge4 = a & b & c & d
+    out["pairs"] = float(POPCOUNT13[ge2 & ~ge3])
+    out["trips"] = 1.0 if ge3 & ~ge4 else 0.0
+    out["quads"] = 1.0 if ge4 else 0.0
+
+    n_suits = (a != 0) + (b != 0) + (c != 0) + (d != 0)
+    out["max_suit_count"] = float(max(POPCOUNT13[a], POPCOUNT13[b], POPCOUNT13[c], POPCOUNT13[d]))
+    if n_suits == 1: out["is_monotone"] = 1.0
+    elif n_suits == 2: out["is_two_tone"] = 1.0
+    else: out["is_rainbow"] = 1.0
+
+    out["rank_span"] = float(ge1.bit_length() - (ge1 & -ge1).bit_length())
+    out["consec_run_len"] = float(RUN_LEN[ge1])
+    return out
+
 def board_feats(board_cards: List[str]) -> Dict[str, float]:
     """Texture board : paires, bicolore/monochrome, straight/flush draws (approx)."""
-    cards = parse_cards(board_cards)
+    return board_feats_idx(card_indices(board_cards))
+
+def draw_feats_idx(hero: List[int], board: List[int]) -> Dict[str, float]:
+    """
+    Tirages du héros (cartes héros + board), mêmes masques que board_feats:
+      made_*  : quinte/couleur faite ; flush_draw : 4 à la couleur avec ≥1 carte héros
+      oesd / gutshot : 2 / 1 rang(s) complètent la quinte (pas de tirage au river)
+    """
+    out = dict(made_straight=0.0, made_flush=0.0, flush_draw=0.0, oesd=0.0, gutshot=0.0)
+    if len(hero) < 2 or len(board) < 3:
+        return out
+    hm, bm = suit_masks(hero), suit_masks(board)
+    am = [hm[k] | bm[k] for k in range(4)]
+    ranks = am[0] | am[1] | am[2] | am[3]
+    live = len(board) < 5
+    for k in range(4):
+        n = POPCOUNT13[am[k]]
+        if n >= 5: out["made_flush"] = 1.0
+        elif n == 4 and hm[k] and live: out["flush_draw"] = 1.0
+    if STRAIGHT_NEED[ranks] == 0:
+        out["made_straight"] = 1.0
+    elif live:
+        outs = STRAIGHT_OUTS[ranks]
+        if outs >= 2: out["oesd"] = 1.0
+        elif outs == 1: out["gutshot"] = 1.0
+    return out
+
+def draw_feats(hero_cards: List[str], board_cards: List[str]) -> Dict[str, float]:
+    return draw_feats_idx(card_indices(hero_cards)[:2], card_indices(board_cards))
+
+def _board_feats_counter(cards: List[Tuple[int, str]]) -> Dict[str, float]:
     ranks = [r for r, _ in cards]
     suits = [s for _, s in cards]
 
@@ -94,3 +245,59 @@ def board_feats(board_cards: List[str]) -> Dict[str, float]:
         else: run = 1
     out["consec_run_len"] = float(best)
     return out
+
+# ──────────────────────────
+# Isomorphisme de couleurs (clés de cache)
+#   "AhKh / Qh7d2c" ≡ "AsKs / Qs7c2d" : on renomme les couleurs dans un ordre canonique
+#   - couleurs triées par (nb cartes board, masque rangs board / flop, turn/river de la couleur,
+#     nb cartes héros, masque héros) décroissant → couleurs canoniques 0,1,2,3 ; couleurs à signature égale = interchangeables
+#   - héros trié, flop trié, turn/river gardés à leur place
+#   - perm[s_orig] = s_canon ; invert_suit_perm() pour revenir aux couleurs lues
+# ──────────────────────────
+SUIT_PERMS: List[Tuple[int, int, int, int]] = list(permutations(range(4)))  # 24
+
+def permute_suits(idxs: Sequence[int], perm: Sequence[int]) -> Tuple[int, ...]:
+    """Applique perm (couleur → couleur) à des indices carte (CARD_NONE conservé)."""
+    return tuple((i & ~3) | perm[i & 3] if i >= 0 else i for i in idxs)
+
+def invert_suit_perm(perm: Sequence[int]) -> Tuple[int, int, int, int]:
+    inv = [0] * 4
+    for s, c in enumerate(perm):
+        inv[c] = s
+    return tuple(inv)
+
+@lru_cache(maxsize=8192)
+def _canonical(hero: Tuple[int, ...], board: Tuple[int, ...], ordered: bool):
+    bm, fm, hm = [0] * 4, [0] * 4, [0] * 4
+    for k, i in enumerate(board):
+        bm[i & 3] |= 1 << (i >> 2)
+        if k < 3 or not ordered:
+            fm[i & 3] |= 1 << (i >> 2)
+    for i in hero:
+        hm[i & 3] |= 1 << (i >> 2)
+    # turn/river positionnels: départagent les couleurs à masques égaux
+    late = [i & 3 for i in board[3:]] if ordered else []
+    order = sorted(range(4), key=lambda s: (POPCOUNT13[bm[s]], bm[s], fm[s], [c == s for c in late],
+                                            POPCOUNT13[hm[s]], hm[s]), reverse=True)
+    perm = [0] * 4
+    for c, s in enumerate(order):
+        perm[s] = c
+    perm = tuple(perm)
+    h = tuple(sorted(permute_suits(hero, perm), reverse=True))
+    b = permute_suits(board, perm)
+    b = tuple(sorted(b[:3], reverse=True)) + b[3:] if ordered else tuple(sorted(b, reverse=True))
+    return h, b, perm
+
+def canonicalize(hero: Sequence[int], board: Sequence[int] = (), ordered: bool = True
+                 ) -> Tuple[Tuple[int, ...], Tuple[int, ...], Tuple[int, int, int, int]]:
+    """
+    (héros, board) en indices 0..51 → (héros canonique, board canonique, perm).
+    ordered=False: board vu comme un ensemble (équité, cartes mortes) → board entièrement trié.
+    Cartes illisibles (CARD_NONE) ignorées. Retour aux couleurs lues: permute_suits(x, invert_suit_perm(perm)).
+    """
+    return _canonical(tuple(i for i in hero if i >= 0), tuple(i for i in board if i >= 0), bool(ordered))
+
+def canonical_cards(hero_cards: List[str], board_cards: List[str]) -> Tuple[List[str], List[str]]:
+    """Version texte ("Ah") de canonicalize, pour les signatures/clés lisibles."""
+    h, b, _ = canonicalize([card_index(c) for c in hero_cards], [card_index(c) for c in board_cards])
+    return [index_card(i) for i in h], [index_card(i) for i in b]
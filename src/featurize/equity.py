@@ -0,0 +1,231 @@
+# src/featurize/equity.py
+from __future__ import annotations
+import os, threading, time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from collections import OrderedDict
+from src.featurize.cards_utils import card_index, canonicalize
+from src.featurize.evaluator import evaluate_batch
+
+# ──────────────────────────
+# Équité héros vs N adversaires (mains aléatoires)
+#   - exact (énumération) si le nb d'évaluations tient sous POKERIA_EQ_EXACT_MAX
+#     (turn/river en heads-up); sinon Monte Carlo vectorisé
+#   - MC par lots: tirage sans remise (Fisher-Yates partiel vectorisé), arrêt quand
+#     l'IC 95 % < POKERIA_EQ_TOL, ou budget POKERIA_EQ_BUDGET_MS atteint
+#   - POKERIA_EQ_PROCS=N : lots MC répartis sur N processus (runs hors ligne)
+# Équité = part du pot: 1 si gagne, 1/k si k joueurs à égalité (héros inclus).
+# ──────────────────────────
+EXACT_MAX  = int(os.getenv("POKERIA_EQ_EXACT_MAX", "60000"))
+TOL        = float(os.getenv("POKERIA_EQ_TOL", "0.01"))
+BUDGET_MS  = float(os.getenv("POKERIA_EQ_BUDGET_MS", "20"))
+BATCH      = int(os.getenv("POKERIA_EQ_BATCH", "2000"))
+MAX_SAMPLES = int(os.getenv("POKERIA_EQ_MAX_SAMPLES", "200000"))
+
+@dataclass
+class EquityResult:
+    equity: float
+    win: float
+    tie: float
+    stderr: float
+    samples: int
+    exact: bool
+    ms: float
+
+    def as_dict(self) -> Dict[str, float]:
+        return asdict(self)
+
+def _idx(cards: Sequence) -> List[int]:
+    out = []
+    for c in cards:
+        i = card_index(c) if isinstance(c, str) else int(c)
+        if i >= 0:
+            out.append(i)
+    return out
+
+def _shares(vals: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """vals (N, 1+k) — col 0 = héros → (part du pot, victoire seule, égalité)."""
+    best = vals.max(axis=1)
+    hero_best = vals[:, 0] == best
+    n_best = (vals == best[:, None]).sum(axis=1)
+    share = np.where(hero_best, 1.0 / n_best, 0.0)
+    return share, hero_best & (n_best == 1), hero_best & (n_best > 1)
+
+def _showdown(hero: List[int], board_fixed: List[int], runout: np.ndarray, opp: np.ndarray, n_opp: int):
+    """runout (N, 5-len(board)), opp (N, 2*n_opp) → valeurs (N, 1+n_opp)."""
+    n = len(runout) if runout.size else len(opp)
+    board = np.empty((n, 5), dtype=np.int8)
+    nb = len(board_fixed)
+    if nb:
+        board[:, :nb] = board_fixed
+    if nb < 5:
+        board[:, nb:] = runout
+    hands = np.empty((n, 1 + n_opp, 7), dtype=np.int8)
+    hands[:, :, 2:] = board[:, None, :]
+    hands[:, 0, :2] = hero
+    hands[:, 1:, :2] = opp.reshape(n, n_opp, 2)
+    return evaluate_batch(hands.reshape(-1, 7)).reshape(n, 1 + n_opp)
+
+# ---------- exact ----------
+def _exact_count(n_left: int, n_board: int, n_opp: int) -> int:
+    from math import comb
+    need_b = 5 - n_board
+    total = comb(n_left, need_b)
+    left = n_left - need_b
+    for _ in range(n_opp):
+        total *= comb(left, 2); left -= 2
+    return total
+
+def _exact(hero: List[int], board: List[int], deck: np.ndarray) -> EquityResult:
+    """Heads-up, turn ou river: toutes les (river,) × mains adverses."""
+    t0 = time.perf_counter()
+    i, j = np.triu_indices(len(deck), k=1)
+    pairs = np.stack([deck[i], deck[j]], axis=1)
+    if len(board) == 5:
+        runout = np.empty((len(pairs), 0), dtype=np.int8)
+        opp = pairs
+    else:  # turn: chaque river × paires sans la river
+        rivers = np.repeat(deck, len(pairs))
+        opp = np.tile(pairs, (len(deck), 1))
+        keep = (opp[:, 0] != rivers) & (opp[:, 1] != rivers)
+        runout, opp = rivers[keep, None], opp[keep]
+    vals = _showdown(hero, board, runout.astype(np.int8), opp.astype(np.int8), 1)
+    share, win, tie = _shares(vals)
+    return EquityResult(float(share.mean()), float(win.mean()), float(tie.mean()), 0.0,
+                        len(share), True, (time.perf_counter() - t0) * 1000.0)
+
+# ---------- Monte Carlo ----------
+def _sample(deck: np.ndarray, n: int, m: int, rng: np.random.Generator) -> np.ndarray:
+    """n tirages de m cartes sans remise dans deck → (n, m) (Fisher-Yates partiel vectorisé)."""
+    R = len(deck)
+    d = np.tile(deck.astype(np.int8), (n, 1))
+    rows = np.arange(n)
+    for k in range(m):
+        j = k + (rng.random(n) * (R - k)).astype(np.intp)
+        tmp = d[rows, j].copy()
+        d[rows, j] = d[:, k]
+        d[:, k] = tmp
+    return d[:, :m]
+
+def _mc_batch(hero: List[int], board: List[int], deck: np.ndarray, n_opp: int, n: int,
+              rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    need_b = 5 - len(board)
+    draw = _sample(deck, n, need_b + 2 * n_opp, rng)
+    return _shares(_showdown(hero, board, draw[:, :need_b], draw[:, need_b:], n_opp))
+
+def _mc_chunk(hero: List[int], board: List[int], n_opp: int, n: int, seed: int) -> Tuple[float, float, float, float, int]:
+    """Worker process: sommes (part, part², victoires, égalités, n)."""
+    deck = _deck(hero, board)
+    share, win, tie = _mc_batch(hero, board, deck, n_opp, n, np.random.default_rng(seed))
+    return float(share.sum()), float((share * share).sum()), float(win.sum()), float(tie.sum()), n
+
+def _deck(hero: Sequence[int], board: Sequence[int], dead: Sequence[int] = ()) -> np.ndarray:
+    used = set(hero) | set(board) | set(dead)
+    return np.asarray([c for c in range(52) if c not in used], dtype=np.int8)
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+def _get_pool(procs: int) -> ProcessPoolExecutor:
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                import multiprocessing as mp
+                _POOL = ProcessPoolExecutor(max_workers=procs, mp_context=mp.get_context("spawn"))
+    return _POOL
+
+def equity(hero: Sequence, board: Sequence = (), n_opponents: int = 1,
+           tol: float = TOL, budget_ms: Optional[float] = BUDGET_MS, max_samples: int = MAX_SAMPLES,
+           procs: Optional[int] = None, seed: Optional[int] = None) -> Optional[EquityResult]:
+    """
+    Équité du héros (2 cartes, "Ah"/indices) sur `board` (0, 3, 4 ou 5 cartes) contre
+    `n_opponents` mains aléatoires. None si héros incomplet.
+    budget_ms=None → pas de limite de temps (tol/max_samples seulement).
+    """
+    h, b = _idx(hero)[:2], _idx(board)[:5]
+    if len(h) < 2 or len(set(h + b)) != len(h) + len(b):
+        return None
+    n_opp = max(1, min(9, int(n_opponents)))
+    deck = _deck(h, b)
+    if _exact_count(len(deck), len(b), n_opp) <= EXACT_MAX and n_opp == 1 and len(b) >= 4:
+        return _exact(h, b, deck)
+
+    procs = int(os.getenv("POKERIA_EQ_PROCS", "0")) if procs is None else int(procs)
+    rng = np.random.default_rng(seed)
+    if procs > 1:
+        pool = _get_pool(procs)
+        def step():
+            seeds = rng.integers(0, 2**63 - 1, size=procs).tolist()
+            parts = list(pool.map(_mc_chunk, [h] * procs, [b] * procs, [n_opp] * procs,
+                                  [BATCH * 4] * procs, seeds))
+            return tuple(sum(p[k] for p in parts) for k in range(5))
+    else:
+        def step():
+            share, win, tie = _mc_batch(h, b, deck, n_opp, BATCH, rng)
+            return share.sum(), (share * share).sum(), win.sum(), tie.sum(), len(share)
+    return _mc_loop(step, tol, budget_ms, max_samples)
+
+def _mc_loop(step, tol: float, budget_ms: Optional[float], max_samples: int) -> Optional[EquityResult]:
+    """Accumule les lots de step() → (Σpart, Σpart², Σvictoires, Σégalités, n) jusqu'à IC/budget/max."""
+    t0 = time.perf_counter()
+    s = s2 = w = t = 0.0
+    n, steps, se = 0, 0, 0.0
+    while n < max_samples:
+        ds, ds2, dw, dt, dn = step()
+        s += ds; s2 += ds2; w += dw; t += dt; n += dn
+        steps += 1
+        if n:
+            mean = s / n
+            se = float(np.sqrt(max(0.0, s2 / n - mean * mean) / n))
+            if 1.96 * se < tol:
+                break
+        elif steps >= 50:  # que des tirages rejetés (ranges en collision)
+            break
+        if budget_ms is not None and (time.perf_counter() - t0) * 1000.0 >= budget_ms:
+            break
+    if n == 0:
+        return None
+    return EquityResult(float(s / n), float(w / n), float(t / n), se, n, False,
+                        (time.perf_counter() - t0) * 1000.0)
+
+# ──────────────────────────
+# Intégration featurize (dbg seulement: le vecteur FEATURE_NAMES ne change pas)
+#   POKERIA_EQUITY=1         (0 = désactivé)
+#   POKERIA_EQ_OPPONENTS=1   (si le nb de joueurs ne se déduit pas des stacks lus)
+#   POKERIA_EQ_CACHE=4096    (entrées LRU, clé = couleurs canonisées)
+# ──────────────────────────
+CACHE_SIZE = int(os.getenv("POKERIA_EQ_CACHE", "4096"))
+_CACHE: "OrderedDict[tuple, EquityResult]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+def cached_equity(hero: Sequence[int], board: Sequence[int], n_opponents: int = 1) -> Optional[EquityResult]:
+    """equity() mémoïsé (LRU POKERIA_EQ_CACHE) sur la clé canonique des couleurs (jusqu'à 24× moins de clés)."""
+    h, b, _ = canonicalize(hero, board, ordered=False)
+    key = (h, b, int(n_opponents))
+    with _CACHE_LOCK:
+        hit = _CACHE.get(key)
+        if hit is not None:
+            _CACHE.move_to_end(key)
+            return hit
+    res = equity(h, b, n_opponents)
+    if res is not None and CACHE_SIZE > 0:
+        with _CACHE_LOCK:
+            _CACHE[key] = res
+            while len(_CACHE) > CACHE_SIZE:
+                _CACHE.popitem(last=False)
+    return res
+
+def equity_enabled() -> bool:
+    return os.getenv("POKERIA_EQUITY", "1") == "1"
+
+def opponents_from_state(state) -> int:
+    """Adversaires = sièges avec un stack lu (hors héros), sinon POKERIA_EQ_OPPONENTS."""
+    stacks = getattr(state, "stacks", None) or {}
+    hero = getattr(state, "hero_seat", None)
+    hero = 0 if hero is None else hero  # même convention que position_label
+    n = sum(1 for s, v in stacks.items() if s != hero and v and v > 0)
+    return n if n >= 1 else int(os.getenv("POKERIA_EQ_OPPONENTS", "1"))
@@ -0,0 +1,217 @@
+# src/featurize/evaluator.py
+from __future__ import annotations
+import os, threading
+import numpy as np
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.featurize.cards_utils import card_index
+
+# ──────────────────────────
+# Évaluateur 5/6/7 cartes par tables
+#   valeur = 0..7461 (plus haut = meilleur), 7461 = quinte flush royale
+#   - clé carte int64 = 5^rang (rangs 2..8, bits 0..16) | 5^(rang-7) (rangs 9..A, bits 17..31)
+#                       | 1 << (32 + 4*couleur)
+#     → somme des 7 clés = multiset de rangs (base 5) + compteurs de couleurs
+#   - hors couleur : NF_TABLE[LO_ID[lo] + HI_ID[hi]]  (table 2D aplatie)
+#   - couleur      : FLUSH_TABLE[masque 13 bits de la couleur] (≥5 cartes d'une couleur
+#                    exclut carré/full à ≤7 cartes)
+#   - cartes en indices 0..51 (rank_index*4 + suit_index), -1 = slot vide
+# Tables construites une fois puis mises en cache disque (POKERIA_EVAL_CACHE).
+# ──────────────────────────
+CACHE_PATH = Path(os.getenv("POKERIA_EVAL_CACHE", "assets/cache/eval_tables_v1.npz"))
+
+CATEGORY_NAMES = ["high_card", "pair", "two_pair", "trips", "straight",
+                  "flush", "full_house", "quads", "straight_flush"]
+HC, PAIR, TWO_PAIR, TRIPS, STRAIGHT, FLUSH, FULL_HOUSE, QUADS, STRAIGHT_FLUSH = range(9)
+
+_LO_BITS, _HI_SHIFT, _SUIT_SHIFT = 17, 17, 32
+_LO_MASK, _HI_MASK = (1 << 17) - 1, (1 << 15) - 1
+
+# ---------- classes de mains 5 cartes (ordre total) ----------
+def _straight_high(mask: int) -> int:
+    """Rang haut (index 0..12) de la meilleure quinte dans un masque 13 bits, -1 sinon."""
+    for hi in range(12, 3, -1):
+        w = 0b11111 << (hi - 4)
+        if mask & w == w:
+            return hi
+    if mask & 0b1000000001111 == 0b1000000001111:  # roue A-2-3-4-5
+        return 3
+    return -1
+
+def _top(mask: int, n: int, exclude: Sequence[int] = ()) -> Tuple[int, ...]:
+    out = []
+    for r in range(12, -1, -1):
+        if mask >> r & 1 and r not in exclude:
+            out.append(r)
+            if len(out) == n:
+                break
+    return tuple(out)
+
+def _class_key_counts(counts: Sequence[int]) -> Tuple[int, Tuple[int, ...]]:
+    """Meilleure main 5 cartes (hors couleur) d'un multiset de rangs (≥5 cartes)."""
+    mask = sum(1 << r for r in range(13) if counts[r])
+    quads = [r for r in range(12, -1, -1) if counts[r] == 4]
+    trips = [r for r in range(12, -1, -1) if counts[r] == 3]
+    pairs = [r for r in range(12, -1, -1) if counts[r] == 2]
+    if quads:
+        q = quads[0]
+        return QUADS, (q,) + _top(mask, 1, (q,))
+    if trips and (len(trips) >= 2 or pairs):
+        t = trips[0]
+        p = max(trips[1] if len(trips) > 1 else -1, pairs[0] if pairs else -1)
+        return FULL_HOUSE, (t, p)
+    sh = _straight_high(mask)
+    if sh >= 0:
+        return STRAIGHT, (sh,)
+    if trips:
+        t = trips[0]
+        return TRIPS, (t,) + _top(mask, 2, (t,))
+    if len(pairs) >= 2:
+        p1, p2 = pairs[0], pairs[1]
+        return TWO_PAIR, (p1, p2) + _top(mask, 1, (p1, p2))
+    if pairs:
+        p = pairs[0]
+        return PAIR, (p,) + _top(mask, 3, (p,))
+    return HC, _top(mask, 5)
+
+def _class_key_flush(mask: int) -> Tuple[int, Tuple[int, ...]]:
+    sh = _straight_high(mask)
+    if sh >= 0:
+        return STRAIGHT_FLUSH, (sh,)
+    return FLUSH, _top(mask, 5)
+
+def _all_classes() -> Dict[Tuple[int, Tuple[int, ...]], int]:
+    keys = set()
+    for combo in combinations(range(13), 5):
+        m = sum(1 << r for r in combo)
+        keys.add(_class_key_flush(m))
+    def rec(r: int, left: int, counts: List[int]):
+        if r == 13:
+            if left == 0:
+                keys.add(_class_key_counts(counts))
+            return
+        for c in range(min(4, left) + 1):
+            counts[r] = c
+            rec(r + 1, left - c, counts)
+        counts[r] = 0
+    rec(0, 5, [0] * 13)
+    return {k: i for i, k in enumerate(sorted(keys))}
+
+# ---------- construction des tables ----------
+def _multisets(ranks: Sequence[int], max_total: int) -> List[Tuple[int, ...]]:
+    out: List[Tuple[int, ...]] = []
+    def rec(i: int, left: int, acc: List[int]):
+        if i == len(ranks):
+            out.append(tuple(acc)); return
+        for c in range(min(4, left) + 1):
+            acc.append(c); rec(i + 1, left - c, acc); acc.pop()
+    rec(0, max_total, [])
+    return out
+
+def build_tables() -> Dict[str, np.ndarray]:
+    cls = _all_classes()
+    assert len(cls) == 7462, len(cls)
+
+    flush = np.zeros(1 << 13, dtype=np.int16)
+    for m in range(1 << 13):
+        if bin(m).count("1") >= 5:
+            flush[m] = cls[_class_key_flush(m)]
+
+    lo_sets = _multisets(range(7), 7)       # rangs 2..8
+    hi_sets = _multisets(range(6), 7)       # rangs 9..A
+    n_hi = len(hi_sets)
+    lo_id = np.zeros(_LO_MASK + 1, dtype=np.int32)
+    hi_id = np.zeros(_HI_MASK + 1, dtype=np.int32)
+    for i, c in enumerate(lo_sets):
+        lo_id[sum(x * 5 ** k for k, x in enumerate(c))] = i * n_hi
+    for j, c in enumerate(hi_sets):
+        hi_id[sum(x * 5 ** k for k, x in enumerate(c))] = j
+    nf = np.zeros(len(lo_sets) * n_hi, dtype=np.int16)
+    for i, lc in enumerate(lo_sets):
+        sl = sum(lc)
+        for j, hc in enumerate(hi_sets):
+            if 5 <= sl + sum(hc) <= 7:
+                nf[i * n_hi + j] = cls[_class_key_counts(lc + hc)]
+
+    flush_suit = np.full(1 << 16, -1, dtype=np.int8)
+    for sk in range(1 << 16):
+        for s in range(4):
+            if (sk >> (4 * s)) & 0xF >= 5:
+                flush_suit[sk] = s
+    return {"flush": flush, "lo_id": lo_id, "hi_id": hi_id, "nf": nf, "flush_suit": flush_suit}
+
+def _card_keys() -> np.ndarray:
+    """Clé int64 par carte 0..51; entrée 52 = 0 → l'indice -1 (slot vide) tombe dessus."""
+    keys = np.zeros(53, dtype=np.int64)
+    for c in range(52):
+        r, s = c >> 2, c & 3
+        rk = 5 ** r if r < 7 else (5 ** (r - 7)) << _HI_SHIFT
+        keys[c] = rk | (1 << (_SUIT_SHIFT + 4 * s))
+    return keys
+
+# ---------- chargement (cache disque) ----------
+_T: Optional[Dict[str, np.ndarray]] = None
+_T_LOCK = threading.Lock()
+CARD_KEYS = _card_keys()
+RANK_BIT = np.concatenate([1 << (np.arange(52) >> 2), [0]]).astype(np.int32)   # idx → bit rang (-1 → 0)
+CARD_SUIT = np.concatenate([np.arange(52) & 3, [-1]]).astype(np.int8)           # idx → couleur (-1 → -1)
+
+def get_tables() -> Dict[str, np.ndarray]:
+    global _T
+    if _T is None:
+        with _T_LOCK:
+            if _T is None:
+                t = None
+                if CACHE_PATH.exists():
+                    try:
+                        with np.load(CACHE_PATH) as z:
+                            t = {k: z[k] for k in z.files}
+                    except Exception:
+                        t = None
+                if t is None:
+                    t = build_tables()
+                    try:
+                        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+                        np.savez_compressed(CACHE_PATH, **t)
+                    except Exception as e:
+                        print("Evaluator cache not written:", e)
+                _T = t
+    return _T
+
+# ──────────────────────────
+# API
+# ──────────────────────────
+def evaluate_batch(cards: np.ndarray) -> np.ndarray:
+    """(N, k≤7) indices cartes (-1 = vide, ≥5 cartes réelles par ligne) → (N,) int16 valeurs 0..7461."""
+    t = get_tables()
+    c = np.asarray(cards)
+    cols = np.ascontiguousarray(c.T)  # colonnes contiguës: gathers séquentiels
+    key = np.take(CARD_KEYS, cols[0])
+    for k in range(1, len(cols)):
+        key += np.take(CARD_KEYS, cols[k])
+    out = np.take(t["nf"], np.take(t["lo_id"], key & _LO_MASK) + np.take(t["hi_id"], (key >> _HI_SHIFT) & _HI_MASK))
+    fs = np.take(t["flush_suit"], (key >> _SUIT_SHIFT) & 0xFFFF)
+    fl = np.nonzero(fs >= 0)[0]
+    if len(fl):
+        sub = c[fl]
+        bits = np.where(CARD_SUIT[sub] == fs[fl, None], RANK_BIT[sub], 0)
+        out[fl] = t["flush"][np.bitwise_or.reduce(bits, axis=1)]
+    return out
+
+def evaluate(cards: Sequence) -> int:
+    """5 à 7 cartes ("Ah" ou indices 0..51) → valeur 0..7461."""
+    idx = [card_index(x) if isinstance(x, str) else int(x) for x in cards]
+    return int(evaluate_batch(np.asarray([idx], dtype=np.int16))[0])
+
+# bornes basses de chaque catégorie (pour hand_category)
+def _category_starts() -> np.ndarray:
+    counts = [1277, 2860, 858, 858, 10, 1277, 156, 156, 10]
+    return np.cumsum([0] + counts[:-1])
+
+CATEGORY_START = _category_starts()
+
+def hand_category(value) -> np.ndarray:
+    """Valeur(s) → catégorie 0..8 (cf. CATEGORY_NAMES)."""
+    return np.searchsorted(CATEGORY_START, np.asarray(value), side="right") - 1
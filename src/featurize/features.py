@@ -1,7 +1,23 @@
 from typing import Dict, List, Tuple, Optional
 import numpy as np
 from src.state.models import TableState
-from src.featurize.cards_utils import onehot_card, hero_hand_feats, board_feats, SUITS
+from src.state.compact import as_table_state
+from src.featurize.cards_utils import card_index, hero_hand_feats_idx, board_feats_idx, SUITS
+from src.featurize.equity import cached_equity, equity_enabled, opponents_from_state
+from src.featurize.preflop import preflop_equity
+
+POS_NAMES = ["POS_BTN","POS_SB","POS_BB","POS_UTG","POS_MP","POS_CO","POS_UNKNOWN"]
+POS_INDEX = {"BTN":0,"SB":1,"BB":2,"UTG":3,"MP":4,"CO":5,"unknown":6}
+
+FEATURE_NAMES: List[str] = (
+    ["pot_size","hero_stack","street","spr"]
+    + POS_NAMES
+    + ["H_is_pair","H_is_suited","H_is_connected","H_gap","H_hi_rank","H_lo_rank","H_avg_rank"]
+    + ["B_cnt","B_pairs","B_trips","B_quads","B_rainbow","B_two_tone","B_monotone",
+       "B_max_suit","B_rank_span","B_consec_run"]
+    + [f"H1_{i}" for i in range(52)] + [f"H2_{i}" for i in range(52)]
+    + [f"B{i+1}_{j}" for i in range(5) for j in range(52)]
+)
 
 def street_from_board(n: int) -> int:
     # 0: preflop, 1: flop (3), 2: turn (4), 3: river (5)
@@ -36,28 +52,32 @@ def spr(hero_stack: float, pot_size: float) -> float:
 def featurize(state: TableState) -> Tuple[np.ndarray, List[str], Dict[str, float]]:
     """
     Retourne (vecteur numpy, noms, dict) — dict lisible pour debug.
+    Accepte aussi un CompactState.
     """
+    state = as_table_state(state)
     # --- scalaires
     street = street_from_board(len(state.community_cards))
     pos = position_label(state.seats_n, state.dealer_seat, state.hero_seat)
-    pos_onehot_names = ["POS_BTN","POS_SB","POS_BB","POS_UTG","POS_MP","POS_CO","POS_UNKNOWN"]
-    pos_map = {"BTN":0,"SB":1,"BB":2,"UTG":3,"MP":4,"CO":5,"unknown":6}
-    pos_oh = np.zeros(len(pos_onehot_names), dtype=np.float32)
-    pos_oh[pos_map.get(pos,6)] = 1.0
+    pos_oh = np.zeros(len(POS_NAMES), dtype=np.float32)
+    pos_oh[POS_INDEX.get(pos,6)] = 1.0
 
     spr_val = spr(state.hero_stack, state.pot_size)
 
+    # --- cartes parsées une seule fois (indices 0..51, -1 = illisible)
+    h_idx = [card_index(c) for c in state.hero_cards]
+    b_idx = [card_index(c) for c in state.community_cards]
+
     # --- héro
     hero_oh = np.zeros(104, dtype=np.float32)  # 2 cartes * 52
-    if len(state.hero_cards) >= 1: hero_oh[0:52]   = onehot_card(state.hero_cards[0])
-    if len(state.hero_cards) >= 2: hero_oh[52:104] = onehot_card(state.hero_cards[1])
-    hfeat = hero_hand_feats(state.hero_cards)
+    for i, k in enumerate(h_idx[:2]):
+        if k >= 0: hero_oh[i*52 + k] = 1.0
+    hfeat = hero_hand_feats_idx([k for k in h_idx if k >= 0])
 
     # --- board
-    bfeat = board_feats(state.community_cards)
+    bfeat = board_feats_idx([k for k in b_idx if k >= 0])
     board_oh = np.zeros(52*5, dtype=np.float32)
-    for i, c in enumerate(state.community_cards[:5]):
-        board_oh[i*52:(i+1)*52] = onehot_card(c)
+    for i, k in enumerate(b_idx[:5]):
+        if k >= 0: board_oh[i*52 + k] = 1.0
 
     # --- assemblage
     scalars = np.array([
@@ -80,15 +100,7 @@ def featurize(state: TableState) -> Tuple[np.ndarray, List[str], Dict[str, float
 
     x = np.concatenate([scalars, pos_oh, hvec, bvec, hero_oh, board_oh], axis=0)
 
-    names = (
-        ["pot_size","hero_stack","street","spr"]
-        + pos_onehot_names
-        + ["H_is_pair","H_is_suited","H_is_connected","H_gap","H_hi_rank","H_lo_rank","H_avg_rank"]
-        + ["B_cnt","B_pairs","B_trips","B_quads","B_rainbow","B_two_tone","B_monotone",
-           "B_max_suit","B_rank_span","B_consec_run"]
-        + [f"H1_{i}" for i in range(52)] + [f"H2_{i}" for i in range(52)]
-        + [f"B{i+1}_{j}" for i in range(5) for j in range(52)]
-    )
+    names = list(FEATURE_NAMES)
 
     # dict lisible (debug)
     dbg = {
@@ -98,4 +110,13 @@ def featurize(state: TableState) -> Tuple[np.ndarray, List[str], Dict[str, float
         **{k: float(v) for k, v in hfeat.items()},
         **{k: float(v) for k, v in bfeat.items()},
     }
+    if equity_enabled():
+        n_opp = opponents_from_state(state)
+        hv = [k for k in h_idx if k >= 0]
+        pre = preflop_equity(hv[0], hv[1], n_opp) if street == 0 and len(hv) == 2 else None
+        if pre is not None:  # table 169 × 9 (lookup O(1))
+            dbg.update({"equity": pre, "equity_se": 0.0, "equity_exact": 0.0, "opponents": float(n_opp)})
+        elif (eq := cached_equity(hv, [k for k in b_idx if k >= 0], n_opp)) is not None:
+            dbg.update({"equity": eq.equity, "equity_se": eq.stderr,
+                        "equity_exact": float(eq.exact), "opponents": float(n_opp)})
     return x, names, dbg
@@ -0,0 +1,120 @@
+# src/featurize/preflop.py
+from __future__ import annotations
+import os, threading
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from src.featurize.cards_utils import RANK_ORDER
+from src.featurize.equity import equity
+
+# ──────────────────────────
+# Table d'équité preflop: 169 classes de mains × 1..9 adversaires aléatoires
+#   - classe = cellule de la grille 13×13: paire (r,r), suited (haut,bas), offsuit (bas,haut)
+#     → index hi*13+lo (suited/paire) ou lo*13+hi (offsuit), rangs 0..12 (2..A)
+#   - CLASS_OF[i*52+j] : 2 cartes (indices 0..51) → classe, lookup O(1)
+#   - asset binaire: .npy float32 (169, 9) ≈ 6 Ko, généré par
+#       python -m src.tools.build_preflop_table --samples 50000 --procs 8
+#   - POKERIA_PREFLOP_TABLE=<chemin>
+# ──────────────────────────
+TABLE_PATH = Path(os.getenv("POKERIA_PREFLOP_TABLE", "assets/tables/preflop_equity_v1.npy"))
+N_CLASSES, MAX_OPP = 169, 9
+
+def _class_of() -> np.ndarray:
+    out = np.full(52 * 52, -1, dtype=np.int16)
+    for i in range(52):
+        for j in range(52):
+            if i == j:
+                continue
+            ri, rj = i >> 2, j >> 2
+            hi, lo = max(ri, rj), min(ri, rj)
+            suited = (i & 3) == (j & 3)
+            out[i * 52 + j] = hi * 13 + lo if (suited or hi == lo) else lo * 13 + hi
+    return out
+
+CLASS_OF = _class_of()
+
+def hand_class(i: int, j: int) -> int:
+    """2 cartes (indices 0..51) → classe 0..168, -1 si invalide."""
+    if not (0 <= i < 52 and 0 <= j < 52):
+        return -1
+    return int(CLASS_OF[i * 52 + j])
+
+def class_label(c: int) -> str:
+    """0..168 → "AA" / "AKs" / "AKo"."""
+    a, b = divmod(int(c), 13)
+    if a == b:
+        return RANK_ORDER[a] * 2
+    return RANK_ORDER[max(a, b)] + RANK_ORDER[min(a, b)] + ("s" if a > b else "o")
+
+def class_cards(c: int) -> Tuple[int, int]:
+    """Main représentante d'une classe (cœur/carreau pour offsuit et paires)."""
+    a, b = divmod(int(c), 13)
+    hi, lo = max(a, b), min(a, b)
+    return (hi * 4, lo * 4) if a > b else (hi * 4, lo * 4 + 1)
+
+# ──────────────────────────
+# Génération (parallèle sur les cœurs)
+# ──────────────────────────
+def _cell(c: int, n_opp: int, samples: int, seed: int) -> Tuple[int, int, float]:
+    eq = equity(class_cards(c), (), n_opp, tol=0.0, budget_ms=None, max_samples=samples, procs=0, seed=seed)
+    return c, n_opp, eq.equity
+
+def build_table(samples: int = 50_000, procs: int = 0, seed: int = 0,
+                progress: Optional[Callable[[int, int], None]] = None) -> np.ndarray:
+    """(169, 9) float32: colonne k = équité vs k+1 adversaires. procs<=1 → en série."""
+    cells = [(c, k) for k in range(1, MAX_OPP + 1) for c in range(N_CLASSES)]
+    seeds = np.random.SeedSequence(seed).generate_state(len(cells)).tolist()
+    args = ([c for c, _ in cells], [k for _, k in cells], [samples] * len(cells), seeds)
+    table = np.zeros((N_CLASSES, MAX_OPP), dtype=np.float32)
+    if procs > 1:
+        import multiprocessing as mp
+        with ProcessPoolExecutor(max_workers=procs, mp_context=mp.get_context("spawn")) as ex:
+            results = ex.map(_cell, *args, chunksize=8)
+            for done, (c, k, e) in enumerate(results, 1):
+                table[c, k - 1] = e
+                if progress: progress(done, len(cells))
+    else:
+        for done, a in enumerate(zip(*args), 1):
+            c, k, e = _cell(*a)
+            table[c, k - 1] = e
+            if progress: progress(done, len(cells))
+    return table
+
+def save_table(table: np.ndarray, path: Path = TABLE_PATH) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.save(path, np.asarray(table, dtype=np.float32))
+    return path
+
+# ──────────────────────────
+# Lookup (chargé une fois; None si l'asset manque → featurize retombe sur le moteur)
+# ──────────────────────────
+_T: Optional[np.ndarray] = None
+_T_LOADED = False
+_T_LOCK = threading.Lock()
+
+def get_preflop_table() -> Optional[np.ndarray]:
+    global _T, _T_LOADED
+    if not _T_LOADED:
+        with _T_LOCK:
+            if not _T_LOADED:
+                try:
+                    t = np.load(TABLE_PATH)
+                    _T = t if t.shape == (N_CLASSES, MAX_OPP) else None
+                except Exception:
+                    _T = None
+                _T_LOADED = True
+    return _T
+
+def preflop_equity(i: int, j: int, n_opponents: int = 1) -> Optional[float]:
+    """Équité preflop tabulée (cartes 0..51), None si table absente ou main invalide."""
+    t = get_preflop_table()
+    c = hand_class(i, j)
+    if t is None or c < 0:
+        return None
+    return float(t[c, max(1, min(MAX_OPP, int(n_opponents))) - 1])
+
+def class_labels() -> List[str]:
+    return [class_label(c) for c in range(N_CLASSES)]
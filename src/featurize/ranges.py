@@ -0,0 +1,231 @@
+# src/featurize/ranges.py
+from __future__ import annotations
+import re, time
+import numpy as np
+from functools import lru_cache
+from itertools import combinations
+from math import comb
+from typing import List, Optional, Sequence, Union
+
+from src.featurize.cards_utils import (RANK_ORDER, SUITS, SUIT_PERMS, N_COMBOS, card_index, cards_mask,
+                                       canonicalize)
+from src.featurize.preflop import CLASS_OF, N_CLASSES
+from src.featurize.equity import (EquityResult, EXACT_MAX, TOL, BUDGET_MS, BATCH, MAX_SAMPLES,
+                                  _idx, _deck, _sample, _shares, _showdown, _mc_loop)
+
+# ──────────────────────────
+# Ranges adverses en notation standard → poids par combo (1326, ordre combo_index)
+#   "QQ+, 77-99, A2s+, KTo+, ATs-A6s, KQ, AhKh, JJ:0.5, random"
+#   - paires "77", "77+", "77-99"; suited/offsuit "AKs"/"AKo", sans suffixe = les deux
+#   - "+" sur non-paire: kicker monte jusqu'à rang haut-1 (A2s+ = A2s..AKs)
+#   - combo précis "AhKd"; poids optionnel ":0.5"; "random"/"any"/"*" = 100 %
+#   - retrait des cartes mortes (héros, board) par masque vectorisé
+# Caches: parse_range(texte), live_weights(texte, masque morts 52 bits, canonisé en couleurs).
+# ──────────────────────────
+def _combo_cards() -> np.ndarray:
+    out = np.zeros((N_COMBOS, 2), dtype=np.int8)
+    for j in range(1, 52):
+        for i in range(j):
+            out[j * (j - 1) // 2 + i] = (i, j)
+    return out
+
+COMBO_CARDS = _combo_cards()                                                   # (1326, 2) i < j
+COMBO_CLASS = CLASS_OF[COMBO_CARDS[:, 0].astype(np.int64) * 52 + COMBO_CARDS[:, 1]]  # (1326,) 0..168
+
+def _combo_perm() -> np.ndarray:
+    """(24, 1326): COMBO_PERM[p, c] = combo c avec les couleurs permutées par SUIT_PERMS[p]."""
+    out = np.zeros((len(SUIT_PERMS), N_COMBOS), dtype=np.int16)
+    for p, perm in enumerate(SUIT_PERMS):
+        a = (COMBO_CARDS[:, 0] & ~3) | np.asarray(perm, np.int8)[COMBO_CARDS[:, 0] & 3]
+        b = (COMBO_CARDS[:, 1] & ~3) | np.asarray(perm, np.int8)[COMBO_CARDS[:, 1] & 3]
+        i, j = np.minimum(a, b).astype(np.int32), np.maximum(a, b).astype(np.int32)
+        out[p] = j * (j - 1) // 2 + i
+    return out
+
+COMBO_PERM = _combo_perm()
+_PERM_ID = {perm: p for p, perm in enumerate(SUIT_PERMS)}
+
+_TOKEN = re.compile(r"^([2-9TJQKA])([2-9TJQKA])([so]?)(\+?)$")
+_SPAN = re.compile(r"^([2-9TJQKA])([2-9TJQKA])([so]?)-([2-9TJQKA])([2-9TJQKA])([so]?)$")
+_EXACT = re.compile(r"^([2-9TJQKA])([hdsc])([2-9TJQKA])([hdsc])$")
+
+def _r(ch: str) -> int:
+    return RANK_ORDER.index(ch)
+
+def _classes(hi: int, lo: int, kind: str) -> List[int]:
+    """Classes 0..168 (cf. preflop.CLASS_OF) pour rangs (hi, lo) et suffixe ''/'s'/'o'."""
+    if hi == lo:
+        return [hi * 13 + hi]
+    hi, lo = max(hi, lo), min(hi, lo)
+    return ([hi * 13 + lo] if kind != "o" else []) + ([lo * 13 + hi] if kind != "s" else [])
+
+def _norm(tok: str) -> str:
+    """'aks' → 'AKs', 'ahkd' → 'AhKd' (rangs en majuscules, suffixe/couleurs en minuscules)."""
+    tok = tok.strip()
+    if len(tok) == 4 and tok[1].lower() in SUITS and tok[3].lower() in SUITS:
+        return tok[0].upper() + tok[1].lower() + tok[2].upper() + tok[3].lower()
+    return "".join(c.lower() if c.lower() in "so" else c.upper() for c in tok)
+
+def _token_weights(tok: str) -> np.ndarray:
+    """Un terme de range → masque bool (1326,)."""
+    cls = np.zeros(N_CLASSES, dtype=bool)
+    if tok.lower() in ("random", "any", "*", "100%"):
+        return np.ones(N_COMBOS, dtype=bool)
+    if (m := _EXACT.match(tok)):
+        a, b = card_index(m.group(1) + m.group(2)), card_index(m.group(3) + m.group(4))
+        if a == b:
+            raise ValueError(f"range: combo invalide {tok!r}")
+        i, j = min(a, b), max(a, b)
+        out = np.zeros(N_COMBOS, dtype=bool)
+        out[j * (j - 1) // 2 + i] = True
+        return out
+    if (m := _SPAN.match(tok)):
+        h1, l1, k1, h2, l2, k2 = _r(m.group(1)), _r(m.group(2)), m.group(3), _r(m.group(4)), _r(m.group(5)), m.group(6)
+        if k1 != k2:
+            raise ValueError(f"range: suffixes incohérents {tok!r}")
+        if h1 == l1 and h2 == l2:               # 77-99
+            for r in range(min(h1, h2), max(h1, h2) + 1):
+                cls[_classes(r, r, "")] = True
+        elif h1 == h2:                          # ATs-A6s (rang haut fixe)
+            for lo in range(min(l1, l2), max(l1, l2) + 1):
+                cls[_classes(h1, lo, k1)] = True
+        else:
+            raise ValueError(f"range: intervalle non supporté {tok!r}")
+        return cls[COMBO_CLASS]
+    if (m := _TOKEN.match(tok)):
+        hi, lo, kind, plus = _r(m.group(1)), _r(m.group(2)), m.group(3), m.group(4)
+        if hi == lo:
+            if kind:
+                raise ValueError(f"range: paire avec suffixe {tok!r}")
+            for r in range(hi, 13 if plus else hi + 1):
+                cls[_classes(r, r, "")] = True
+        else:
+            hi, lo = max(hi, lo), min(hi, lo)
+            for k in range(lo, hi if plus else lo + 1):
+                cls[_classes(hi, k, kind)] = True
+        return cls[COMBO_CLASS]
+    raise ValueError(f"range: terme illisible {tok!r}")
+
+@lru_cache(maxsize=256)
+def parse_range(text: str) -> np.ndarray:
+    """Notation → poids float32 (1326,) en lecture seule (max des poids si un combo est cité 2×)."""
+    w = np.zeros(N_COMBOS, dtype=np.float32)
+    for raw in re.split(r"[,\s]+", text.strip()):
+        if not raw:
+            continue
+        tok, _, wt = raw.partition(":")
+        weight = float(wt) if wt else 1.0
+        sel = _token_weights(_norm(tok))
+        w[sel] = np.maximum(w[sel], weight)
+    w.setflags(write=False)
+    return w
+
+@lru_cache(maxsize=256)
+def _suit_symmetric(text: str) -> bool:
+    """Vrai si la range est invariante par permutation des couleurs (pas de combo précis type "AhKd")."""
+    w = parse_range(text)
+    return all(np.array_equal(w[COMBO_PERM[p]], w) for p in range(len(SUIT_PERMS)))
+
+@lru_cache(maxsize=1024)
+def _live_cached(text: str, dead_mask: int) -> np.ndarray:
+    out = _remove_dead(parse_range(text), dead_mask)
+    out.setflags(write=False)
+    return out
+
+def live_weights(text: str, dead_mask: int = 0) -> np.ndarray:
+    """
+    parse_range(text) sans les combos qui touchent une carte morte (masque 52 bits).
+    Range symétrique en couleurs → cache sur les cartes mortes canonisées, puis retour aux
+    couleurs lues par la permutation inverse (w[c] = w_canon[perm(c)]).
+    """
+    w = parse_range(text)
+    if not dead_mask:
+        return w
+    if not _suit_symmetric(text):
+        return _live_cached(text, dead_mask)
+    dead = [c for c in range(52) if (dead_mask >> c) & 1]
+    _, canon, perm = canonicalize((), dead, ordered=False)
+    return _live_cached(text, cards_mask(canon))[COMBO_PERM[_PERM_ID[perm]]]
+
+def _remove_dead(w: np.ndarray, dead_mask: int) -> np.ndarray:
+    dead = np.asarray([(dead_mask >> c) & 1 for c in range(52)], dtype=bool)
+    return np.where(dead[COMBO_CARDS[:, 0]] | dead[COMBO_CARDS[:, 1]], 0.0, w).astype(np.float32)
+
+def range_combos(weights: np.ndarray) -> int:
+    return int(np.count_nonzero(weights))
+
+def range_fraction(text: str) -> float:
+    """Part des 1326 combos (pondérée) — ex. "22+" ≈ 0.059."""
+    return float(parse_range(text).sum() / N_COMBOS)
+
+# ──────────────────────────
+# Équité héros vs range(s)
+# ──────────────────────────
+RangeLike = Union[str, np.ndarray]
+
+def _weights(r: RangeLike, dead_mask: int) -> np.ndarray:
+    if isinstance(r, str):
+        return live_weights(r, dead_mask)
+    w = np.asarray(r, dtype=np.float32)
+    if w.shape != (N_COMBOS,):
+        raise ValueError("range: poids attendus de forme (1326,)")
+    return _remove_dead(w, dead_mask)
+
+def _exact_hu(h: List[int], b: List[int], deck: np.ndarray, w: np.ndarray) -> EquityResult:
+    """Heads-up: toutes les fins de board × combos vivants, pondérés, collisions retirées."""
+    t0 = time.perf_counter()
+    live = np.nonzero(w)[0]
+    need = 5 - len(b)
+    runs = list(combinations(deck.tolist(), need))
+    runs = np.asarray(runs, dtype=np.int8).reshape(len(runs), need)
+    rr = np.repeat(runs, len(live), axis=0)
+    cc = np.tile(COMBO_CARDS[live], (len(runs), 1))
+    ww = np.tile(w[live], len(runs)).astype(np.float64)
+    ok = ~((rr[:, :, None] == cc[:, None, :]).any(axis=(1, 2)))
+    share, win, tie = _shares(_showdown(h, b, rr[ok], cc[ok], 1))
+    ww = ww[ok]
+    tot = ww.sum()
+    return EquityResult(float((share * ww).sum() / tot), float((win * ww).sum() / tot),
+                        float((tie * ww).sum() / tot), 0.0, int(ok.sum()), True,
+                        (time.perf_counter() - t0) * 1000.0)
+
+def range_equity(hero: Sequence, board: Sequence, ranges: Union[RangeLike, Sequence[RangeLike]],
+                 tol: float = TOL, budget_ms: Optional[float] = BUDGET_MS, max_samples: int = MAX_SAMPLES,
+                 seed: Optional[int] = None) -> Optional[EquityResult]:
+    """
+    Équité du héros contre une range (heads-up) ou une liste de ranges (une par adversaire).
+    Exact en heads-up quand (fins de board × combos) ≤ POKERIA_EQ_EXACT_MAX, sinon Monte Carlo:
+    combos tirés selon les poids, board complété, lignes en collision rejetées.
+    None si héros incomplet ou range vide après retrait des cartes mortes.
+    """
+    h, b = _idx(hero)[:2], _idx(board)[:5]
+    if len(h) < 2 or len(set(h + b)) != len(h) + len(b):
+        return None
+    rs = [ranges] if isinstance(ranges, (str, np.ndarray)) else list(ranges)
+    if not 1 <= len(rs) <= 9:
+        return None
+    dead = cards_mask(h + b)
+    ws = [_weights(r, dead) for r in rs]
+    if any(w.sum() <= 0 for w in ws):
+        return None
+    deck = _deck(h, b)
+    need = 5 - len(b)
+    if len(ws) == 1 and comb(len(deck), need) * range_combos(ws[0]) <= EXACT_MAX:
+        return _exact_hu(h, b, deck, ws[0])
+
+    rng = np.random.default_rng(seed)
+    cums = [np.cumsum(w, dtype=np.float64) for w in ws]
+    n_opp = len(ws)
+
+    def step():
+        opp = np.concatenate([COMBO_CARDS[np.minimum(np.searchsorted(c, rng.random(BATCH) * c[-1], side="right"),
+                                                     N_COMBOS - 1)] for c in cums], axis=1)
+        run = _sample(deck, BATCH, need, rng) if need else np.empty((BATCH, 0), dtype=np.int8)
+        allc = np.sort(np.concatenate([run, opp], axis=1), axis=1)
+        ok = ~(np.diff(allc, axis=1) == 0).any(axis=1)
+        if not ok.any():
+            return 0.0, 0.0, 0.0, 0.0, 0
+        share, win, tie = _shares(_showdown(h, b, run[ok], opp[ok], n_opp))
+        return share.sum(), (share * share).sum(), win.sum(), tie.sum(), len(share)
+
+    return _mc_loop(step, tol, budget_ms, max_samples)
@@ -0,0 +1,131 @@
+# src/featurize/sparse.py
+from __future__ import annotations
+import numpy as np
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Sequence, Tuple
+
+from src.featurize.features import FEATURE_NAMES
+from src.featurize.batch import (D, OFF_HOH, dense_block, onehot_slots, gather_states, _pack)
+
+# ──────────────────────────
+# Encodage creux des blocs one-hot cartes
+#   - 28 colonnes denses (scalaires, position, H_*, B_*) + ≤7 indices one-hot actifs
+#   - CSR (data, indices, indptr) sans dépendance; scipy.sparse si installé
+#   - dataset disque: enregistrements fixes de 26 octets (cartes par slot, position,
+#     street, pot/stack, label) → colonnes H_/B_ recalculées au chargement
+# ──────────────────────────
+ACTIONS = ["none", "fold", "check", "call", "raise", "all-in"]
+NO_CARD = 255
+
+RECORD = np.dtype([
+    ("hero", "u1", (2,)), ("board", "u1", (5,)),   # index carte 0..51 par slot, 255 = vide
+    ("pos", "u1"), ("street", "u1"),
+    ("pot", "<f8"), ("stack", "<f8"),
+    ("label", "u1"),                               # index ACTIONS (0 = none / inconnu)
+])
+MAGIC = b"PKSPARS1"
+
+class SparseRows:
+    """N états: `dense` (N, 28) float32 + `active` (N, 7) int16 = colonnes one-hot actives (-1 = aucune)."""
+    __slots__ = ("dense", "active")
+
+    def __init__(self, dense: np.ndarray, active: np.ndarray):
+        self.dense, self.active = dense, active
+
+    def __len__(self) -> int:
+        return len(self.dense)
+
+    @property
+    def nbytes(self) -> int:
+        return self.dense.nbytes + self.active.nbytes
+
+    def to_dense(self) -> np.ndarray:
+        X = np.zeros((len(self), D), dtype=np.float32)
+        X[:, :OFF_HOH] = self.dense
+        r, k = np.nonzero(self.active >= 0)
+        X[r, self.active[r, k]] = 1.0
+        return X
+
+    def to_csr(self):
+        """(data, indices, indptr) float32/int32; scipy.sparse.csr_matrix si scipy est disponible."""
+        dr, dc = np.nonzero(self.dense)
+        ar, ak = np.nonzero(self.active >= 0)
+        rows = np.concatenate([dr, ar])
+        cols = np.concatenate([dc, self.active[ar, ak].astype(np.int64)])
+        vals = np.concatenate([self.dense[dr, dc], np.ones(len(ar), np.float32)])
+        order = np.lexsort((cols, rows))
+        indptr = np.zeros(len(self) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(self)), out=indptr[1:])
+        data, indices = vals[order].astype(np.float32), cols[order].astype(np.int32)
+        try:
+            from scipy.sparse import csr_matrix
+            return csr_matrix((data, indices, indptr), shape=(len(self), D))
+        except Exception:
+            return data, indices, indptr
+
+def sparse_arrays(hero_pos, board_pos, pot, stack, pos_idx, street=None,
+                  hero_valid=None, board_valid=None) -> SparseRows:
+    """Équivalent creux de featurize_arrays (mêmes entrées)."""
+    hero_pos, board_pos = np.asarray(hero_pos, np.int16), np.asarray(board_pos, np.int16)
+    hv = _pack(hero_pos) if hero_valid is None else np.asarray(hero_valid, np.int16)
+    bv = _pack(board_pos) if board_valid is None else np.asarray(board_valid, np.int16)
+    dense = dense_block(hv, bv, pot, stack, pos_idx, street)
+    active = np.stack([np.where(cards >= 0, off + cards, -1) for off, cards in onehot_slots(hero_pos, board_pos)],
+                      axis=1).astype(np.int16)
+    return SparseRows(dense, active)
+
+def sparse_batch(states: Iterable) -> SparseRows:
+    return sparse_arrays(**gather_states(states))
+
+def featurize_sparse(state) -> Tuple[np.ndarray, np.ndarray, list]:
+    """Version creuse de featurize(): (28 colonnes denses, colonnes one-hot actives, noms)."""
+    rows = sparse_batch([state])
+    act = rows.active[0]
+    return rows.dense[0], act[act >= 0], list(FEATURE_NAMES)
+
+# ──────────────────────────
+# Dataset disque (append + lecture memmap)
+# ──────────────────────────
+def _records(g: dict, labels: Optional[Sequence[str]]) -> np.ndarray:
+    n = len(g["pot"])
+    rec = np.zeros(n, dtype=RECORD)
+    rec["hero"] = np.where(g["hero_pos"] >= 0, g["hero_pos"], NO_CARD)
+    rec["board"] = np.where(g["board_pos"] >= 0, g["board_pos"], NO_CARD)
+    rec["pos"], rec["street"] = g["pos_idx"], g["street"]
+    rec["pot"], rec["stack"] = g["pot"], g["stack"]
+    if labels is not None:
+        rec["label"] = [ACTIONS.index(a) if a in ACTIONS else 0 for a in labels]
+    return rec
+
+def append_dataset(path: Path, states: Iterable, labels: Optional[Sequence[str]] = None) -> int:
+    """Ajoute des états (TableState/CompactState) au fichier; renvoie le nb d'enregistrements écrits."""
+    path = Path(path)
+    rec = _records(gather_states(states), labels)
+    is_new = not path.exists()
+    with path.open("ab") as f:
+        if is_new:
+            f.write(MAGIC)
+        f.write(rec.tobytes())
+    return len(rec)
+
+def open_dataset(path: Path) -> np.ndarray:
+    """Enregistrements en memmap (lecture seule, pas de chargement complet)."""
+    path = Path(path)
+    with path.open("rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path}: pas un dataset creux PokerIA")
+    return np.memmap(path, dtype=RECORD, mode="r", offset=len(MAGIC))
+
+def decode_records(rec: np.ndarray) -> Tuple[SparseRows, np.ndarray]:
+    """Enregistrements → (SparseRows, labels int)."""
+    hero, board = rec["hero"].astype(np.int16), rec["board"].astype(np.int16)
+    hero[hero == NO_CARD] = -1
+    board[board == NO_CARD] = -1
+    rows = sparse_arrays(hero, board, rec["pot"], rec["stack"], rec["pos"].astype(np.int64),
+                         rec["street"].astype(np.float32))
+    return rows, np.asarray(rec["label"])
+
+def iter_dataset(path: Path, batch: int = 65536) -> Iterator[Tuple[SparseRows, np.ndarray]]:
+    rec = open_dataset(path)
+    for i in range(0, len(rec), batch):
+        yield decode_records(rec[i:i + batch])
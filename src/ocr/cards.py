@@ -1,6 +1,6 @@
 # src/ocr/cards.py
 from __future__ import annotations
-import os, cv2, numpy as np
+import os, cv2, threading, numpy as np
 from typing import Optional, Tuple, Dict, List
 from pathlib import Path
 
@@ -150,12 +150,19 @@ def _hu_vec(cnt) -> np.ndarray:
     return -np.sign(hu) * np.log10(np.abs(hu) + 1e-12)
 
 _RANK_DB: Dict[str, List[np.ndarray]] = {}  # label -> list[hu]
+_RANK_DB_LOCK = threading.Lock()  # chargement unique même si ROIs en parallèle
 
 def _ensure_rank_db():
-    global _RANK_DB
     if _RANK_DB: return
+    with _RANK_DB_LOCK:
+        if _RANK_DB: return
+        # construit hors du dict global → jamais visible à moitié rempli
+        _RANK_DB.update(_load_rank_db())
+
+def _load_rank_db() -> Dict[str, List[np.ndarray]]:
+    db: Dict[str, List[np.ndarray]] = {}
     root = Path(os.getenv("POKERIA_RANKS_DIR", str(_default_ranks_dir())))
-    if not root.exists(): return
+    if not root.exists(): return db
     for lab in list(RANK_ALLOW):
         files = list((root/lab).glob("*.png")) + list(root.glob(f"{lab}_*.png"))
         for p in files:
@@ -167,9 +174,10 @@ def _ensure_rank_db():
                 cnt = _largest_cnt(th)
                 if cnt is None: continue
                 hu  = _hu_vec(cnt)
-                _RANK_DB.setdefault(lab, []).append(hu)
+                db.setdefault(lab, []).append(hu)
             except Exception:
                 continue
+    return db
 
 def _rank_from_templates(rank_rgb) -> Tuple[Optional[str], float]:
     _ensure_rank_db()
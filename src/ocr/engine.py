@@ -2,6 +2,7 @@
 from __future__ import annotations
 import re
 import os
+import threading
 import numpy as np
 from typing import Optional, Dict, Any, List, Tuple
 
@@ -36,6 +37,12 @@ class EasyOCREngine:
         self.reader = easyocr.Reader(
             list(langs), gpu=bool(gpu), download_enabled=True, model_storage_directory='models/'
         )
+        # Le Reader (torch) n'est pas thread-safe → appels sérialisés
+        self._lock = threading.Lock()
+
+    def _readtext(self, img_rgb, **kw) -> list:
+        with self._lock:
+            return self.reader.readtext(img_rgb, **kw)
 
     # ─────────── helpers parsing ───────────
     @staticmethod
@@ -74,7 +81,7 @@ class EasyOCREngine:
         kw = dict(detail=1, paragraph=False)
         if allowlist is not None:
             kw["allowlist"] = allowlist
-        results = self.reader.readtext(img_rgb, **kw)
+        results = self._readtext(img_rgb, **kw)
         if not results:
             return "", 0.0, []
         texts = [t for (_b, t, _c) in results if t]
@@ -91,7 +98,7 @@ class EasyOCREngine:
           3) sinon, meilleure confiance
         Retour dict: {"text","value","conf","raw","joined"}.
         """
-        results = self.reader.readtext(
+        results = self._readtext(
             img_rgb, detail=1, paragraph=False, allowlist="0123456789€,."
         )
         joined = " ".join([t for (_box, t, _c) in results]) if results else ""
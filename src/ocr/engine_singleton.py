@@ -1,12 +1,16 @@
 # src/ocr/engine_singleton.py
+import threading
 from typing import Optional
 from src.ocr.engine import EasyOCREngine
 
 _ENGINE: Optional[EasyOCREngine] = None
+_ENGINE_LOCK = threading.Lock()
 
 def get_engine() -> EasyOCREngine:
     global _ENGINE
     if _ENGINE is None:
-        # un seul Reader EasyOCR en mémoire
-        _ENGINE = EasyOCREngine(gpu=False)
+        with _ENGINE_LOCK:
+            if _ENGINE is None:
+                # un seul Reader EasyOCR en mémoire
+                _ENGINE = EasyOCREngine(gpu=False)
     return _ENGINE
@@ -0,0 +1,136 @@
+# src/ocr/ocr_pool.py
+from __future__ import annotations
+import os, threading
+import numpy as np
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+# ──────────────────────────
+# Pool de processus OCR (optionnel)
+#   - chaque worker possède son propre EasyOCREngine, chauffé une fois
+#   - les crops transitent par multiprocessing.shared_memory (pas de pickle d'array)
+#   - POKERIA_OCR_PROCS=N  (0 = désactivé → OCR dans le process courant)
+# ──────────────────────────
+_W_ENGINE = None  # engine du process worker
+
+def _worker_init():
+    global _W_ENGINE
+    # 1 thread torch/OpenCV par worker: le parallélisme vient des processus
+    os.environ.setdefault("OMP_NUM_THREADS", "1")
+    try:
+        import torch
+        torch.set_num_threads(1)
+    except Exception:
+        pass
+    from src.ocr.engine import EasyOCREngine
+    _W_ENGINE = EasyOCREngine(gpu=False)
+    _W_ENGINE.warmup()
+
+def _attach(shm_name: str, shape: Tuple[int, ...], dtype: str):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    arr = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    return shm, arr
+
+def _worker_call(op: str, shm_name: str, shape: Tuple[int, ...], dtype: str, kw: Dict[str, Any]):
+    shm, img = _attach(shm_name, shape, dtype)
+    try:
+        if op == "read_text":
+            return _W_ENGINE.read_text(img, **kw)
+        if op == "read_amount":
+            return _W_ENGINE.read_amount(img, **kw)
+        raise ValueError(f"unknown OCR op: {op}")
+    finally:
+        del img
+        shm.close()
+
+class OcrProcessPool:
+    """
+    Dispatch OCR vers N processus. Chaque appel `submit_*` renvoie un Future;
+    le segment shared_memory est libéré quand le Future se termine.
+    """
+    def __init__(self, workers: int = 2):
+        import multiprocessing as mp
+        self.workers = max(1, int(workers))
+        self._ex = ProcessPoolExecutor(max_workers=self.workers,
+                                       mp_context=mp.get_context("spawn"),
+                                       initializer=_worker_init)
+
+    def warmup(self) -> None:
+        """Force le démarrage + chargement des poids dans tous les workers."""
+        dummy = np.zeros((20, 80, 3), dtype=np.uint8)
+        futs = [self.submit("read_text", dummy, allowlist="0") for _ in range(self.workers)]
+        for f in futs:
+            f.result()
+
+    def submit(self, op: str, img: np.ndarray, **kw) -> Future:
+        img = np.ascontiguousarray(img)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, img.nbytes))
+        view = np.ndarray(img.shape, dtype=img.dtype, buffer=shm.buf)
+        view[...] = img
+        del view
+        try:
+            fut = self._ex.submit(_worker_call, op, shm.name, img.shape, img.dtype.str, kw)
+        except Exception:
+            shm.close(); shm.unlink()
+            raise
+
+        def _release(_f, shm=shm):
+            shm.close()
+            shm.unlink()
+        fut.add_done_callback(_release)
+        return fut
+
+    def submit_text(self, img_rgb, allowlist: Optional[str] = None) -> Future:
+        return self.submit("read_text", img_rgb, allowlist=allowlist)
+
+    def submit_amount(self, img_rgb, prefer_rightmost: bool = True) -> Future:
+        return self.submit("read_amount", img_rgb, prefer_rightmost=prefer_rightmost)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._ex.shutdown(wait=wait, cancel_futures=True)
+
+class PooledEngine:
+    """
+    Façade compatible EasyOCREngine (read_text / read_amount) qui délègue au pool.
+    Utilisable telle quelle par read_card / _read_amount_variants.
+    """
+    def __init__(self, pool: OcrProcessPool):
+        self.pool = pool
+
+    def read_text(self, img_rgb, allowlist: Optional[str] = None) -> Tuple[str, float, list]:
+        return self.pool.submit_text(img_rgb, allowlist=allowlist).result()
+
+    def read_amount(self, img_rgb, prefer_rightmost: bool = True) -> Dict[str, Any]:
+        return self.pool.submit_amount(img_rgb, prefer_rightmost=prefer_rightmost).result()
+
+    def read_amount_from_variants(self, variants: List[np.ndarray], prefer_rightmost: bool = True) -> Dict[str, Any]:
+        from src.ocr.engine import EasyOCREngine
+        return EasyOCREngine.read_amount_from_variants(self, variants, prefer_rightmost=prefer_rightmost)
+
+    def warmup(self):
+        self.pool.warmup()
+
+# ──────────────────────────
+# Singleton process-wide
+# ──────────────────────────
+_POOL: Optional[OcrProcessPool] = None
+_POOL_LOCK = threading.Lock()
+
+def ocr_procs() -> int:
+    try:
+        return max(0, int(os.getenv("POKERIA_OCR_PROCS", "0")))
+    except Exception:
+        return 0
+
+def get_ocr_pool() -> Optional[OcrProcessPool]:
+    """Pool partagé, ou None si POKERIA_OCR_PROCS=0."""
+    global _POOL
+    n = ocr_procs()
+    if n <= 0:
+        return None
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = OcrProcessPool(n)
+    return _POOL
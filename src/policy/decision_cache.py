@@ -0,0 +1,236 @@
+# src/policy/decision_cache.py
+from __future__ import annotations
+import bisect, json, os, threading, time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from src.featurize.cards_utils import card_index, index_card, canonicalize
+from src.policy.ollama_client import ask_policy
+
+# ──────────────────────────
+# Cache des décisions policy (réponses LLM brutes, avant finalize_action)
+#   - clé = spot "équivalent": cartes canonisées en couleurs, street, position,
+#     tranche de SPR, tranche de cote (to_call / (pot + to_call))
+#     → un pot à 3,10 € ou 3,20 € ne relance plus le LLM
+#   - LRU + TTL, compteurs hits / misses / expirations / évictions
+#   - persistance append-only (JSONL) relue au démarrage, compactée si trop longue
+#     (au chargement, puis en cours de session dès 2 × max_size lignes)
+# La réponse brute est re-finalisée à chaque appel (tailles en € dépendantes du pot).
+# Env:
+#   POKERIA_POLICY_CACHE=1
+#   POKERIA_POLICY_CACHE_SIZE=4096
+#   POKERIA_POLICY_CACHE_TTL=86400        (s; 0 = pas d'expiration)
+#   POKERIA_POLICY_CACHE_PATH=logs/policy_cache.jsonl   ("" = mémoire seule)
+# ──────────────────────────
+SPR_EDGES = (0.5, 1.0, 2.0, 3.0, 5.0, 8.0, 13.0, 20.0)
+ODDS_EDGES = (0.01, 0.10, 0.20, 0.25, 0.33, 0.40, 0.50)   # 0 = rien à suivre
+
+def spr_bucket(spr: float) -> int:
+    return bisect.bisect_right(SPR_EDGES, float(spr or 0.0))
+
+def odds_bucket(to_call: float, pot: float) -> int:
+    to_call, pot = float(to_call or 0.0), float(pot or 0.0)
+    if to_call <= 0:
+        return 0
+    return bisect.bisect_right(ODDS_EDGES, to_call / max(0.01, pot + to_call))
+
+def decision_key(meta: Dict[str, Any]) -> Optional[str]:
+    """
+    meta = dict featurize (street, position, spr) + hero_cards/board_cards/pot_size/to_call.
+    None si le héros n'a pas 2 cartes lisibles (pas de mise en cache).
+    """
+    hero = [card_index(c) for c in meta.get("hero_cards") or []]
+    board = [card_index(c) for c in meta.get("board_cards") or []]
+    if sum(1 for i in hero if i >= 0) < 2:
+        return None
+    h, b, _ = canonicalize(hero, board)
+    return "|".join((
+        "".join(index_card(i) for i in h), "".join(index_card(i) for i in b),
+        str(int(meta.get("street", 0) or 0)), str(meta.get("position", "unknown")),
+        f"s{spr_bucket(meta.get('spr', 0.0))}",
+        f"o{odds_bucket(meta.get('to_call', 0.0), meta.get('pot_size', 0.0))}",
+    ))
+
+class PolicyCache:
+    """
+    LRU + TTL thread-safe. `path` → chaque put() est ajouté au fichier (une ligne JSON),
+    le fichier est rejoué à la construction (dernière valeur par clé, entrées expirées ignorées).
+    Accès dict-like (cache[k] = v, cache.get(k)) pour les caches d'affichage des overlays.
+    """
+    def __init__(self, max_size: int = 4096, ttl_s: Optional[float] = None, path: Optional[Path] = None):
+        self.max_size = max(1, int(max_size))
+        self.ttl_s = float(ttl_s) if ttl_s else None
+        self.path = Path(path) if path else None
+        self._d: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.expired = self.evictions = 0
+        self.loaded = 0
+        self._lines = 0   # lignes du fichier JSONL (compaction à 2 × max_size)
+        if self.path is not None:
+            self._load()
+
+    # ---------- accès ----------
+    def get(self, key: Optional[str], default=None):
+        if key is None:
+            return default
+        with self._lock:
+            item = self._d.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            value, ts = item
+            if self.ttl_s is not None and time.time() - ts > self.ttl_s:
+                del self._d[key]
+                self.expired += 1
+                self.misses += 1
+                return default
+            self._d.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Optional[str], value: Any, persist: bool = True):
+        if key is None:
+            return
+        ts = time.time()
+        with self._lock:
+            self._insert(key, value, ts)
+            if persist and self.path is not None:
+                self._append(key, value, ts)
+
+    __setitem__ = put
+
+    def __getitem__(self, key: str):
+        v = self.get(key)
+        if v is None:
+            raise KeyError(key)
+        return v
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._d
+
+    def __len__(self) -> int:
+        return len(self._d)
+
+    def clear(self):
+        with self._lock:
+            self._d.clear()
+
+    def _insert(self, key: str, value: Any, ts: float):
+        self._d[key] = (value, ts)
+        self._d.move_to_end(key)
+        while len(self._d) > self.max_size:
+            self._d.popitem(last=False)
+            self.evictions += 1
+
+    # ---------- persistance ----------
+    def _append(self, key: str, value: Any, ts: float):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps({"k": key, "v": value, "t": round(ts, 3)}, ensure_ascii=False) + "\n")
+        except Exception as e:
+            print("Policy cache not written:", e)
+            return
+        self._lines += 1
+        if self._lines > 2 * self.max_size:  # session longue: le fichier ne grossit pas sans fin
+            self._rewrite()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        now, lines = time.time(), 0
+        try:
+            with self.path.open(encoding="utf-8") as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        rec = json.loads(line)
+                        k, v, ts = rec["k"], rec["v"], float(rec["t"])
+                    except Exception:
+                        continue  # ligne tronquée (arrêt brutal)
+                    if self.ttl_s is not None and now - ts > self.ttl_s:
+                        continue
+                    self._insert(k, v, ts)
+        except Exception as e:
+            print("Policy cache not loaded:", e)
+            return
+        self.evictions = 0
+        self.loaded = len(self._d)
+        self._lines = lines
+        if lines > 2 * max(self.loaded, self.max_size // 2):
+            self.compact()
+
+    def compact(self):
+        """Réécrit le fichier avec les seules entrées vivantes (remplacement atomique)."""
+        if self.path is None:
+            return
+        with self._lock:
+            self._rewrite()
+
+    def _rewrite(self):
+        # appelé sous self._lock
+        now = time.time()
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        try:
+            n = 0
+            with tmp.open("w", encoding="utf-8") as f:
+                for k, (v, ts) in self._d.items():
+                    if self.ttl_s is not None and now - ts > self.ttl_s:
+                        continue
+                    f.write(json.dumps({"k": k, "v": v, "t": round(ts, 3)}, ensure_ascii=False) + "\n")
+                    n += 1
+            os.replace(tmp, self.path)
+            self._lines = n
+        except Exception as e:
+            print("Policy cache not compacted:", e)
+
+    # ---------- métriques ----------
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {"size": len(self._d), "hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "expired": self.expired, "evictions": self.evictions, "loaded": self.loaded}
+
+    def label(self) -> str:
+        s = self.stats()
+        return f"cache {s['hits']}/{s['hits'] + s['misses']} ({100 * s['hit_rate']:.0f} %)"
+
+# ──────────────────────────
+# Singleton + appel policy mis en cache
+# ──────────────────────────
+_CACHE: Optional[PolicyCache] = None
+_CACHE_LOCK = threading.Lock()
+
+def cache_enabled() -> bool:
+    return os.getenv("POKERIA_POLICY_CACHE", "1") == "1"
+
+def get_policy_cache() -> PolicyCache:
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                path = os.getenv("POKERIA_POLICY_CACHE_PATH", "logs/policy_cache.jsonl")
+                _CACHE = PolicyCache(
+                    max_size=int(os.getenv("POKERIA_POLICY_CACHE_SIZE", "4096")),
+                    ttl_s=float(os.getenv("POKERIA_POLICY_CACHE_TTL", "86400")),
+                    path=Path(path) if path else None,
+                )
+    return _CACHE
+
+def ask_policy_cached(features_vec, meta) -> Dict[str, Any]:
+    """ask_policy() derrière le cache de décisions; meta["policy_cached"] indique un hit."""
+    if not cache_enabled():
+        return ask_policy(features_vec, meta)
+    cache = get_policy_cache()
+    key = decision_key(meta)
+    raw = cache.get(key)
+    meta["policy_cached"] = raw is not None
+    if raw is not None:
+        return dict(raw)
+    raw = ask_policy(features_vec, meta)
+    # pas de mise en cache des sorties illisibles / vides
+    if isinstance(raw, dict) and str(raw.get("action", "none")).lower() in {"fold", "call", "raise"}:
+        cache.put(key, raw)
+    return raw
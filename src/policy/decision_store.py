@@ -0,0 +1,254 @@
+# src/policy/decision_store.py
+from __future__ import annotations
+import csv, json, os, shutil, time
+import numpy as np
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from src.featurize.cards_utils import card_index, CARD_NONE
+from src.featurize.preflop import CLASS_OF
+from src.policy.logger import LOG_DIR, LOG_PATH
+
+# ──────────────────────────
+# Journal des décisions en colonnes (analyse hors ligne)
+#   - compact_decisions(): logs/decisions*.csv (archives tournées + fichier actif)
+#     → logs/decisions_cols/: un .npy par colonne + meta.json
+#       numériques : ts (epoch s), street, spr, pot, stack, size_bb, percent, confidence, id
+#       chaînes    : model, position, action, reason → codes entiers + vocabulaire (meta.json)
+#       cartes     : hero (N,2) / board (N,5) int8 (-1 = absente), hand_class int16 (0..168)
+#     la colonne `raw` (JSON brut) n'est pas reprise
+#   - DecisionStore: colonnes ouvertes en mmap, filtres vectorisés, agrégats par bincount
+#       st = DecisionStore.open()
+#       st.rate("position", action="fold")              # taux de fold par position
+#       st.mean("confidence", by="street")              # confiance moyenne par street
+#       st.count(by="action", where=st.where(position=["BTN", "CO"], since="2025-08-01"))
+#   python -m src.tools.compact_decisions [--summary]
+# ──────────────────────────
+STORE_DIR = LOG_DIR / "decisions_cols"
+FORMAT_VERSION = 1
+SMALL_GROUPS = 32   # au-delà: bincount (une passe) plutôt qu'une comparaison par groupe
+
+NUMERIC = {"ts": np.int64, "street": np.int8, "spr": np.float32, "pot": np.float32, "stack": np.float32,
+           "size_bb": np.float32, "percent": np.float32, "confidence": np.float32, "id": np.uint64}
+STRINGS = ("model", "position", "action", "reason")
+CARDS = {"hero": ("hero_cards", 2), "board": ("board_cards", 5)}
+
+def log_files(log_dir: Path = LOG_DIR) -> List[Path]:
+    """Archives tournées (ordre chronologique) puis fichier actif."""
+    log_dir = Path(log_dir)
+    files = sorted(log_dir.glob(f"{LOG_PATH.stem}-*{LOG_PATH.suffix}"))
+    active = log_dir / LOG_PATH.name
+    return files + ([active] if active.exists() else [])
+
+def _num(s: Optional[str]) -> float:
+    try:
+        return float(s) if s not in (None, "") else np.nan
+    except ValueError:
+        return np.nan
+
+def _epoch(ts: List[str]) -> np.ndarray:
+    arr = np.array([t or "NaT" for t in ts], dtype="datetime64[s]")
+    return np.where(np.isnat(arr), 0, arr.astype(np.int64))
+
+def _encode(values: List[str]) -> Tuple[np.ndarray, List[str]]:
+    vocab: Dict[str, int] = {}
+    codes = np.fromiter((vocab.setdefault(v, len(vocab)) for v in values), np.int64, len(values))
+    dtype = np.uint8 if len(vocab) <= 0xFF else np.uint16 if len(vocab) <= 0xFFFF else np.uint32
+    return codes.astype(dtype), list(vocab)
+
+def _cards(values: List[str], width: int) -> np.ndarray:
+    out = np.full((len(values), width), CARD_NONE, np.int8)
+    for r, v in enumerate(values):
+        idx = [card_index(c) for c in (v or "").split()][:width]
+        out[r, :len(idx)] = idx
+    return out
+
+def compact_decisions(sources: Optional[Iterable[Path]] = None, out_dir: Path = STORE_DIR) -> Dict[str, Any]:
+    """CSV → colonnes .npy (remplacement atomique du dossier). Renvoie meta.json."""
+    sources = list(sources) if sources is not None else log_files()
+    cols: Dict[str, List[Any]] = {k: [] for k in (*NUMERIC, *STRINGS, "hero_cards", "board_cards")}
+    src_meta = []
+    for path in sources:
+        rows = 0
+        with Path(path).open(newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                for k in cols:
+                    cols[k].append(row.get(k))
+                rows += 1
+        st = Path(path).stat()
+        src_meta.append({"file": Path(path).name, "rows": rows, "size": st.st_size, "mtime": st.st_mtime})
+
+    n = len(cols["ts"])
+    arrays: Dict[str, np.ndarray] = {"ts": _epoch(cols["ts"])}
+    for k, dt in NUMERIC.items():
+        if k == "ts":
+            continue
+        vals = np.fromiter((_num(v) for v in cols[k]), np.float64, n)
+        if np.issubdtype(dt, np.integer):
+            vals = np.nan_to_num(vals, nan=-1 if k == "street" else 0)
+        arrays[k] = vals.astype(dt)
+    vocabs = {}
+    for k in STRINGS:
+        arrays[k], vocabs[k] = _encode([v or "" for v in cols[k]])
+    for name, (src, width) in CARDS.items():
+        arrays[name] = _cards(cols[src], width)
+    h = arrays["hero"].astype(np.int64)
+    ok = (h >= 0).all(axis=1)
+    arrays["hand_class"] = np.where(ok, CLASS_OF[np.where(ok, h[:, 0] * 52 + h[:, 1], 0)], -1).astype(np.int16)
+
+    out_dir = Path(out_dir)
+    tmp = out_dir.with_name(out_dir.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    for k, a in arrays.items():
+        np.save(tmp / f"{k}.npy", np.ascontiguousarray(a))
+    meta = {"version": FORMAT_VERSION, "rows": n, "created": time.time(),
+            "columns": {k: {"dtype": str(a.dtype), "shape": list(a.shape)} for k, a in arrays.items()},
+            "vocab": vocabs, "sources": src_meta}
+    (tmp / "meta.json").write_text(json.dumps(meta, ensure_ascii=False, indent=1), encoding="utf-8")
+    old = out_dir.with_name(out_dir.name + ".old")
+    shutil.rmtree(old, ignore_errors=True)
+    if out_dir.exists():
+        os.replace(out_dir, old)
+    os.replace(tmp, out_dir)
+    shutil.rmtree(old, ignore_errors=True)
+    return meta
+
+# ──────────────────────────
+# Requêtes
+# ──────────────────────────
+Value = Union[str, int, float, Sequence[Any]]
+
+def _ts(v: Union[str, int, float, datetime]) -> int:
+    if isinstance(v, datetime):
+        return int((v if v.tzinfo else v.replace(tzinfo=timezone.utc)).timestamp())
+    if isinstance(v, str):
+        return int(np.datetime64(v, "s").astype(np.int64))
+    return int(v)
+
+class DecisionStore:
+    """Colonnes mmap (np.load mmap_mode="r"), chargées à la demande."""
+    def __init__(self, path: Path = STORE_DIR):
+        self.path = Path(path)
+        self.meta = json.loads((self.path / "meta.json").read_text(encoding="utf-8"))
+        self.n = int(self.meta["rows"])
+        self._cols: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def open(cls, path: Path = STORE_DIR) -> "DecisionStore":
+        return cls(path)
+
+    def __len__(self) -> int:
+        return self.n
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.meta["columns"])
+
+    def col(self, name: str) -> np.ndarray:
+        a = self._cols.get(name)
+        if a is None:
+            if name not in self.meta["columns"]:
+                raise KeyError(f"colonne inconnue: {name}")
+            a = self._cols[name] = np.load(self.path / f"{name}.npy", mmap_mode="r")
+        return a
+
+    def vocab(self, name: str) -> List[str]:
+        return self.meta["vocab"].get(name, [])
+
+    def decode(self, name: str, codes) -> List[str]:
+        v = self.vocab(name)
+        return [v[int(c)] for c in np.atleast_1d(codes)]
+
+    # ---------- filtres ----------
+    def _match(self, name: str, value: Value) -> np.ndarray:
+        values = list(value) if isinstance(value, (list, tuple, set, frozenset)) else [value]
+        a = self.col(name)
+        if name in STRINGS:
+            vocab = {s: i for i, s in enumerate(self.vocab(name))}
+            values = [vocab[v] for v in values if v in vocab]
+        if len(values) <= SMALL_GROUPS:  # comparaisons vectorisées (SIMD), pas de tri
+            mask = np.zeros(self.n, bool)
+            for v in values:
+                mask |= a == np.asarray(v, a.dtype)
+            return mask
+        return np.isin(a, np.asarray(values, a.dtype))
+
+    def where(self, since=None, until=None, **filters: Value) -> np.ndarray:
+        """Masque bool (N,): égalité / appartenance par colonne, since ≤ ts < until."""
+        mask = np.ones(self.n, bool)
+        for name, value in filters.items():
+            mask &= self._match(name, value)
+        if since is not None:
+            mask &= self.col("ts") >= _ts(since)
+        if until is not None:
+            mask &= self.col("ts") < _ts(until)
+        return mask
+
+    # ---------- agrégats ----------
+    def _groups(self, by: str) -> Tuple[List[Any], np.ndarray, int]:
+        """(étiquettes, colonne, lo): la ligne i est dans le groupe a[i] - lo."""
+        a = self.col(by)
+        if a.ndim != 1:
+            raise ValueError(f"regroupement impossible sur {by} (colonne {a.ndim}D)")
+        if by in STRINGS:
+            return self.vocab(by), a, 0
+        if np.issubdtype(a.dtype, np.integer) and a.size:
+            lo, hi = int(a.min()), int(a.max())
+            if hi - lo < 1 << 16:  # petits entiers (street, hand_class): décalage, pas de tri
+                return list(range(lo, hi + 1)), a, lo
+        labels, inv = np.unique(a, return_inverse=True)
+        return labels.tolist(), inv, 0
+
+    @staticmethod
+    def _sums(a: np.ndarray, k: int, lo: int, weights: Optional[np.ndarray] = None,
+              sel: Optional[np.ndarray] = None) -> np.ndarray:
+        """Compte (ou somme de weights) par groupe, lignes `sel` seulement si donné."""
+        if k <= SMALL_GROUPS:  # une comparaison SIMD par groupe, sans extraire les lignes
+            out = np.empty(k)
+            for g in range(k):
+                m = a == np.asarray(lo + g, a.dtype)
+                if sel is not None:
+                    m &= sel
+                out[g] = np.count_nonzero(m) if weights is None else np.dot(m.view(np.uint8), weights)
+            return out
+        if sel is not None:
+            a, weights = a[sel], (None if weights is None else weights[sel])
+        return np.bincount(a.astype(np.intp) - lo, weights=weights, minlength=k)
+
+    def count(self, by: Optional[str] = None, where: Optional[np.ndarray] = None) -> Union[int, Dict[Any, int]]:
+        if by is None:
+            return self.n if where is None else int(np.count_nonzero(where))
+        labels, a, lo = self._groups(by)
+        counts = self._sums(a, len(labels), lo, sel=where)
+        return {labels[i]: int(c) for i, c in enumerate(counts) if c}
+
+    def mean(self, col: str, by: Optional[str] = None,
+             where: Optional[np.ndarray] = None) -> Union[float, Dict[Any, float]]:
+        """Moyenne de `col` (NaN ignorés), globale ou par groupe."""
+        vals = self.col(col)
+        sel = where
+        if np.issubdtype(vals.dtype, np.floating):
+            nan = np.isnan(vals)
+            if nan.any():
+                vals = np.where(nan, 0, vals)
+                sel = ~nan if sel is None else sel & ~nan
+        if by is None:
+            n = self.n if sel is None else int(np.count_nonzero(sel))
+            total = vals.sum(dtype=np.float64) if sel is None else np.dot(sel.view(np.uint8), vals)
+            return float(total / n) if n else float("nan")
+        labels, a, lo = self._groups(by)
+        counts = self._sums(a, len(labels), lo, sel=sel)
+        sums = self._sums(a, len(labels), lo, weights=vals, sel=sel)
+        return {labels[i]: float(sums[i] / counts[i]) for i in range(len(labels)) if counts[i]}
+
+    def rate(self, by: str, where: Optional[np.ndarray] = None, **match: Value) -> Dict[Any, float]:
+        """Part des décisions vérifiant `match` (ex. action="fold") dans chaque groupe `by`."""
+        hit = self.where(**match)
+        if where is not None:
+            hit &= where
+        labels, a, lo = self._groups(by)
+        counts = self._sums(a, len(labels), lo, sel=where)
+        hits = self._sums(a, len(labels), lo, sel=hit)
+        return {labels[i]: float(hits[i] / counts[i]) for i in range(len(labels)) if counts[i]}
@@ -0,0 +1,148 @@
+# src/policy/fast_policy.py
+from __future__ import annotations
+import os, threading, time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutTimeout
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.policy.single_flight import ask_policy_shared
+from src.policy.postprocess import finalize_action
+from src.policy.logger import append_decision
+from src.policy.preflop_chart import chart_decision
+
+# ──────────────────────────
+# Policy rapide déterministe + course contre le LLM
+#   - fast_policy(meta): équité (dbg featurize) vs cote du pot → réponse au format LLM
+#     en quelques µs (aucun appel réseau)
+#   - race_policy(): LLM lancé en tâche de fond; on_fast(réponse rapide) appelé tout de
+#     suite (sauf si le LLM/cache répond dans la grâce), puis réponse LLM si elle arrive
+#     avant l'échéance; sinon la réponse rapide reste.
+#     Réponses LLM en retard: journalisées (logs/decisions.csv, modèle "...(late)") et
+#     gardées par le cache de décisions; échecs comptés — jamais bloquants.
+#     Preflop: le chart (preflop_chart) répond d'abord; le LLM n'est lancé que sur "defer".
+# Env:
+#   POKERIA_FAST_POLICY=1            (0 = appel LLM bloquant comme avant)
+#   POKERIA_POLICY_DEADLINE_MS=1500
+#   POKERIA_POLICY_GRACE_MS=30       (attente avant d'afficher la réponse rapide)
+#   POKERIA_POLICY_WORKERS=2
+# ──────────────────────────
+DEADLINE_MS = float(os.getenv("POKERIA_POLICY_DEADLINE_MS", "1500"))
+GRACE_MS    = float(os.getenv("POKERIA_POLICY_GRACE_MS", "30"))
+RAISE_EDGE  = 0.20   # équité au-dessus de la part "équitable" 1/(n+1) → relance
+THIN_EDGE   = 0.05   # marge mini sur la cote pour payer
+
+def fast_enabled() -> bool:
+    return os.getenv("POKERIA_FAST_POLICY", "1") == "1"
+
+def fast_policy(meta: Dict[str, Any]) -> Dict[str, Any]:
+    """Réponse brute (même forme que ask_policy) à partir de meta["equity"] et de la cote."""
+    eq = meta.get("equity")
+    if eq is None or len(meta.get("hero_cards") or []) < 2:
+        return {"action": "none", "confidence": 0.0, "reason": "rapide: équité indisponible", "source": "fast"}
+    eq = float(eq)
+    n_opp = max(1, int(meta.get("opponents", 1) or 1))
+    pot = float(meta.get("pot_size", 0.0) or 0.0)
+    to_call = float(meta.get("to_call", 0.0) or 0.0)
+    odds = to_call / max(0.01, pot + to_call) if to_call > 0 else 0.0
+    fair = 1.0 / (n_opp + 1)
+
+    if eq >= fair + RAISE_EDGE and eq > odds + THIN_EDGE:
+        action, edge = "raise", eq - fair
+    elif to_call <= 0:
+        action, edge = "call", fair - eq   # check (rien à payer)
+    elif eq >= odds + THIN_EDGE:
+        action, edge = "call", eq - odds
+    else:
+        action, edge = "fold", odds - eq
+    conf = max(0.3, min(0.8, 0.5 + edge))
+    reason = f"rapide: équité {eq * 100:.0f}% vs {n_opp} adv., cote {odds * 100:.0f}%"
+    return {"action": action, "confidence": round(conf, 2), "reason": reason, "source": "fast"}
+
+# ──────────────────────────
+# Course LLM vs échéance
+# ──────────────────────────
+_POOL: Optional[ThreadPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+STATS = {"chart": 0, "fast": 0, "llm_on_time": 0, "llm_late": 0, "llm_failed": 0, "last_error": ""}
+_STATS_LOCK = threading.Lock()
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = ThreadPoolExecutor(max_workers=int(os.getenv("POKERIA_POLICY_WORKERS", "2")),
+                                           thread_name_prefix="policy-llm")
+    return _POOL
+
+def _count(key: str, err: str = ""):
+    with _STATS_LOCK:
+        STATS[key] += 1
+        if err:
+            STATS["last_error"] = err
+
+def _record_late(fut: Future, meta: Dict[str, Any], features_vec=None):
+    """Callback (thread du pool) d'une réponse arrivée après l'échéance."""
+    try:
+        raw = fut.result()
+    except Exception as e:
+        _count("llm_failed", f"{type(e).__name__}: {e}")
+        return
+    _count("llm_late")
+    try:
+        append_decision(os.getenv("OLLAMA_MODEL", "llama3.1:8b") + " (late)", meta, finalize_action(raw, meta), raw,
+                        features_vec)
+    except Exception:
+        pass
+
+def race_policy(features_vec, meta: Dict[str, Any],
+                on_fast: Optional[Callable[[Dict[str, Any]], None]] = None,
+                deadline_ms: Optional[float] = None) -> Tuple[Dict[str, Any], str]:
+    """
+    Renvoie (réponse brute, source) avec source ∈ {"chart", "llm", "fast"}.
+    on_fast(réponse rapide) est appelé au plus une fois, avant l'attente du LLM.
+    Bloque au plus `deadline_ms` (POKERIA_POLICY_DEADLINE_MS) — jamais la durée du LLM.
+    """
+    chart = chart_decision(meta)
+    if chart is not None:
+        _count("chart")
+        return chart, "chart"
+    if not fast_enabled():
+        return ask_policy_shared(features_vec, meta), "llm"
+    deadline_s = (DEADLINE_MS if deadline_ms is None else float(deadline_ms)) / 1000.0
+    t0 = time.perf_counter()
+    llm_meta = dict(meta)
+    fut = _get_pool().submit(ask_policy_shared, features_vec, llm_meta)
+    fast = fast_policy(meta)
+    try:
+        raw = fut.result(timeout=min(deadline_s, GRACE_MS / 1000.0))  # hit cache: pas de flash "rapide"
+        _count("llm_on_time")
+        return raw, "llm"
+    except FutTimeout:
+        pass
+    except Exception as e:
+        _count("llm_failed", f"{type(e).__name__}: {e}")
+        _count("fast")
+        return fast, "fast"
+
+    if on_fast is not None:
+        on_fast(fast)
+    try:
+        raw = fut.result(timeout=max(0.0, deadline_s - (time.perf_counter() - t0)))
+        _count("llm_on_time")
+        return raw, "llm"
+    except FutTimeout:
+        fut.add_done_callback(lambda f: _record_late(f, llm_meta, features_vec))
+    except Exception as e:
+        _count("llm_failed", f"{type(e).__name__}: {e}")
+    _count("fast")
+    return fast, "fast"
+
+def finalize_raced(raw: Dict[str, Any], meta: Dict[str, Any], source: str) -> Dict[str, Any]:
+    """finalize_action + provenance ("chart" / "fast" / "llm") pour l'affichage."""
+    action = finalize_action(raw, meta)
+    action["source"] = source
+    return action
+
+def race_stats() -> Dict[str, Any]:
+    with _STATS_LOCK:
+        return dict(STATS)
@@ -1,32 +1,256 @@
-import csv, json
+import atexit, csv, json, os, queue, struct, threading, time
+import numpy as np
 from pathlib import Path
 from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
 
 LOG_DIR = Path("logs"); LOG_DIR.mkdir(exist_ok=True)
 LOG_PATH = LOG_DIR/"decisions.csv"
 
 FIELDS = ["ts","model","street","position","spr","pot","stack",
-          "hero_cards","board_cards","action","size_bb","percent","confidence","reason","raw"]
-
-def append_decision(model: str, dbg: dict, decision: dict, raw: dict):
-    is_new = not LOG_PATH.exists()
-    with LOG_PATH.open("a", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=FIELDS)
-        if is_new: w.writeheader()
-        w.writerow({
-            "ts": datetime.utcnow().isoformat(timespec="seconds"),
-            "model": model,
-            "street": dbg.get("street"),
-            "position": dbg.get("position"),
-            "spr": round(float(dbg.get("spr", 0.0)), 2),
-            "pot": dbg.get("pot_size", 0.0),
-            "stack": dbg.get("hero_stack", 0.0),
-            "hero_cards": " ".join(dbg.get("hero_cards", [])),
-            "board_cards": " ".join(dbg.get("board_cards", [])),
-            "action": decision.get("type"),
-            "size_bb": decision.get("size_bb"),
-            "percent": decision.get("percent"),
-            "confidence": decision.get("confidence"),
-            "reason": decision.get("rationale"),
-            "raw": json.dumps(raw, ensure_ascii=False),
-        })
+          "hero_cards","board_cards","action","size_bb","percent","confidence","reason","raw","id"]
+
+# ──────────────────────────
+# Journal des décisions asynchrone
+#   - append_decision(): copie des champs utiles + put_nowait dans une file bornée
+#     (jamais bloquant: file pleine → ligne abandonnée et comptée)
+#   - thread écrivain: lots de lignes, un seul open/flush par lot
+#   - rotation par taille et par jour (UTC): decisions.csv → decisions-AAAAMMJJ-HHMMSS.csv
+#     (un en-tête différent de FIELDS déclenche aussi une rotation)
+#   - sidecar optionnel des vecteurs de features, relié au CSV par la colonne `id`:
+#       bin   → decisions.features.bin: enregistrements '<QdI' (id, ts, n) + n float32
+#       jsonl → decisions.features.jsonl: {"id","ts","x":[...]}
+# Env:
+#   POKERIA_LOG_ASYNC=1
+#   POKERIA_LOG_QUEUE=4096
+#   POKERIA_LOG_BATCH=256
+#   POKERIA_LOG_FLUSH_MS=500
+#   POKERIA_LOG_MAX_MB=20          (0 = pas de rotation par taille)
+#   POKERIA_LOG_SIDECAR=           ("" | bin | jsonl)
+# ──────────────────────────
+QUEUE_SIZE = int(os.getenv("POKERIA_LOG_QUEUE", "4096"))
+BATCH      = int(os.getenv("POKERIA_LOG_BATCH", "256"))
+FLUSH_S    = float(os.getenv("POKERIA_LOG_FLUSH_MS", "500")) / 1000.0
+MAX_BYTES  = int(float(os.getenv("POKERIA_LOG_MAX_MB", "20")) * 1024 * 1024)
+SIDECAR    = os.getenv("POKERIA_LOG_SIDECAR", "").strip().lower()
+SIDECAR_HEADER = struct.Struct("<QdI")
+
+def sidecar_path(csv_path: Path, kind: str = SIDECAR) -> Path:
+    return csv_path.with_name(f"{csv_path.stem}.features.{kind}")
+
+def read_feature_sidecar(path: Path) -> Tuple[np.ndarray, np.ndarray, List[np.ndarray]]:
+    """Sidecar bin/jsonl → (ids uint64, ts float64, vecteurs float32)."""
+    path = Path(path)
+    ids, ts, xs = [], [], []
+    if path.suffix == ".jsonl":
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except Exception:
+                    continue  # ligne tronquée
+                ids.append(int(rec["id"])); ts.append(float(rec["ts"]))
+                xs.append(np.asarray(rec["x"], np.float32))
+    else:
+        data = path.read_bytes()
+        off, hs = 0, SIDECAR_HEADER.size
+        while off + hs <= len(data):
+            i, t, n = SIDECAR_HEADER.unpack_from(data, off)
+            off += hs
+            if off + 4 * n > len(data):
+                break  # enregistrement tronqué
+            xs.append(np.frombuffer(data, np.float32, n, off).copy())
+            ids.append(i); ts.append(t)
+            off += 4 * n
+    return np.asarray(ids, np.uint64), np.asarray(ts, np.float64), xs
+
+def _row(rec: Dict[str, Any]) -> Dict[str, Any]:
+    dbg, decision = rec["dbg"], rec["decision"]
+    return {
+        "ts": datetime.utcfromtimestamp(rec["t"]).isoformat(timespec="seconds"),
+        "model": rec["model"],
+        "street": dbg.get("street"),
+        "position": dbg.get("position"),
+        "spr": round(float(dbg.get("spr", 0.0) or 0.0), 2),
+        "pot": dbg.get("pot_size", 0.0),
+        "stack": dbg.get("hero_stack", 0.0),
+        "hero_cards": " ".join(dbg.get("hero_cards") or []),
+        "board_cards": " ".join(dbg.get("board_cards") or []),
+        "action": decision.get("type"),
+        "size_bb": decision.get("size_bb"),
+        "percent": decision.get("percent"),
+        "confidence": decision.get("confidence"),
+        "reason": decision.get("rationale"),
+        "raw": json.dumps(rec["raw"], ensure_ascii=False, default=str),
+        "id": rec["id"],
+    }
+
+class DecisionLogger:
+    """File bornée + thread écrivain; write_batch() utilisable seul (mode synchrone)."""
+    def __init__(self, path: Path = LOG_PATH, sidecar: str = SIDECAR, max_bytes: int = MAX_BYTES,
+                 queue_size: int = QUEUE_SIZE, batch: int = BATCH, flush_s: float = FLUSH_S):
+        self.path, self.sidecar = Path(path), sidecar if sidecar in ("bin", "jsonl") else ""
+        self.max_bytes, self.batch, self.flush_s = int(max_bytes), max(1, int(batch)), float(flush_s)
+        self.q: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=max(1, int(queue_size)))
+        self.written = self.dropped = self.rotations = self.errors = 0
+        self._day: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._flushed = threading.Condition(self._lock)
+        self._pending = 0
+
+    # ---------- côté décision ----------
+    def submit(self, rec: Dict[str, Any]) -> bool:
+        # compté avant l'enfilage: l'écrivain peut décrémenter dès le put (flush() fiable)
+        with self._lock:
+            self._pending += 1
+        try:
+            self.q.put_nowait(rec)
+        except queue.Full:
+            with self._flushed:
+                self._pending -= 1
+                self.dropped += 1
+                self._flushed.notify_all()
+            return False
+        self._ensure_thread()
+        return True
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Attend l'écriture de tout ce qui est en file (outils, tests, sortie)."""
+        end = time.monotonic() + timeout
+        with self._flushed:
+            while self._pending > 0:
+                left = end - time.monotonic()
+                if left <= 0:
+                    return False
+                self._flushed.wait(left)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {"written": self.written, "dropped": self.dropped, "rotations": self.rotations,
+                "errors": self.errors, "queued": self.q.qsize()}
+
+    # ---------- thread écrivain ----------
+    def _ensure_thread(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="decision-logger", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                first = self.q.get(timeout=self.flush_s)
+            except queue.Empty:
+                continue
+            recs = [first]
+            deadline = time.monotonic() + self.flush_s
+            while len(recs) < self.batch:  # lot: attend au plus flush_s pour regrouper
+                try:
+                    recs.append(self.q.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            self.write_batch(recs)
+            with self._flushed:
+                self._pending -= len(recs)
+                self._flushed.notify_all()
+
+    def write_batch(self, recs: List[Dict[str, Any]]):
+        try:
+            self._maybe_rotate()
+            is_new = not self.path.exists()
+            with self.path.open("a", newline="", encoding="utf-8") as f:
+                w = csv.DictWriter(f, fieldnames=FIELDS)
+                if is_new: w.writeheader()
+                w.writerows(_row(r) for r in recs)
+            if self.sidecar:
+                self._write_sidecar([r for r in recs if r.get("x") is not None])
+            self.written += len(recs)
+        except Exception as e:
+            self.errors += 1
+            print("Decision log not written:", e)
+
+    def _write_sidecar(self, recs: List[Dict[str, Any]]):
+        if not recs:
+            return
+        path = sidecar_path(self.path, self.sidecar)
+        if self.sidecar == "jsonl":
+            with path.open("a", encoding="utf-8") as f:
+                for r in recs:
+                    f.write(json.dumps({"id": r["id"], "ts": round(r["t"], 3), "x": r["x"].tolist()}) + "\n")
+        else:
+            with path.open("ab") as f:
+                for r in recs:
+                    f.write(SIDECAR_HEADER.pack(r["id"], r["t"], r["x"].size))
+                    f.write(r["x"].tobytes())
+
+    # ---------- rotation ----------
+    def _maybe_rotate(self):
+        today = datetime.utcnow().strftime("%Y%m%d")
+        if not self.path.exists():
+            self._day = today
+            return
+        if self._day is None:  # 1er lot du processus: jour = date du fichier, en-tête à jour ?
+            self._day = datetime.utcfromtimestamp(self.path.stat().st_mtime).strftime("%Y%m%d")
+            with self.path.open(newline="", encoding="utf-8") as f:
+                header = next(csv.reader(f), None)
+            if header != FIELDS:
+                self._rotate(today)
+                return
+        if self._day != today or (self.max_bytes > 0 and self.path.stat().st_size >= self.max_bytes):
+            self._rotate(today)
+
+    def _rotate(self, today: str):
+        stamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+        dst = self.path.with_name(f"{self.path.stem}-{stamp}{self.path.suffix}")
+        n = 1
+        while dst.exists():
+            dst = self.path.with_name(f"{self.path.stem}-{stamp}-{n}{self.path.suffix}"); n += 1
+        os.replace(self.path, dst)
+        for kind in ("bin", "jsonl"):
+            side = sidecar_path(self.path, kind)
+            if side.exists():
+                os.replace(side, sidecar_path(dst, kind))
+        self._day = today
+        self.rotations += 1
+
+# ──────────────────────────
+# Singleton + API historique
+# ──────────────────────────
+_LOGGER: Optional[DecisionLogger] = None
+_LOGGER_LOCK = threading.Lock()
+_ID_LOCK = threading.Lock()
+_LAST_ID = 0
+
+def get_decision_logger() -> DecisionLogger:
+    global _LOGGER
+    if _LOGGER is None:
+        with _LOGGER_LOCK:
+            if _LOGGER is None:
+                _LOGGER = DecisionLogger()
+                atexit.register(_LOGGER.flush, 2.0)
+    return _LOGGER
+
+def _next_id() -> int:
+    """Identifiant unique croissant (µs epoch), clé de jointure CSV ↔ sidecar."""
+    global _LAST_ID
+    with _ID_LOCK:
+        _LAST_ID = max(_LAST_ID + 1, time.time_ns() // 1000)
+        return _LAST_ID
+
+def append_decision(model: str, dbg: dict, decision: dict, raw: dict, features=None):
+    """Enfile la décision (O(µs)); l'écriture CSV / sidecar se fait sur le thread du journal."""
+    log = get_decision_logger()
+    rec = {
+        "t": time.time(), "id": _next_id(), "model": model,
+        "dbg": {k: dbg.get(k) for k in ("street", "position", "spr", "pot_size", "hero_stack",
+                                       "hero_cards", "board_cards")},
+        "decision": dict(decision), "raw": raw,
+        "x": np.array(features, np.float32).ravel() if features is not None and log.sidecar else None,
+    }
+    if os.getenv("POKERIA_LOG_ASYNC", "1") == "1":
+        log.submit(rec)
+    else:
+        with _LOGGER_LOCK:
+            log.write_batch([rec])
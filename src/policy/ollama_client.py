@@ -1,7 +1,73 @@
-import requests, json, os, re
+import requests, json, os, re, threading, time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional
+from requests.adapters import HTTPAdapter
 
 OLLAMA = os.getenv("OLLAMA_HOST", "http://localhost:11434")
 
+# ──────────────────────────
+# Session HTTP persistante + réponses streamées
+#   - une requests.Session (keep-alive, pool de connexions) pour tout le process
+#   - stream=True: les fragments "message.content" sont accumulés et scannés au fil
+#     de l'eau; dès qu'un objet JSON complet contenant "action" est lu, le flux est
+#     fermé (Ollama interrompt la génération à la déconnexion)
+#   - keep_alive: le modèle reste chargé entre deux décisions
+# Env:
+#   OLLAMA_HOST / OLLAMA_MODEL
+#   POKERIA_OLLAMA_KEEP_ALIVE=30m
+#   POKERIA_OLLAMA_NUM_PREDICT=160     (tokens max générés)
+#   POKERIA_OLLAMA_CONNECT_TIMEOUT=3   (s)
+#   POKERIA_OLLAMA_READ_TIMEOUT=30     (s, entre deux fragments)
+#   POKERIA_OLLAMA_POOL=4              (connexions gardées ouvertes)
+#   POKERIA_OLLAMA_STREAM=1            (0 = réponse complète comme avant)
+#
+# Mode "hedge" (deux modèles locaux, rapide + lent)
+#   - la requête part sur OLLAMA_MODEL (rapide); le modèle lent n'est lancé que si le
+#     rapide n'a pas répondu après HEDGE_MS, échoue, ou répond avec une confiance < HEDGE_CONF
+#   - la 1re réponse valide (fold/call/raise) avant l'échéance l'emporte; la requête perdante
+#     est annulée (flux fermé → Ollama arrête la génération)
+#   - une réponse rapide peu confiante sert de repli si le modèle lent n'arrive pas à temps
+#   - latences / victoires / annulations par modèle et taux d'accord: hedge_stats()
+#   POKERIA_OLLAMA_HEDGE_MODEL=        (vide = pas de hedge)
+#   POKERIA_OLLAMA_HEDGE_MS=400        (délai avant de lancer le modèle lent)
+#   POKERIA_OLLAMA_HEDGE_CONF=0.6
+#   POKERIA_OLLAMA_HEDGE_DEADLINE_MS=8000
+# ──────────────────────────
+KEEP_ALIVE      = os.getenv("POKERIA_OLLAMA_KEEP_ALIVE", "30m")
+NUM_PREDICT     = int(os.getenv("POKERIA_OLLAMA_NUM_PREDICT", "160"))
+CONNECT_TIMEOUT = float(os.getenv("POKERIA_OLLAMA_CONNECT_TIMEOUT", "3"))
+READ_TIMEOUT    = float(os.getenv("POKERIA_OLLAMA_READ_TIMEOUT", "30"))
+POOL_SIZE       = int(os.getenv("POKERIA_OLLAMA_POOL", "4"))
+STREAM          = os.getenv("POKERIA_OLLAMA_STREAM", "1") == "1"
+HEDGE_MODEL     = os.getenv("POKERIA_OLLAMA_HEDGE_MODEL", "")
+HEDGE_MS        = float(os.getenv("POKERIA_OLLAMA_HEDGE_MS", "400"))
+HEDGE_CONF      = float(os.getenv("POKERIA_OLLAMA_HEDGE_CONF", "0.6"))
+HEDGE_DEADLINE_MS = float(os.getenv("POKERIA_OLLAMA_HEDGE_DEADLINE_MS", "8000"))
+VALID_ACTIONS   = ("fold", "call", "raise")
+
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
+
+def get_session() -> requests.Session:
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, POOL_SIZE), max_retries=0)
+                s.mount("http://", adapter)
+                s.mount("https://", adapter)
+                _SESSION = s
+    return _SESSION
+
+def close_session():
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is not None:
+            _SESSION.close()
+            _SESSION = None
+
 def _parse_streaming_json(text: str):
     last = None
     for line in text.splitlines():
@@ -23,10 +89,97 @@ def _extract_json_block(s: str) -> str:
     m = re.search(r"\{.*\}", s, flags=re.DOTALL)
     return m.group(0) if m else s
 
-def ask_policy(features_vec, meta):
+class JsonObjectScanner:
     """
-    Appelle Ollama et renvoie un dict Python (pas de promesse de forme finale).
+    Scan incrémental d'un texte qui arrive par morceaux: renvoie chaque objet JSON
+    de 1er niveau dès que son accolade fermante est lue (chaînes/échappements gérés).
     """
+    def __init__(self):
+        self.buf = []
+        self.depth = 0
+        self.in_str = False
+        self.esc = False
+
+    def feed(self, chunk: str):
+        out = []
+        for ch in chunk:
+            if self.depth == 0:
+                if ch == "{":
+                    self.depth, self.buf = 1, ["{"]
+                continue
+            self.buf.append(ch)
+            if self.in_str:
+                if self.esc:
+                    self.esc = False
+                elif ch == "\\":
+                    self.esc = True
+                elif ch == '"':
+                    self.in_str = False
+            elif ch == '"':
+                self.in_str = True
+            elif ch == "{":
+                self.depth += 1
+            elif ch == "}":
+                self.depth -= 1
+                if self.depth == 0:
+                    try:
+                        out.append(json.loads("".join(self.buf)))
+                    except Exception:
+                        pass
+                    self.buf = []
+        return out
+
+def _read_stream(r: requests.Response, cancel: Optional["CancelToken"] = None):
+    """Lit le flux NDJSON d'Ollama; (objet action, texte complet) avec arrêt anticipé."""
+    scanner = JsonObjectScanner()
+    content = []
+    try:
+        for line in r.iter_lines(decode_unicode=True):
+            if cancel is not None and cancel.cancelled:
+                break
+            if not line:
+                continue
+            try:
+                frag = json.loads(line)
+            except Exception:
+                continue
+            piece = (frag.get("message") or {}).get("content", "")
+            if piece:
+                content.append(piece)
+                for obj in scanner.feed(piece):
+                    if isinstance(obj, dict) and "action" in obj:
+                        return obj, "".join(content)
+            if frag.get("done"):
+                break
+    finally:
+        r.close()  # fermeture = fin de génération côté Ollama si on s'arrête tôt
+    return None, "".join(content)
+
+class CancelToken:
+    """Annulation d'une requête en cours: ferme la réponse HTTP (depuis n'importe quel thread)."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._resp: Optional[requests.Response] = None
+        self.cancelled = False
+
+    def attach(self, r: requests.Response):
+        with self._lock:
+            self._resp = r
+            if not self.cancelled:
+                return
+        r.close()
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            r = self._resp
+        if r is not None:
+            try:
+                r.close()
+            except Exception:
+                pass
+
+def _messages(features_vec, meta) -> List[Dict[str, str]]:
     sys_msg = {
         "role": "system",
         "content": (
@@ -41,28 +194,194 @@ def ask_policy(features_vec, meta):
         "content": (
             f"STREET={meta['street']} POS={meta['position']} SPR={meta['spr']:.2f}\n"
             f"HAND={meta.get('hero_cards','?')} BOARD={meta.get('board_cards','?')}\n"
+            + (f"EQUITY={100 * meta['equity']:.1f}% vs {int(meta.get('opponents', 1))} opp\n"
+               if 'equity' in meta else "") +
             f"FEATURES_HEAD={list(map(float, features_vec[:32]))}"
         )
     }
+    return [sys_msg, user_msg]
+
+def _chat(model: str, messages, cancel: Optional[CancelToken] = None) -> Dict[str, Any]:
     body = {
-        "model": os.getenv("OLLAMA_MODEL", "llama3.1:8b"),
-        "messages": [sys_msg, user_msg],
+        "model": model,
+        "messages": messages,
         "format": "json",
-        "stream": False,  # IMPORTANT: pas de streaming ici
-        "options": {"temperature": 0.2, "top_p": 0.9}
+        "stream": STREAM,
+        "keep_alive": KEEP_ALIVE,
+        "options": {"temperature": 0.2, "top_p": 0.9, "num_predict": NUM_PREDICT}
     }
-    r = requests.post(f"{OLLAMA}/api/chat", json=body, timeout=60)
-    r.raise_for_status()
-
-    # essaye d'abord la réponse non streamée
+    r = get_session().post(f"{OLLAMA}/api/chat", json=body, stream=STREAM,
+                           timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+    if cancel is not None:
+        cancel.attach(r)
     try:
-        obj = r.json()
+        r.raise_for_status()
     except Exception:
-        obj = _parse_streaming_json(r.text)
+        r.close()
+        raise
 
-    content = obj.get("message", {}).get("content", "")
+    if STREAM:
+        obj, content = _read_stream(r, cancel)
+        if obj is not None:
+            return obj
+    else:
+        # essaye d'abord la réponse non streamée
+        try:
+            obj = r.json()
+        except Exception:
+            obj = _parse_streaming_json(r.text)
+        content = obj.get("message", {}).get("content", "")
     try:
         return json.loads(_extract_json_block(content))
     except Exception:
         # si l’IA renvoie qqchose d’inattendu, renvoie 'none'
         return {"action": "none", "reason": "unparsable LLM output"}
+
+# ──────────────────────────
+# Statistiques par modèle (réglage du délai de hedge)
+# ──────────────────────────
+_STATS_LOCK = threading.Lock()
+_MODEL_STATS: Dict[str, Dict[str, Any]] = {}
+HEDGE_STATS = {"requests": 0, "fast_only": 0, "hedged": 0, "fallback": 0, "deadline": 0,
+               "compared": 0, "agree": 0}
+
+def _model_stats(model: str) -> Dict[str, Any]:
+    st = _MODEL_STATS.get(model)
+    if st is None:
+        st = _MODEL_STATS[model] = {"calls": 0, "valid": 0, "failed": 0, "cancelled": 0, "wins": 0,
+                                    "lat_ms": deque(maxlen=256)}
+    return st
+
+def _bump(key: str, model: Optional[str] = None):
+    with _STATS_LOCK:
+        if model is None:
+            HEDGE_STATS[key] += 1
+        else:
+            _model_stats(model)[key] += 1
+
+def _timed_chat(model: str, messages, cancel: CancelToken) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    try:
+        obj = _chat(model, messages, cancel)
+    except Exception:
+        _bump("cancelled" if cancel.cancelled else "failed", model)
+        raise
+    ms = (time.perf_counter() - t0) * 1000.0
+    with _STATS_LOCK:
+        st = _model_stats(model)
+        st["calls"] += 1
+        if cancel.cancelled:
+            st["cancelled"] += 1
+        else:
+            st["lat_ms"].append(ms)
+            st["valid"] += int(_valid(obj))
+    return obj
+
+def _valid(obj) -> bool:
+    return isinstance(obj, dict) and str(obj.get("action", "")).strip().lower() in VALID_ACTIONS
+
+def _confidence(obj: Dict[str, Any]) -> float:
+    try:
+        return float(obj.get("confidence", 0.7))  # même défaut que finalize_action
+    except Exception:
+        return 0.0
+
+def _valid_result(fut: Future) -> Optional[Dict[str, Any]]:
+    if not fut.done() or fut.cancelled() or fut.exception() is not None:
+        return None
+    obj = fut.result()
+    return obj if _valid(obj) else None
+
+def _compare(a: Optional[Dict[str, Any]], b: Optional[Dict[str, Any]]):
+    if a is None or b is None:
+        return
+    with _STATS_LOCK:
+        HEDGE_STATS["compared"] += 1
+        HEDGE_STATS["agree"] += int(str(a["action"]).lower() == str(b["action"]).lower())
+
+def hedge_stats() -> Dict[str, Any]:
+    def pct(xs, q):
+        return round(xs[min(len(xs) - 1, int(q * len(xs)))], 1) if xs else None
+    with _STATS_LOCK:
+        models = {}
+        for m, st in _MODEL_STATS.items():
+            lat = sorted(st["lat_ms"])
+            models[m] = {**{k: v for k, v in st.items() if k != "lat_ms"},
+                         "p50_ms": pct(lat, 0.5), "p90_ms": pct(lat, 0.9)}
+        out = dict(HEDGE_STATS)
+    out["agree_rate"] = round(out["agree"] / out["compared"], 3) if out["compared"] else None
+    out["models"] = models
+    return out
+
+_POOL: Optional[ThreadPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = ThreadPoolExecutor(max_workers=max(2, POOL_SIZE), thread_name_prefix="ollama-hedge")
+    return _POOL
+
+def ask_policy_hedged(features_vec, meta, fast_model: str, slow_model: str) -> Dict[str, Any]:
+    """Modèle rapide d'abord, modèle lent en couverture; 1re réponse valide avant l'échéance."""
+    messages = _messages(features_vec, meta)
+    deadline = time.perf_counter() + HEDGE_DEADLINE_MS / 1000.0
+    _bump("requests")
+    fast_tok, slow_tok = CancelToken(), CancelToken()
+    fast_fut = _get_pool().submit(_timed_chat, fast_model, messages, fast_tok)
+
+    wait([fast_fut], timeout=min(HEDGE_MS, HEDGE_DEADLINE_MS) / 1000.0)
+    fast = _valid_result(fast_fut)
+    if fast is not None and _confidence(fast) >= HEDGE_CONF:
+        _bump("fast_only")
+        _bump("wins", fast_model)
+        return fast
+
+    _bump("hedged")
+    slow_fut = _get_pool().submit(_timed_chat, slow_model, messages, slow_tok)
+    fallback = fast                      # réponse rapide peu confiante (ou None)
+    pending = {slow_fut} if fast_fut.done() else {slow_fut, fast_fut}
+    winner = None
+    while pending and winner is None:
+        done, pending = wait(pending, timeout=max(0.0, deadline - time.perf_counter()),
+                             return_when=FIRST_COMPLETED)
+        if not done:
+            break                        # échéance
+        if slow_fut in done and (obj := _valid_result(slow_fut)) is not None:
+            winner = (slow_model, obj)
+        elif fast_fut in done and (obj := _valid_result(fast_fut)) is not None:
+            if _confidence(obj) >= HEDGE_CONF:
+                winner = (fast_model, obj)
+            else:
+                fallback = obj
+
+    # annule la requête perdante / en retard
+    for fut, tok in ((fast_fut, fast_tok), (slow_fut, slow_tok)):
+        if not fut.done():
+            fut.cancel()
+            tok.cancel()
+
+    if winner is not None:
+        model, obj = winner
+        other = _valid_result(fast_fut) if model == slow_model else _valid_result(slow_fut)
+        _compare(obj, other)
+        _bump("wins", model)
+        return obj
+    if fallback is not None:
+        _bump("fallback")
+        _bump("wins", fast_model)
+        return fallback
+    _bump("deadline")
+    return {"action": "none", "reason": "hedge: no valid answer before deadline"}
+
+def ask_policy(features_vec, meta):
+    """
+    Appelle Ollama et renvoie un dict Python (pas de promesse de forme finale).
+    Si POKERIA_OLLAMA_HEDGE_MODEL est défini: mode hedge (rapide + lent).
+    """
+    model = os.getenv("OLLAMA_MODEL", "llama3.1:8b")
+    if HEDGE_MODEL and HEDGE_MODEL != model:
+        return ask_policy_hedged(features_vec, meta, model, HEDGE_MODEL)
+    return _timed_chat(model, _messages(features_vec, meta), CancelToken())
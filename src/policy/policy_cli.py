@@ -1,5 +1,5 @@
 import os, time, argparse
-from src.policy.policy_llm import recommend
+from src.policy.policy_llm import recommend_with_features
 from src.policy.postprocess import finalize_action
 from src.policy.logger import append_decision
 
@@ -11,9 +11,9 @@ def main():
     args = ap.parse_args()
 
     def step():
-        raw, dbg = recommend()               # brut LLM ou guard
+        raw, dbg, x = recommend_with_features()   # brut LLM ou guard
         dec = finalize_action(raw, dbg)      # normalisé & sized
-        append_decision(args.model, dbg, dec, raw)
+        append_decision(args.model, dbg, dec, raw, x)
         print(f"[{dbg.get('position','?')}] street={dbg.get('street')} spr={dbg.get('spr'):.2f} "
               f"hand={dbg.get('hero_cards')} board={dbg.get('board_cards')}  -> {dec}")
 
@@ -1,23 +1,31 @@
 from src.state.builder import build_state
 from src.featurize.features import featurize
-from src.policy.ollama_client import ask_policy
+from src.policy.single_flight import ask_policy_shared
+from src.policy.preflop_chart import chart_decision
+from src.state.hand_tracker import policy_allowed
 
 def recommend():
     """
     Renvoie (raw_action_dict, dbg_meta_dict)
-    - Garde-fou: si Héro <2 cartes -> action 'none'.
+    - Garde-fou: si Héro <2 cartes ou pas son tour -> action 'none'.
     """
+    raw, dbg, _ = recommend_with_features()
+    return raw, dbg
+
+def recommend_with_features():
+    """Comme recommend(), + vecteur de features (None si garde-fou) pour le journal."""
     st = build_state()
 
-    # Pas de cartes héro -> aucune action
-    if len(st.hero_cards) < 2:
+    # Pas de cartes héro / pas au héros de jouer -> aucune action
+    if len(st.hero_cards) < 2 or not policy_allowed(st):
         dbg = {
             "street": 0, "position": "unknown", "spr": 0.0,
             "hero_cards": st.hero_cards, "board_cards": st.community_cards,
             "pot_size": float(st.pot_size), "hero_stack": float(st.hero_stack),
             "to_call": float(st.to_call),
         }
-        return {"action":"none","reason":"hero cards missing"}, dbg
+        reason = "hero cards missing" if len(st.hero_cards) < 2 else f"not hero turn ({st.phase})"
+        return {"action":"none","reason":reason}, dbg, None
 
     x, names, dbg = featurize(st)
     dbg["hero_cards"]  = st.hero_cards
@@ -26,5 +34,7 @@ def recommend():
     dbg["hero_stack"]  = float(st.hero_stack)
     dbg["to_call"]     = float(st.to_call)
 
-    raw = ask_policy(x, dbg)  # dict (non normalisé)
-    return raw, dbg
+    raw = chart_decision(dbg)  # preflop: chart de la room (µs), None → LLM
+    if raw is None:
+        raw = ask_policy_shared(x, dbg)  # dict (non normalisé)
+    return raw, dbg, x
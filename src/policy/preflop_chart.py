@@ -0,0 +1,179 @@
+# src/policy/preflop_chart.py
+from __future__ import annotations
+import csv, os, threading, time
+import numpy as np
+import yaml
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.config.settings import ROOMS_DIR, ACTIVE_ROOM
+from src.featurize.cards_utils import card_index
+from src.featurize.features import POS_INDEX
+from src.featurize.preflop import hand_class, N_CLASSES
+from src.featurize.ranges import parse_range, COMBO_CLASS
+from src.policy.postprocess import get_bb_value
+
+# ──────────────────────────
+# Charts preflop (court-circuit du LLM)
+#   - table uint8 [position (POS_INDEX, 7) × action subie (4) × classe de main (169)]
+#     codes: 0 = defer (→ LLM), 1 = fold, 2 = call/check, 3 = raise
+#   - action subie d'après to_call en bb: unopened (≤ 1 bb), open (≤ 4 bb), 3bet (≤ 12 bb), 4bet
+#   - source éditable par room: assets/rooms/<room>.preflop.yaml (ou .csv), rechargée
+#     quand le fichier change (vérif. mtime ≤ 1×/s)
+#   YAML:
+#     sizes: {unopened: 2.5, open: 3.0, 3bet: 2.3, 4bet: 2.2}  # bb si unopened, sinon × montant à suivre
+#     charts:
+#       BTN:                       # ou "*" = toutes positions (surchargé par la position)
+#         unopened: {raise: "22+,A2s+,...", rest: fold}
+#         open:     {raise: "QQ+,AK", call: "22-JJ,AQs", defer: "A5s"}
+#   CSV: position,facing,action,range  (action "rest" → range = action par défaut de la cellule)
+#   Cellule absente → defer. Classes non citées d'une cellule → `rest` (fold par défaut).
+# Env:
+#   POKERIA_PREFLOP_CHART=<chemin>   (défaut: room active)
+#   POKERIA_CHART=1                  (0 = preflop envoyé au LLM)
+# ──────────────────────────
+CODES = ("defer", "fold", "call", "raise")
+DEFER, FOLD, CALL, RAISE = range(4)
+FACING = ("unopened", "open", "3bet", "4bet")
+FACING_EDGES_BB = (1.0, 4.0, 12.0)
+DEFAULT_SIZES = {"unopened": 2.5, "open": 3.0, "3bet": 2.3, "4bet": 2.2}
+
+def chart_path(room: Optional[str] = None) -> Path:
+    env = os.getenv("POKERIA_PREFLOP_CHART")
+    if env:
+        return Path(env)
+    yaml_p = ROOMS_DIR / f"{room or ACTIVE_ROOM}.preflop.yaml"
+    csv_p = yaml_p.with_suffix(".csv")
+    return csv_p if csv_p.exists() and not yaml_p.exists() else yaml_p
+
+def facing_bucket(to_call_bb: float) -> int:
+    for k, edge in enumerate(FACING_EDGES_BB):
+        if to_call_bb <= edge:
+            return k
+    return len(FACING_EDGES_BB)
+
+def _class_mask(text: str) -> np.ndarray:
+    """Range → masque bool (169,) des classes citées (au moins un combo de poids > 0)."""
+    out = np.zeros(N_CLASSES, dtype=bool)
+    out[COMBO_CLASS[parse_range(text) > 0]] = True
+    return out
+
+class PreflopChart:
+    __slots__ = ("table", "sizes", "path", "mtime")
+
+    def __init__(self, table: Optional[np.ndarray] = None, sizes: Optional[Dict[str, float]] = None,
+                 path: Optional[Path] = None, mtime: float = 0.0):
+        self.table = table if table is not None else np.zeros((len(POS_INDEX), len(FACING), N_CLASSES), np.uint8)
+        self.sizes = {**DEFAULT_SIZES, **(sizes or {})}
+        self.path, self.mtime = path, mtime
+
+    # ---------- construction ----------
+    def set_cell(self, pos: str, facing: str, spec: Dict[str, str]):
+        """spec = {action: range, ..., "rest": action}; pos "*" = toutes les positions."""
+        if facing not in FACING:
+            raise ValueError(f"chart: action subie inconnue {facing!r}")
+        poss = list(range(len(POS_INDEX))) if pos == "*" else [POS_INDEX[pos]] if pos in POS_INDEX else None
+        if poss is None:
+            raise ValueError(f"chart: position inconnue {pos!r}")
+        f = FACING.index(facing)
+        row = np.full(N_CLASSES, CODES.index(str(spec.get("rest", "fold"))), dtype=np.uint8)
+        for action in ("fold", "call", "raise", "defer"):
+            text = spec.get(action)
+            if text:
+                row[_class_mask(str(text))] = CODES.index(action)
+        for p in poss:
+            self.table[p, f] = row
+
+    @classmethod
+    def from_yaml(cls, data: Dict[str, Any], path: Optional[Path] = None, mtime: float = 0.0) -> "PreflopChart":
+        ch = cls(sizes=data.get("sizes"), path=path, mtime=mtime)
+        charts = data.get("charts") or {}
+        # "*" d'abord: les positions explicites le surchargent
+        for pos in sorted(charts, key=lambda p: p != "*"):
+            for facing, spec in (charts[pos] or {}).items():
+                ch.set_cell(str(pos), str(facing), spec or {})
+        return ch
+
+    @classmethod
+    def from_csv(cls, rows, path: Optional[Path] = None, mtime: float = 0.0) -> "PreflopChart":
+        specs: Dict[tuple, Dict[str, str]] = {}
+        for r in rows:
+            key = (r["position"].strip(), r["facing"].strip())
+            specs.setdefault(key, {})[r["action"].strip()] = (r.get("range") or "").strip()
+        data = {"charts": {}}
+        for (pos, facing), spec in specs.items():
+            data["charts"].setdefault(pos, {})[facing] = spec
+        return cls.from_yaml(data, path, mtime)
+
+    # ---------- lecture ----------
+    def lookup(self, pos_idx: int, facing_idx: int, cls_idx: int) -> int:
+        return int(self.table[pos_idx, facing_idx, cls_idx])
+
+    def decide(self, meta: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Réponse brute (forme LLM) pour un spot preflop, None si hors chart / defer."""
+        if int(meta.get("street", 0) or 0) != 0:
+            return None
+        hero = [card_index(c) for c in meta.get("hero_cards") or []]
+        hero = [i for i in hero if i >= 0]
+        pos = POS_INDEX.get(str(meta.get("position", "unknown")), POS_INDEX["unknown"])
+        if len(hero) < 2 or pos == POS_INDEX["unknown"]:
+            return None
+        c = hand_class(hero[0], hero[1])
+        if c < 0:
+            return None
+        blinds = meta.get("blinds") or (0, 0)
+        bb = float(blinds[1]) if len(blinds) > 1 and blinds[1] else get_bb_value()
+        to_call_bb = float(meta.get("to_call", 0.0) or 0.0) / max(1e-9, bb)
+        f = facing_bucket(to_call_bb)
+        code = self.lookup(pos, f, c)
+        if code == DEFER:
+            return None
+        out = {"action": CODES[code], "confidence": 0.85, "source": "chart",
+               "reason": f"chart preflop {FACING[f]}"}
+        if code == RAISE:
+            mult = float(self.sizes.get(FACING[f], DEFAULT_SIZES[FACING[f]]))
+            out["size_bb"] = round(mult if f == 0 else mult * max(1.0, to_call_bb), 2)
+        return out
+
+def load_chart(path: Path) -> Optional[PreflopChart]:
+    path = Path(path)
+    if not path.exists():
+        return None
+    mtime = path.stat().st_mtime
+    if path.suffix.lower() == ".csv":
+        with path.open(newline="", encoding="utf-8") as f:
+            return PreflopChart.from_csv(csv.DictReader(f), path, mtime)
+    return PreflopChart.from_yaml(yaml.safe_load(path.read_text(encoding="utf-8")) or {}, path, mtime)
+
+# ──────────────────────────
+# Singleton (rechargé si le fichier est modifié)
+# ──────────────────────────
+_CHART: Optional[PreflopChart] = None
+_CHECKED = 0.0
+_LOCK = threading.Lock()
+
+def chart_enabled() -> bool:
+    return os.getenv("POKERIA_CHART", "1") == "1"
+
+def get_preflop_chart() -> Optional[PreflopChart]:
+    global _CHART, _CHECKED
+    now = time.monotonic()
+    if now - _CHECKED < 1.0:
+        return _CHART
+    with _LOCK:
+        _CHECKED = now
+        path = chart_path()
+        try:
+            mtime = path.stat().st_mtime if path.exists() else 0.0
+            if _CHART is None or _CHART.path != path or _CHART.mtime != mtime:
+                _CHART = load_chart(path)
+        except Exception as e:
+            print("Preflop chart not loaded:", e)
+    return _CHART
+
+def chart_decision(meta: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Court-circuit preflop: réponse du chart, ou None (→ LLM)."""
+    if not chart_enabled():
+        return None
+    ch = get_preflop_chart()
+    return ch.decide(meta) if ch is not None else None
@@ -0,0 +1,210 @@
+# src/policy/single_flight.py
+from __future__ import annotations
+import hmac, json, os, socket, socketserver, threading, time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.policy.decision_cache import ask_policy_cached, decision_key
+
+# ──────────────────────────
+# Single-flight des appels policy
+#   - threads: des demandes concurrentes sur le même spot canonique (decision_key)
+#     partagent un seul appel en vol et son résultat
+#   - processus: petit broker local (TCP 127.0.0.1, une ligne JSON par requête).
+#     Le 1er processus qui réussit à ouvrir le port devient le broker (thread démon);
+#     les autres (overlay, overlay compact, policy_cli --watch) lui envoient leurs
+#     demandes. Broker absent / tombé → appel local (et reprise du port au besoin).
+#     Désactivé par défaut (tout processus local peut parler au port): l'activer
+#     avec POKERIA_POLICY_BROKER=1, de préférence avec un jeton partagé
+#     (requêtes sans le bon jeton refusées).
+# Env:
+#   POKERIA_SINGLE_FLIGHT=1
+#   POKERIA_POLICY_BROKER=0
+#   POKERIA_POLICY_BROKER_TOKEN=       (jeton partagé, identique dans chaque processus)
+#   POKERIA_POLICY_BROKER_PORT=47311
+#   POKERIA_POLICY_BROKER_TIMEOUT=60   (s, attente de la réponse du broker)
+# ──────────────────────────
+BROKER_HOST = "127.0.0.1"
+BROKER_PORT = int(os.getenv("POKERIA_POLICY_BROKER_PORT", "47311"))
+BROKER_TIMEOUT = float(os.getenv("POKERIA_POLICY_BROKER_TIMEOUT", "60"))
+RETRY_S = 1.0   # délai mini entre deux tentatives de prise du port
+
+def single_flight_enabled() -> bool:
+    return os.getenv("POKERIA_SINGLE_FLIGHT", "1") == "1"
+
+def broker_enabled() -> bool:
+    return os.getenv("POKERIA_POLICY_BROKER", "0") == "1"
+
+def _broker_token() -> str:
+    return os.getenv("POKERIA_POLICY_BROKER_TOKEN", "")
+
+class _Call:
+    __slots__ = ("done", "result", "exc")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.exc: Optional[BaseException] = None
+
+class SingleFlight:
+    """do(key, fn, *args) → (résultat, partagé?); un seul fn en vol par clé."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.leaders = self.shared = 0
+
+    def do(self, key: str, fn: Callable[..., Any], *args) -> Tuple[Any, bool]:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.shared += 1
+        if not leader:
+            call.done.wait()
+            if call.exc is not None:
+                raise call.exc
+            return call.result, True
+        try:
+            call.result = fn(*args)
+        except BaseException as e:
+            call.exc = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+_FLIGHT = SingleFlight()
+STATS = {"remote": 0, "remote_failed": 0, "served": 0}
+_STATS_LOCK = threading.Lock()
+
+def _count(key: str):
+    with _STATS_LOCK:
+        STATS[key] += 1
+
+def _ask(features_vec, meta) -> Tuple[Dict[str, Any], bool]:
+    raw = ask_policy_cached(features_vec, meta)
+    return raw, bool(meta.get("policy_cached"))
+
+def _local(key: str, features_vec, meta) -> Tuple[Dict[str, Any], bool, bool]:
+    (raw, cached), shared = _FLIGHT.do(key, _ask, features_vec, meta)
+    return dict(raw), cached, shared
+
+# ──────────────────────────
+# Broker inter-processus
+# ──────────────────────────
+def _jsonable(o):
+    return o.tolist() if hasattr(o, "tolist") else str(o)
+
+class _BrokerHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            req = json.loads(self.rfile.readline())
+            if not hmac.compare_digest(str(req.get("token", "")).encode(), _broker_token().encode()):
+                resp = {"denied": True}
+            else:
+                raw, cached, shared = _local(req["key"], req["features"], req["meta"])
+                resp = {"raw": raw, "cached": cached, "shared": shared}
+                _count("served")
+        except Exception as e:
+            resp = {"error": f"{type(e).__name__}: {e}"}
+            _count("served")
+        try:
+            self.wfile.write((json.dumps(resp, ensure_ascii=False, default=_jsonable) + "\n").encode("utf-8"))
+        except OSError:
+            pass  # client parti (échéance dépassée de son côté)
+
+class _BrokerServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    # un seul broker par port (élection par bind): SO_REUSEADDR tolère TIME_WAIT sous
+    # Linux/macOS sans accepter un 2e listener; sous Windows il l'accepterait → exclusif
+    allow_reuse_address = os.name != "nt"
+
+    def server_bind(self):
+        if hasattr(socket, "SO_EXCLUSIVEADDRUSE"):
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+        super().server_bind()
+
+_SERVER: Optional[_BrokerServer] = None
+_SERVER_LOCK = threading.Lock()
+_LAST_TRY = 0.0
+
+def _own_broker() -> bool:
+    """True si ce processus est (ou vient de devenir) le broker."""
+    global _SERVER, _LAST_TRY
+    if _SERVER is not None:
+        return True
+    now = time.monotonic()
+    if now - _LAST_TRY < RETRY_S:
+        return False
+    with _SERVER_LOCK:
+        if _SERVER is not None:
+            return True
+        _LAST_TRY = now
+        try:
+            srv = _BrokerServer((BROKER_HOST, BROKER_PORT), _BrokerHandler)
+        except OSError:
+            return False  # port pris: un autre processus est le broker
+        threading.Thread(target=srv.serve_forever, name="policy-broker", daemon=True).start()
+        _SERVER = srv
+    return True
+
+def stop_broker():
+    global _SERVER
+    with _SERVER_LOCK:
+        if _SERVER is not None:
+            _SERVER.shutdown()
+            _SERVER.server_close()
+            _SERVER = None
+
+def _remote(key: str, features_vec, meta) -> Tuple[Dict[str, Any], bool, bool]:
+    req = {"key": key, "features": features_vec, "meta": meta, "token": _broker_token()}
+    with socket.create_connection((BROKER_HOST, BROKER_PORT), timeout=BROKER_TIMEOUT) as s:
+        s.sendall((json.dumps(req, ensure_ascii=False, default=_jsonable) + "\n").encode("utf-8"))
+        with s.makefile("rb") as f:
+            line = f.readline()
+    if not line:
+        raise ConnectionError("policy broker: réponse vide")
+    resp = json.loads(line)
+    if resp.get("denied"):
+        raise PermissionError("policy broker: jeton refusé")  # OSError → appel local
+    if "error" in resp:
+        raise RuntimeError(f"policy broker: {resp['error']}")
+    return resp["raw"], bool(resp.get("cached")), bool(resp.get("shared"))
+
+# ──────────────────────────
+# Point d'entrée
+# ──────────────────────────
+def ask_policy_shared(features_vec, meta) -> Dict[str, Any]:
+    """
+    ask_policy_cached() avec coalescence des demandes identiques (threads + processus).
+    meta["policy_cached"] / meta["policy_shared"] indiquent un hit cache / un appel partagé.
+    """
+    key = decision_key(meta) if single_flight_enabled() else None
+    if key is None:
+        return ask_policy_cached(features_vec, meta)
+    if broker_enabled() and not _own_broker():
+        try:
+            raw, cached, shared = _remote(key, features_vec, meta)
+            _count("remote")
+            meta["policy_cached"], meta["policy_shared"] = cached, shared
+            return raw
+        except (OSError, ValueError):
+            _count("remote_failed")  # broker absent / tombé → appel local
+    raw, cached, shared = _local(key, features_vec, meta)
+    meta["policy_cached"], meta["policy_shared"] = cached, shared
+    return raw
+
+def single_flight_stats() -> Dict[str, Any]:
+    with _STATS_LOCK:
+        out = dict(STATS)
+    out.update({"leaders": _FLIGHT.leaders, "shared": _FLIGHT.shared,
+                "in_flight": _FLIGHT.in_flight(), "broker": _SERVER is not None})
+    return out
@@ -0,0 +1,50 @@
+# src/runtime/executor.py
+from __future__ import annotations
+import os, threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+# ──────────────────────────
+# Pool de threads partagé (process-wide)
+#   - OpenCV relâche le GIL → les ROIs d'une même frame tournent en parallèle
+#   - POKERIA_ROI_WORKERS=N  (0/1 = séquentiel)
+#   - POKERIA_FRAME_BUDGET_MS=ms  (budget max d'assemblage d'une frame)
+# ──────────────────────────
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+def _default_workers() -> int:
+    return max(1, min(8, (os.cpu_count() or 2)))
+
+def roi_workers() -> int:
+    try:
+        return max(0, int(os.getenv("POKERIA_ROI_WORKERS", str(_default_workers()))))
+    except Exception:
+        return _default_workers()
+
+def frame_budget_s() -> Optional[float]:
+    """Budget (s) pour résoudre les ROIs d'une frame ; None = pas de limite."""
+    try:
+        ms = float(os.getenv("POKERIA_FRAME_BUDGET_MS", "1500"))
+    except Exception:
+        ms = 1500.0
+    return None if ms <= 0 else ms / 1000.0
+
+def get_executor() -> Optional[ThreadPoolExecutor]:
+    """Retourne le pool partagé, ou None si le fan-out est désactivé (workers <= 1)."""
+    global _EXECUTOR
+    n = roi_workers()
+    if n <= 1:
+        return None
+    if _EXECUTOR is None:
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None:
+                _EXECUTOR = ThreadPoolExecutor(max_workers=n, thread_name_prefix="pokeria-roi")
+    return _EXECUTOR
+
+def shutdown_executor(wait: bool = False) -> None:
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is not None:
+            _EXECUTOR.shutdown(wait=wait, cancel_futures=True)
+            _EXECUTOR = None
@@ -0,0 +1,272 @@
+# src/runtime/pipeline.py
+from __future__ import annotations
+import os, time, queue, threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Optional
+
+from src.config.settings import load_room_config, ACTIVE_ROOM
+from src.state.builder import capture_frame, recognize, assemble_state, apply_tracker
+from src.state.hand_tracker import get_hand_tracker, policy_allowed
+from src.state.motion_gate import get_motion_gate
+from src.state.models import TableState
+from src.ocr.engine_singleton import get_engine
+from src.featurize.features import featurize
+from src.featurize.cards_utils import canonical_cards
+from src.policy.decision_cache import get_policy_cache
+from src.policy.fast_policy import race_policy, finalize_raced, race_stats
+from src.policy.ollama_client import hedge_stats
+from src.policy.single_flight import single_flight_stats
+from src.runtime.refresh import RefreshScheduler, table_in_background
+
+# ──────────────────────────
+# Pipeline par étages (capture → ROIs → fusion → policy)
+#   - files bornées entre étages : on garde la frame la plus récente
+#   - la frame N+1 est capturée/lue pendant l'appel LLM de la frame N
+#   - résultats policy obsolètes (frame_id dépassé) jetés
+# Env:
+#   POKERIA_PIPELINE_QSIZE=1        (profondeur max des files)
+#   POKERIA_CAPTURE_MS=200          (période min de capture; cadence adaptative cf. runtime/refresh.py)
+#   POKERIA_POLICY_PERIOD=2.5       (intervalle min entre requêtes policy)
+# ──────────────────────────
+STAGES = ("capture", "recognize", "fuse", "policy")
+
+def state_signature(st: TableState) -> str:
+    """Signature des décisions (cache policy): couleurs canonisées, "AhKh|Qh7d2c" ≡ "AsKs|Qs7c2d"."""
+    hero, board = canonical_cards(st.hero_cards, st.community_cards)
+    return f"{' '.join(hero)}|{' '.join(board)}|{float(st.to_call):.2f}|{float(st.pot_size):.2f}"
+
+@dataclass
+class FrameJob:
+    fid: int
+    ts: float
+    payload: Any = None
+    cfg: Dict = field(default_factory=dict)
+    sig: str = ""
+
+class StageStats:
+    """Compteurs d'un étage: items traités/jetés + latence moyenne glissante."""
+    def __init__(self, window: int = 32):
+        self.done = 0
+        self.dropped = 0
+        self.lat_ms: Deque[float] = deque(maxlen=window)
+
+    def as_dict(self) -> Dict[str, float]:
+        avg = sum(self.lat_ms) / len(self.lat_ms) if self.lat_ms else 0.0
+        return {"done": self.done, "dropped": self.dropped, "avg_ms": round(avg, 1)}
+
+def _put_latest(q: "queue.Queue", item, stats: StageStats) -> None:
+    """put non bloquant: si la file est pleine, on jette le plus ancien."""
+    while True:
+        try:
+            q.put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                q.get_nowait()
+                stats.dropped += 1
+            except queue.Empty:
+                pass
+
+class FramePipeline:
+    """
+    Exécute capture / reconnaissance / fusion / policy dans des threads dédiés.
+
+    Callbacks (appelés depuis les threads du pipeline):
+      on_state(fid, state, sig)              → à chaque frame fusionnée
+      on_action(fid, sig, action, policy_ms) → décision policy non obsolète
+      on_error(stage, exc)
+    """
+    def __init__(self,
+                 on_state: Callable[[int, TableState, str], None],
+                 on_action: Callable[[int, str, dict, float], None],
+                 on_error: Optional[Callable[[str, BaseException], None]] = None,
+                 is_paused: Optional[Callable[[], bool]] = None,
+                 allow_policy: Optional[Callable[[], bool]] = None,
+                 qsize: Optional[int] = None):
+        self.on_state = on_state
+        self.on_action = on_action
+        self.on_error = on_error or (lambda stage, e: print(f"[pipeline:{stage}]", repr(e)))
+        self.is_paused = is_paused or (lambda: False)
+        self.allow_policy = allow_policy or (lambda: True)
+
+        qn = qsize or int(os.getenv("POKERIA_PIPELINE_QSIZE", "1"))
+        self.q_frames: "queue.Queue[FrameJob]" = queue.Queue(maxsize=max(1, qn))
+        self.q_reads:  "queue.Queue[FrameJob]" = queue.Queue(maxsize=max(1, qn))
+        self.q_policy: "queue.Queue[FrameJob]" = queue.Queue(maxsize=1)
+
+        self.capture_period_s = max(0.0, float(os.getenv("POKERIA_CAPTURE_MS", "200")) / 1000.0)
+        cap_ms = max(1, int(self.capture_period_s * 1000))
+        self.refresh = RefreshScheduler(base_ms=cap_ms,
+                                        fast_ms=min(cap_ms, int(os.getenv("POKERIA_REFRESH_FAST_MS", "250"))))
+        self.policy_period_s  = float(os.getenv("POKERIA_POLICY_PERIOD", "2.5"))
+
+        self.stats: Dict[str, StageStats] = {k: StageStats() for k in STAGES}
+        self._fused_ts: Deque[float] = deque(maxlen=32)
+        self._fid = 0
+        self._latest_sig = ""
+        self._queried_sig = ""
+        self._latest_policy_fid = -1
+        self._last_policy_ts = 0.0
+        self._force_policy = False
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    # ---------- cycle de vie ----------
+    def start(self):
+        if self._threads:
+            return
+        self._stop.clear()
+        for name, fn in (("capture", self._capture_loop), ("recognize", self._recognize_loop),
+                         ("fuse", self._fuse_loop), ("policy", self._policy_loop)):
+            t = threading.Thread(target=fn, name=f"pokeria-{name}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, timeout: float = 1.0):
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout=timeout)
+        self._threads = []
+
+    def request_policy(self):
+        """Force une requête policy sur la prochaine frame fusionnée."""
+        self._force_policy = True
+
+    # ---------- métriques ----------
+    def throughput_fps(self) -> float:
+        ts = list(self._fused_ts)
+        if len(ts) < 2 or ts[-1] <= ts[0]:
+            return 0.0
+        return (len(ts) - 1) / (ts[-1] - ts[0])
+
+    def queue_depths(self) -> Dict[str, int]:
+        return {"recognize": self.q_frames.qsize(), "fuse": self.q_reads.qsize(), "policy": self.q_policy.qsize()}
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "fps": round(self.throughput_fps(), 2),
+            "queues": self.queue_depths(),
+            "refresh": {"ms": self.refresh.interval_ms, "reason": self.refresh.reason, "label": self.refresh.label()},
+            "stages": {k: s.as_dict() for k, s in self.stats.items()},
+            "policy_cache": get_policy_cache().stats(),
+            "policy_race": race_stats(),
+            "policy_hedge": hedge_stats(),
+            "policy_flight": single_flight_stats(),
+        }
+
+    # ---------- étages ----------
+    def _get(self, q: "queue.Queue[FrameJob]") -> Optional[FrameJob]:
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            return None
+
+    def _capture_loop(self):
+        st = self.stats["capture"]
+        while not self._stop.is_set():
+            t0 = time.perf_counter()
+            period = self.refresh.interval_s
+            if self.is_paused():
+                self._stop.wait(period or 0.1)
+                continue
+            try:
+                rgb = capture_frame()
+                cfg = load_room_config(ACTIVE_ROOM)
+                self._fid += 1
+                _put_latest(self.q_frames, FrameJob(self._fid, time.monotonic(), rgb, cfg), st)
+                st.done += 1
+                st.lat_ms.append((time.perf_counter() - t0) * 1000.0)
+            except Exception as e:
+                self.on_error("capture", e)
+            rest = period - (time.perf_counter() - t0)
+            if rest > 0:
+                self._stop.wait(rest)
+
+    def _recognize_loop(self):
+        st = self.stats["recognize"]
+        eng = get_engine()
+        while not self._stop.is_set():
+            job = self._get(self.q_frames)
+            if job is None:
+                continue
+            t0 = time.perf_counter()
+            try:
+                job.payload = recognize(job.payload, job.cfg, eng)
+                _put_latest(self.q_reads, job, st)
+                st.done += 1
+                st.lat_ms.append((time.perf_counter() - t0) * 1000.0)
+            except Exception as e:
+                self.on_error("recognize", e)
+
+    def _fuse_loop(self):
+        st = self.stats["fuse"]
+        while not self._stop.is_set():
+            job = self._get(self.q_reads)
+            if job is None:
+                continue
+            t0 = time.perf_counter()
+            try:
+                state = apply_tracker(assemble_state(job.payload, job.cfg), get_hand_tracker(job.cfg))
+                job.payload, job.sig = state, state_signature(state)
+                self._latest_sig = job.sig
+                gate = get_motion_gate(job.cfg)
+                self.refresh.update(job.sig, state.phase, state.hero_turn, table_in_background(),
+                                    motion=bool(gate and gate.in_motion()))
+                self._fused_ts.append(time.monotonic())
+                st.done += 1
+                st.lat_ms.append((time.perf_counter() - t0) * 1000.0)
+                self.on_state(job.fid, state, job.sig)
+
+                if self._want_policy(state, job.sig):
+                    self._force_policy = False
+                    self._queried_sig = job.sig
+                    self._last_policy_ts = time.monotonic()
+                    self._latest_policy_fid = job.fid
+                    _put_latest(self.q_policy, job, self.stats["policy"])
+            except Exception as e:
+                self.on_error("fuse", e)
+
+    def _want_policy(self, state: TableState, sig: str) -> bool:
+        if self._force_policy:
+            return True
+        if len(state.hero_cards) < 2 or sig == self._queried_sig or not self.allow_policy():
+            return False
+        if not policy_allowed(state):  # jamais hors tour du héros
+            return False
+        return (time.monotonic() - self._last_policy_ts) >= self.policy_period_s
+
+    def _policy_loop(self):
+        st = self.stats["policy"]
+        while not self._stop.is_set():
+            job = self._get(self.q_policy)
+            if job is None:
+                continue
+            if job.fid < self._latest_policy_fid:
+                st.dropped += 1
+                continue
+            t0 = time.perf_counter()
+            try:
+                state: TableState = job.payload
+                x, _, dbg = featurize(state)
+                dbg.update({
+                    "hero_cards": state.hero_cards[:], "board_cards": state.community_cards[:],
+                    "pot_size": float(state.pot_size), "hero_stack": float(state.hero_stack),
+                    "to_call": float(state.to_call),
+                })
+                # réponse rapide publiée tout de suite, remplacée si le LLM répond avant l'échéance
+                def on_fast(fast, fid=job.fid, sig=job.sig):
+                    if fid >= self._latest_policy_fid:
+                        self.on_action(fid, sig, finalize_raced(fast, dbg, "fast"), (time.perf_counter() - t0) * 1000.0)
+                raw, source = race_policy(x, dbg, on_fast=on_fast)
+                action = finalize_raced(raw, dbg, source)
+                policy_ms = (time.perf_counter() - t0) * 1000.0
+                st.lat_ms.append(policy_ms)
+                # obsolète: une requête plus récente (frame_id supérieur) est partie entre-temps
+                if job.fid < self._latest_policy_fid:
+                    st.dropped += 1
+                    continue
+                st.done += 1
+                self.on_action(job.fid, job.sig, action, policy_ms)
+            except Exception as e:
+                self.on_error("policy", e)
@@ -0,0 +1,96 @@
+# src/runtime/refresh.py
+from __future__ import annotations
+import os
+from typing import Optional, Tuple
+
+# ──────────────────────────
+# Cadence adaptative des overlays / de la capture
+#   - rapide  : boutons du héros visibles, ou ROIs qui changent (quelques ticks de grâce)
+#   - normale : main en cours, rien ne bouge
+#   - lente   : entre deux mains / attente / showdown
+#   - fond    : fenêtre poker minimisée ou pas au 1er plan
+# Env:
+#   POKERIA_ADAPTIVE_REFRESH=1     (0 = période fixe POKERIA_REFRESH_MS)
+#   POKERIA_REFRESH_FAST_MS=250
+#   POKERIA_REFRESH_MS=<défaut overlay>   (cadence normale)
+#   POKERIA_REFRESH_IDLE_MS=2000
+#   POKERIA_REFRESH_BG_MS=4000
+#   POKERIA_REFRESH_HOT_TICKS=3    (ticks rapides après un changement)
+# ──────────────────────────
+IDLE_PHASES = {"waiting", "between_hands", "showdown"}
+
+REASON_LABELS = {
+    "hero_turn":  "tour héros",
+    "changing":   "table qui bouge",
+    "normal":     "main en cours",
+    "idle":       "entre mains",
+    "background": "arrière-plan",
+    "fixed":      "fixe",
+}
+
+def adaptive_enabled() -> bool:
+    return os.getenv("POKERIA_ADAPTIVE_REFRESH", "1") == "1"
+
+def table_in_background() -> bool:
+    """Même garde-fou que les Workers: minimisée, ou verrouillée mais pas au 1er plan."""
+    try:
+        from src.runtime.window_lock import LOCK
+        if LOCK.is_minimized():
+            return True
+        return bool(LOCK.get_status().locked and not LOCK.is_foreground())
+    except Exception:
+        return False
+
+class RefreshScheduler:
+    """
+    Choisit la période du prochain tick à partir du dernier état lu.
+    Accélère immédiatement; ne ralentit qu'après `hot_ticks` ticks sans changement.
+    """
+    def __init__(self, base_ms: int, fast_ms: Optional[int] = None, idle_ms: Optional[int] = None,
+                 bg_ms: Optional[int] = None, hot_ticks: Optional[int] = None, adaptive: Optional[bool] = None):
+        self.base_ms = int(base_ms)
+        self.fast_ms = int(fast_ms if fast_ms is not None else os.getenv("POKERIA_REFRESH_FAST_MS", "250"))
+        self.idle_ms = int(idle_ms if idle_ms is not None else os.getenv("POKERIA_REFRESH_IDLE_MS", "2000"))
+        self.bg_ms   = int(bg_ms if bg_ms is not None else os.getenv("POKERIA_REFRESH_BG_MS", "4000"))
+        self.hot_ticks = int(hot_ticks if hot_ticks is not None else os.getenv("POKERIA_REFRESH_HOT_TICKS", "3"))
+        self.adaptive = adaptive_enabled() if adaptive is None else bool(adaptive)
+        self.interval_ms = self.base_ms
+        self.reason = "normal" if self.adaptive else "fixed"
+        self._last_sig: Optional[str] = None
+        self._hot = 0
+
+    def update(self, sig: Optional[str] = None, phase: str = "unknown",
+               hero_turn: bool = False, background: bool = False, motion: bool = False) -> Tuple[int, str]:
+        """Renvoie (période ms, raison) pour le prochain tick. `motion`: ROIs en transition (MotionGate)."""
+        if not self.adaptive:
+            return self.interval_ms, self.reason
+        if motion:
+            self._hot = self.hot_ticks
+        elif sig is not None:
+            if self._last_sig is not None and sig != self._last_sig:
+                self._hot = self.hot_ticks
+            elif self._hot > 0:
+                self._hot -= 1
+        if sig is not None:
+            self._last_sig = sig
+
+        if background:
+            ms, why = self.bg_ms, "background"
+        elif hero_turn:
+            ms, why = self.fast_ms, "hero_turn"
+        elif self._hot > 0:
+            ms, why = self.fast_ms, "changing"
+        elif phase in IDLE_PHASES:
+            ms, why = self.idle_ms, "idle"
+        else:
+            ms, why = self.base_ms, "normal"
+        self.interval_ms, self.reason = max(1, int(ms)), why
+        return self.interval_ms, self.reason
+
+    @property
+    def interval_s(self) -> float:
+        return self.interval_ms / 1000.0
+
+    def label(self) -> str:
+        hz = 1000.0 / max(1, self.interval_ms)
+        return f"↻ {hz:.1f} Hz ({REASON_LABELS.get(self.reason, self.reason)})"
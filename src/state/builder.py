@@ -1,5 +1,9 @@
 import cv2
 import re
+import threading
+from concurrent.futures import Future, wait
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Set, Tuple
 from src.config.settings import get_table_roi, load_room_config, ACTIVE_ROOM
 from src.capture.screen import capture_table
 from src.ocr.engine import EasyOCREngine
@@ -9,17 +13,16 @@ from src.state.models import TableState
 from src.tools.detect_dealer import main as detect_dealer  # tu as déjà la détection bouton
 from src.ocr.engine_singleton import get_engine
 from src.ocr.preprocess import preprocess_digits_variants, to_rgb
+from src.runtime.executor import get_executor, frame_budget_s
+from src.ocr.ocr_pool import get_ocr_pool, PooledEngine
+from src.state.hand_tracker import HERO_ROIS, BOARD_ROIS, HandTracker, get_hand_tracker
+from src.state.stabilizer import StateStabilizer, get_state_stabilizer, card_conf
+from src.state.motion_gate import MotionGate, GATED_ROIS, get_motion_gate
 
-def _read_amount_variants(engine, crop_rgb):
-    """
-    Essaie plusieurs binarisations/variants pour lire un montant.
-    Retourne float(value) ou 0.0 si tout échoue.
-    Attend que engine.read_amount(...) renvoie au minimum:
-      - {"value": <float|str>, "conf": <0..1>}
-    """
+def _best_amount(results) -> Tuple[float, float]:
+    """Meilleure lecture (conf max) parmi des résultats engine.read_amount(...) → (value, conf)."""
     best = None
-    for th in preprocess_digits_variants(crop_rgb):
-        res = engine.read_amount(to_rgb(th))
+    for res in results:
         if not res:
             continue
         val = res.get("value", None)
@@ -32,7 +35,21 @@ def _read_amount_variants(engine, crop_rgb):
             continue
         if (best is None) or (c > best["conf"]):
             best = {"value": v, "conf": c}
-    return best["value"] if best is not None else 0.0
+    return (best["value"], best["conf"]) if best is not None else (0.0, 0.0)
+
+def _read_amount_variants(engine, crop_rgb):
+    """
+    Essaie plusieurs binarisations/variants pour lire un montant.
+    Retourne (value, conf) ou (0.0, 0.0) si tout échoue.
+    Attend que engine.read_amount(...) renvoie au minimum:
+      - {"value": <float|str>, "conf": <0..1>}
+    """
+    return _best_amount(engine.read_amount(to_rgb(th)) for th in preprocess_digits_variants(crop_rgb))
+
+def _read_amount_pooled(engine: PooledEngine, crop_rgb):
+    """Comme _read_amount_variants, mais les variants partent en parallèle dans le pool OCR."""
+    futs = [engine.pool.submit_amount(to_rgb(th)) for th in preprocess_digits_variants(crop_rgb)]
+    return _best_amount(f.result() for f in futs)
 
 
 def rel_to_abs(rel, W, H):
@@ -46,14 +63,15 @@ def crop_from_cfg(cfg, table_rgb, name):
     x,y,w,h = rel_to_abs(roi["rel"],W,H)
     return table_rgb[y:y+h, x:x+w].copy()
 
-def _read_amount_any(engine, rgb):
+def _read_amount_any(engine, rgb) -> Tuple[float, float]:
+    """Lecture directe puis fallback regex → (value, conf)."""
     # 1) tentative directe
     try:
         from src.ocr.preprocess import preprocess_digits, to_rgb
         th = preprocess_digits(rgb)
         res = engine.read_amount(to_rgb(th))
         if res and res.get("value") is not None:
-            return float(res["value"])
+            return float(res["value"]), float(res.get("conf", 0.0) or 0.0)
     except Exception:
         pass
     # 2) fallback regex (€, virgule décimale)
@@ -64,66 +82,172 @@ def _read_amount_any(engine, rgb):
         whole = re.sub(r"[^\d]", "", x[0])
         cents = x[1]
         try:
-            return float(f"{whole}.{cents}")
+            return float(f"{whole}.{cents}"), float(conf or 0.0)
         except Exception:
-            return 0.0
-    return 0.0
+            return 0.0, 0.0
+    return 0.0, 0.0
 
-def build_state(engine: EasyOCREngine | None = None) -> TableState:
-    table_rgb = capture_table(get_table_roi(ACTIVE_ROOM))
-    H, W = table_rgb.shape[:2]
-    cfg = load_room_config(ACTIVE_ROOM)
-    engine = engine or get_engine()
 
-    state = TableState(seats_n=cfg.get("table_meta",{}).get("seats_n",6))
+def _read_card_roi(engine, cfg, table_rgb, name):
+    crop = crop_from_cfg(cfg, table_rgb, name)
+    if crop is None:
+        return None, {"roi_name": name, "error": "no_roi"}
+    return read_card(engine, crop, name, cfg)
 
-    # Hero cards
-    for n in ["hero_card_left","hero_card_right"]:
-        crop = crop_from_cfg(cfg,table_rgb,n)
-        if crop is not None:
-            card, meta = read_card(engine, crop, n, cfg)
-            val,meta = read_card(engine,crop,n, cfg)
-            if val: state.hero_cards.append(val)
-
-    # Board cards
-    for n in ["board_card_1","board_card_2","board_card_3","board_card_4","board_card_5"]:
-        crop = crop_from_cfg(cfg,table_rgb,n)
-        if crop is not None:
-            card, meta = read_card(engine, crop, n, cfg)
-            val,meta = read_card(engine,crop,n, cfg)
-            if val: state.community_cards.append(val)
-
-    # Pot
-    crop = crop_from_cfg(cfg, table_rgb, "pot_amount")
-    if crop is not None:
-        state.pot_size = _read_amount_variants(engine, crop)
-
-    crop = crop_from_cfg(cfg, table_rgb, "hero_stack")
-    if crop is not None:
-        state.hero_stack = _read_amount_variants(engine, crop)
-
-            
+def _read_amount_roi(engine, cfg, table_rgb, name, reader):
+    crop = crop_from_cfg(cfg, table_rgb, name)
+    if crop is None:
+        return None
+    return reader(engine, crop)
+
+def _read_to_call(engine, cfg, table_rgb):
     act = crop_from_cfg(cfg, table_rgb, "action_strip")
-    if act is not None:
-        try:
-            state.to_call = float(_read_amount_any(engine, act) or 0.0)
-        except Exception:
-            state.to_call = 0.0
+    if act is None:
+        return None
+    try:
+        return _read_amount_any(engine, act)
+    except Exception:
+        return 0.0, 0.0
 
-    # Dealer seat
+def _detect_dealer_seat(table_rgb, cfg):
     try:
-        from src.state.seating import seat_centers_from_yaml, nearest_seat
-        from src.tools.detect_dealer import detect_by_template, detect_by_hough
-        img_bgr = cv2.cvtColor(table_rgb, cv2.COLOR_RGB2BGR)
-        res = detect_by_template(img_bgr) or detect_by_hough(img_bgr)
-        if res:
-            (cx,cy),score = res
-            centers = seat_centers_from_yaml(W,H,cfg)
-            state.dealer_seat = nearest_seat(cx,cy,centers)
-            # Héros = seat 0 (bas), donc position relative se calcule ensuite
-            state.hero_seat = 0
+        from src.state.dealer_tracker import get_dealer_tracker
+        return get_dealer_tracker(cfg).detect(table_rgb, cfg)
     except Exception as e:
         print("Dealer detection failed:", e)
+    return None
+
+# ROI → future encore en vol. Une tâche en retard déjà démarrée ne s'annule pas
+# (elle garde le verrou _readtext de l'engine): on ne relance pas la même ROI
+# tant qu'elle tourne, sinon les lectures périmées s'empilent frame après frame.
+_INFLIGHT: Dict[str, Future] = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+def _release(name: str, fut: Future):
+    with _INFLIGHT_LOCK:
+        if _INFLIGHT.get(name) is fut:
+            del _INFLIGHT[name]
+
+def _run_tasks(tasks: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+    """
+    Fan-out des tâches ROI sur le pool partagé.
+    Retourne {nom: résultat} pour les tâches terminées dans le budget frame;
+    les tâches en retard sont abandonnées (absentes du dict), et une ROI dont
+    la lecture précédente tourne encore n'est pas resoumise (absente aussi).
+    """
+    ex = get_executor()
+    if ex is None:
+        return {k: fn() for k, fn in tasks.items()}
+
+    futs: Dict[Future, str] = {}
+    with _INFLIGHT_LOCK:
+        for k, fn in tasks.items():
+            if k in _INFLIGHT:
+                continue
+            f = _INFLIGHT[k] = ex.submit(fn)
+            futs[f] = k
+    for f, k in futs.items():
+        f.add_done_callback(partial(_release, k))  # aussi appelé à l'annulation
+    done, late = wait(futs, timeout=frame_budget_s())
+    for f in late:
+        f.cancel()
+    out: Dict[str, Any] = {}
+    for f in done:
+        out[futs[f]] = f.result()  # propage les erreurs comme en séquentiel
+    return out
+
+def capture_frame():
+    """Capture la table active (RGB) — premier étage du pipeline."""
+    return capture_table(get_table_roi(ACTIVE_ROOM))
+
+def recognize_frame(table_rgb, cfg: dict, engine: EasyOCREngine | None = None,
+                    only: Optional[Set[str]] = None) -> Dict[str, Any]:
+    """
+    Lit les ROIs d'une frame (toutes, ou seulement `only`) → {nom_roi: résultat brut}.
+    Si le pool OCR multi-process est actif (POKERIA_OCR_PROCS>0), l'OCR
+    rank/montants y est délégué; le reste (OpenCV) reste dans les threads.
+    """
+    pool = get_ocr_pool()
+    if pool is not None:
+        engine, read_amount = PooledEngine(pool), _read_amount_pooled
+    else:
+        engine, read_amount = (engine or get_engine()), _read_amount_variants
+    tasks: Dict[str, Callable[[], Any]] = {}
+    for n in HERO_ROIS + BOARD_ROIS:
+        tasks[n] = partial(_read_card_roi, engine, cfg, table_rgb, n)
+    tasks["pot_amount"] = partial(_read_amount_roi, engine, cfg, table_rgb, "pot_amount", read_amount)
+    tasks["hero_stack"] = partial(_read_amount_roi, engine, cfg, table_rgb, "hero_stack", read_amount)
+    tasks["action_strip"] = partial(_read_to_call, engine, cfg, table_rgb)
+    tasks["dealer"] = partial(_detect_dealer_seat, table_rgb, cfg)
+    if only is not None:
+        tasks = {k: fn for k, fn in tasks.items() if k in only}
+    return _run_tasks(tasks)
+
+def assemble_state(res: Dict[str, Any], cfg: dict) -> TableState:
+    """Fusionne les lectures ROI d'une frame en TableState (+ confiances par champ)."""
+    state = TableState(seats_n=cfg.get("table_meta",{}).get("seats_n",6))
+
+    # Hero cards / Board cards (ordre des ROIs conservé)
+    for names, dest in ((HERO_ROIS, state.hero_cards), (BOARD_ROIS, state.community_cards)):
+        for n in names:
+            val, meta = res.get(n, (None, {}))
+            if val:
+                dest.append(val)
+                state.confidences[n] = float((meta or {}).get("fused_conf", card_conf(meta)))
+
+    # Pot / Stack / To call — (value, conf)
+    for n, attr in (("pot_amount", "pot_size"), ("hero_stack", "hero_stack"), ("action_strip", "to_call")):
+        r = res.get(n)
+        if r is not None and r[0] is not None:
+            setattr(state, attr, float(r[0]))
+            state.confidences[n] = float(r[1] or 0.0)
+
+    # Dealer seat — Héros = seat 0 (bas), donc position relative se calcule ensuite
+    if res.get("dealer") is not None:
+        state.dealer_seat = res["dealer"]
+        state.hero_seat = 0
 
     return state
 
+def recognize_tracked(table_rgb, cfg: dict, tracker: HandTracker,
+                      engine: EasyOCREngine | None = None,
+                      stab: Optional[StateStabilizer] = None,
+                      gate: Optional[MotionGate] = None) -> Dict[str, Any]:
+    """Sondes → phase → lecture des seules ROIs utiles (et posées), fusionnées avec l'état connu."""
+    tracker.observe(table_rgb, cfg)
+    stable = None
+    if stab is not None:
+        stab.sync(tracker.hand_id, tracker.phase.value, tracker.probes.hero_turn)
+        stab.reset(tracker.absent_rois())
+        stable = stab.stable_fields()
+    only = tracker.rois_to_read(stable)
+    if gate is not None:  # ROIs en transition → relues une fois posées
+        only = gate.gate(only)
+    res = recognize_frame(table_rgb, cfg, engine, only=only)
+    if stab is not None:
+        res = stab.push(res)
+    return tracker.merge(res)
+
+def recognize(table_rgb, cfg: dict, engine: EasyOCREngine | None = None) -> Dict[str, Any]:
+    """Lecture d'une frame avec HandTracker, porte de mouvement et fusion temporelle si actifs."""
+    tracker, stab, gate = get_hand_tracker(cfg), get_state_stabilizer(), get_motion_gate(cfg)
+    if gate is not None:
+        gate.observe(table_rgb, cfg)
+    if tracker is not None:
+        return recognize_tracked(table_rgb, cfg, tracker, engine, stab, gate)
+    only = gate.gate(set(GATED_ROIS) | {"dealer"}) if gate is not None else None
+    res = recognize_frame(table_rgb, cfg, engine, only=only)
+    res = stab.push(res) if stab is not None else res
+    return gate.hold(res) if gate is not None else res
+
+def apply_tracker(state: TableState, tracker: Optional[HandTracker]) -> TableState:
+    if tracker is not None:
+        state.phase = tracker.phase.value
+        state.hero_turn = tracker.may_query_policy()
+    return state
+
+def build_state(engine: EasyOCREngine | None = None) -> TableState:
+    table_rgb = capture_frame()
+    cfg = load_room_config(ACTIVE_ROOM)
+    state = assemble_state(recognize(table_rgb, cfg, engine), cfg)
+    return apply_tracker(state, get_hand_tracker(cfg))
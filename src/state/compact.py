@@ -0,0 +1,111 @@
+# src/state/compact.py
+from __future__ import annotations
+from typing import Iterable, Optional, Tuple
+
+from src.state.models import TableState
+from src.featurize.cards_utils import card_index, index_card, cards_mask, canonicalize
+
+# ──────────────────────────
+# TableState compact (clés de cache, replays, datasets)
+#   - cartes en entiers 0..51 (rank_index*4 + suit_index) + bitmasks 52 bits
+#   - montants en centimes (int), stacks par siège inclus (sièges actifs → nb d'adversaires)
+#   - __slots__, immuable de fait, hash précalculé
+# Adaptateurs: CompactState.from_state(st) / .to_state(), TableState ↔ compact
+# ──────────────────────────
+def to_cents(x) -> int:
+    return int(round(float(x or 0.0) * 100.0))
+
+class CompactState:
+    __slots__ = ("hero", "board", "hero_mask", "board_mask", "pot_c", "stack_c", "to_call_c",
+                 "stacks_c", "actions", "dealer_seat", "hero_seat", "seats_n", "phase", "hero_turn",
+                 "_hash")
+
+    def __init__(self, hero: Iterable[int] = (), board: Iterable[int] = (),
+                 pot_c: int = 0, stack_c: int = 0, to_call_c: int = 0,
+                 dealer_seat: Optional[int] = None, hero_seat: Optional[int] = None,
+                 seats_n: int = 6, phase: str = "unknown", hero_turn: bool = False,
+                 stacks_c: Iterable[Tuple[int, int]] = (), actions: Iterable[str] = ()):
+        self.hero: Tuple[int, ...] = tuple(i for i in hero if i >= 0)[:2]
+        self.board: Tuple[int, ...] = tuple(i for i in board if i >= 0)[:5]
+        self.hero_mask = cards_mask(self.hero)
+        self.board_mask = cards_mask(self.board)
+        self.pot_c, self.stack_c, self.to_call_c = int(pot_c), int(stack_c), int(to_call_c)
+        self.stacks_c: Tuple[Tuple[int, int], ...] = tuple(sorted((int(k), int(v)) for k, v in stacks_c))
+        self.actions: Tuple[str, ...] = tuple(actions)
+        self.dealer_seat, self.hero_seat, self.seats_n = dealer_seat, hero_seat, int(seats_n)
+        self.phase, self.hero_turn = phase, bool(hero_turn)
+        self._hash = hash(self.key())
+
+    # ---------- adaptateurs ----------
+    @classmethod
+    def from_state(cls, st: TableState) -> "CompactState":
+        return cls(
+            hero=[card_index(c) for c in st.hero_cards],
+            board=[card_index(c) for c in st.community_cards],
+            pot_c=to_cents(st.pot_size), stack_c=to_cents(st.hero_stack), to_call_c=to_cents(st.to_call),
+            dealer_seat=st.dealer_seat, hero_seat=st.hero_seat, seats_n=st.seats_n,
+            phase=st.phase, hero_turn=st.hero_turn,
+            stacks_c=((seat, to_cents(v)) for seat, v in (st.stacks or {}).items()),
+            actions=st.actions or (),
+        )
+
+    def to_state(self) -> TableState:
+        return TableState(
+            hero_cards=[index_card(i) for i in self.hero],
+            community_cards=[index_card(i) for i in self.board],
+            pot_size=self.pot_size, hero_stack=self.hero_stack, to_call=self.to_call,
+            dealer_seat=self.dealer_seat, hero_seat=self.hero_seat, seats_n=self.seats_n,
+            phase=self.phase, hero_turn=self.hero_turn,
+            stacks=self.stacks, actions=list(self.actions),
+        )
+
+    # ---------- vue compatible TableState (lecture) ----------
+    @property
+    def hero_cards(self):
+        return [index_card(i) for i in self.hero]
+
+    @property
+    def community_cards(self):
+        return [index_card(i) for i in self.board]
+
+    @property
+    def pot_size(self) -> float:
+        return self.pot_c / 100.0
+
+    @property
+    def hero_stack(self) -> float:
+        return self.stack_c / 100.0
+
+    @property
+    def to_call(self) -> float:
+        return self.to_call_c / 100.0
+
+    @property
+    def stacks(self):
+        return {seat: c / 100.0 for seat, c in self.stacks_c}
+
+    # ---------- hash / égalité ----------
+    def key(self) -> tuple:
+        return (self.hero, self.board, self.pot_c, self.stack_c, self.to_call_c,
+                self.dealer_seat, self.hero_seat, self.seats_n, self.stacks_c, self.actions)
+
+    def canonical_key(self) -> tuple:
+        """key() avec les couleurs canonisées (cf. cards_utils.canonicalize) — clé des caches de décision."""
+        h, b, _ = canonicalize(self.hero, self.board)
+        return (h, b, self.pot_c, self.stack_c, self.to_call_c,
+                self.dealer_seat, self.hero_seat, self.seats_n, self.stacks_c, self.actions)
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, CompactState) and self._hash == other._hash and self.key() == other.key()
+
+    def __repr__(self) -> str:
+        return (f"CompactState(hero={' '.join(self.hero_cards)!r}, board={' '.join(self.community_cards)!r}, "
+                f"pot={self.pot_size:.2f}, stack={self.hero_stack:.2f}, to_call={self.to_call:.2f}, "
+                f"dealer={self.dealer_seat}, phase={self.phase})")
+
+def as_table_state(st) -> TableState:
+    """Accepte TableState ou CompactState (callers existants inchangés)."""
+    return st.to_state() if isinstance(st, CompactState) else st
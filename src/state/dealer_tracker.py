@@ -0,0 +1,178 @@
+# src/state/dealer_tracker.py
+from __future__ import annotations
+import json
+import cv2
+import numpy as np
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+from src.state.seating import seat_centers_from_yaml
+
+# ──────────────────────────
+# Suivi du bouton dealer
+#   - template chargé + pré-redimensionné une seule fois (par taille de table)
+#   - recherche limitée à de petites fenêtres autour des sièges
+#   - siège = carte des plus proches voisins précalculée (label map)
+#   - vérification d'abord à la dernière position connue (1 fenêtre, 1 échelle)
+#   - fallback Hough: meilleur cercle de toutes les fenêtres (couverture du contour)
+#   - singleton reconstruit si la section dealer_tracker du cfg change
+# ──────────────────────────
+TEMPLATE_PATH = Path("assets/templates/dealer_button.png")
+SCALES = tuple(np.linspace(0.6, 1.4, 11))
+
+DEFAULTS = {
+    "min_score": 0.55,     # score TM_CCOEFF_NORMED minimal
+    "pull": 0.30,          # fenêtre décalée du siège vers le centre de table (0..1)
+    "win_rel": 0.10,       # demi-côté fenêtre en fraction de min(W,H)
+    "hough_min": 0.45,     # fraction minimale du périmètre du cercle sur un contour Canny
+}
+HOUGH_CANNY = 120          # = param1 de HoughCircles (seuil haut Canny)
+HOUGH_SAMPLES = 48         # points échantillonnés sur le périmètre
+
+def _cfg_sig(*parts: Any) -> str:
+    return json.dumps(parts, sort_keys=True, default=str)
+
+class DealerTracker:
+    def __init__(self, cfg: Optional[dict] = None, template_path: Path = TEMPLATE_PATH):
+        self.th = dict(DEFAULTS)
+        self.th.update((cfg or {}).get("dealer_tracker", {}) or {})
+        tpl = cv2.imread(str(template_path), cv2.IMREAD_GRAYSCALE) if template_path.exists() else None
+        self.template: Optional[np.ndarray] = tpl
+        self._geom_key: Optional[Tuple[int, int, str]] = None
+        self._scaled: List[Tuple[float, np.ndarray]] = []
+        self._windows: List[Tuple[int, int, int, int]] = []
+        self._labels: Optional[np.ndarray] = None
+        self.last_seat: Optional[int] = None
+        self.last_pos: Optional[Tuple[int, int]] = None
+        self.last_scale_idx: Optional[int] = None
+        self.last_score: float = 0.0
+
+    # ---------- géométrie (recalculée seulement si la taille table change) ----------
+    def _prepare(self, W: int, H: int, cfg: dict):
+        # sièges = f(table_meta, rois_hint) → même clé que seat_centers_from_yaml
+        key = (W, H, _cfg_sig(cfg.get("table_meta", {}), cfg.get("rois_hint", {})))
+        if key == self._geom_key:
+            return
+        self._geom_key = key
+        centers = seat_centers_from_yaml(W, H, cfg)
+        cx, cy = np.mean(np.asarray(centers, dtype=np.float32), axis=0)  # centre du cercle des sièges
+        pull, half = float(self.th["pull"]), int(float(self.th["win_rel"]) * min(W, H))
+
+        self._windows = []
+        for sx, sy in centers:
+            wx = int(sx + (cx - sx) * pull); wy = int(sy + (cy - sy) * pull)
+            x0, y0 = max(0, wx - half), max(0, wy - half)
+            x1, y1 = min(W, wx + half), min(H, wy + half)
+            self._windows.append((x0, y0, x1 - x0, y1 - y0))
+
+        # label map: siège le plus proche pour chaque pixel (int8, calculé une fois)
+        ys, xs = np.mgrid[0:H, 0:W].astype(np.float32)
+        pts = np.asarray(centers, dtype=np.float32)
+        d = (xs[None] - pts[:, 0, None, None]) ** 2 + (ys[None] - pts[:, 1, None, None]) ** 2
+        self._labels = np.argmin(d, axis=0).astype(np.int8)
+
+        self._scaled = []
+        if self.template is not None:
+            tH, tW = self.template.shape[:2]
+            for s in SCALES:
+                w, h = max(3, int(tW * s)), max(3, int(tH * s))
+                if w < 2 * half and h < 2 * half:
+                    self._scaled.append((float(s), cv2.resize(self.template, (w, h), interpolation=cv2.INTER_AREA)))
+
+    # ---------- matching ----------
+    def _match(self, rgb: np.ndarray, rect, scale_ids) -> Optional[Tuple[float, Tuple[int, int], int]]:
+        x, y, w, h = rect
+        roi = cv2.cvtColor(rgb[y:y + h, x:x + w], cv2.COLOR_RGB2GRAY)
+        best = None
+        for i in scale_ids:
+            _s, tpl = self._scaled[i]
+            if tpl.shape[0] >= roi.shape[0] or tpl.shape[1] >= roi.shape[1]:
+                continue
+            res = cv2.matchTemplate(roi, tpl, cv2.TM_CCOEFF_NORMED)
+            _, score, _, loc = cv2.minMaxLoc(res)
+            if best is None or score > best[0]:
+                center = (x + loc[0] + tpl.shape[1] // 2, y + loc[1] + tpl.shape[0] // 2)
+                best = (float(score), center, i)
+        return best
+
+    def _hough(self, rgb: np.ndarray, rect) -> Optional[Tuple[float, Tuple[int, int]]]:
+        """Meilleur cercle de la fenêtre: (score 0..1, centre), score comparable entre fenêtres."""
+        x, y, w, h = rect
+        roi = cv2.medianBlur(cv2.cvtColor(rgb[y:y + h, x:x + w], cv2.COLOR_RGB2GRAY), 5)
+        m = min(self._geom_key[0], self._geom_key[1])
+        circles = cv2.HoughCircles(roi, cv2.HOUGH_GRADIENT, dp=1.2, minDist=40, param1=HOUGH_CANNY, param2=30,
+                                   minRadius=int(m * 0.015), maxRadius=int(m * 0.05))
+        if circles is None:
+            return None
+        # contours dilatés 1 px: tolère l'arrondi du centre / rayon
+        edges = cv2.dilate(cv2.Canny(roi, HOUGH_CANNY // 2, HOUGH_CANNY), np.ones((3, 3), np.uint8))
+        t = np.linspace(0.0, 2.0 * np.pi, HOUGH_SAMPLES, endpoint=False)
+        best = None
+        for cx, cy, r in circles[0]:
+            px = np.round(cx + r * np.cos(t)).astype(int)
+            py = np.round(cy + r * np.sin(t)).astype(int)
+            ok = (px >= 0) & (px < w) & (py >= 0) & (py < h)
+            if not ok.any():
+                continue
+            score = float(np.count_nonzero(edges[py[ok], px[ok]])) / HOUGH_SAMPLES
+            if best is None or score > best[0]:
+                best = (score, (x + int(round(cx)), y + int(round(cy))))
+        return best
+
+    def _verify_rect(self) -> Tuple[int, int, int, int]:
+        tpl = self._scaled[self.last_scale_idx][1]
+        px, py = self.last_pos
+        mw, mh = tpl.shape[1], tpl.shape[0]
+        W, H = self._geom_key[0], self._geom_key[1]
+        x0, y0 = max(0, px - mw), max(0, py - mh)
+        return (x0, y0, min(W, px + mw) - x0, min(H, py + mh) - y0)
+
+    def detect(self, table_rgb: np.ndarray, cfg: dict) -> Optional[int]:
+        """Siège du bouton (index), ou None si non trouvé."""
+        H, W = table_rgb.shape[:2]
+        self._prepare(W, H, cfg)
+        min_score = float(self.th["min_score"])
+
+        if self._scaled:
+            # 1) vérification à la dernière position (1 petite fenêtre, 1 échelle)
+            if self.last_pos is not None and self.last_scale_idx is not None:
+                hit = self._match(table_rgb, self._verify_rect(), [self.last_scale_idx])
+                if hit and hit[0] >= min_score:
+                    self.last_score = hit[0]
+                    return self.last_seat
+            # 2) fenêtres des sièges, toutes échelles
+            best = None
+            for rect in self._windows:
+                hit = self._match(table_rgb, rect, range(len(self._scaled)))
+                if hit and (best is None or hit[0] > best[0]):
+                    best = hit
+            if best and best[0] >= min_score:
+                score, pos, idx = best
+                return self._commit(pos, idx, score)
+
+        # 3) fallback Hough limité aux fenêtres des sièges: meilleur cercle toutes fenêtres
+        best = None
+        for rect in self._windows:
+            hit = self._hough(table_rgb, rect)
+            if hit and (best is None or hit[0] > best[0]):
+                best = hit
+        if best and best[0] >= float(self.th["hough_min"]):
+            score, pos = best
+            return self._commit(pos, None, score)
+        return None
+
+    def _commit(self, pos: Tuple[int, int], scale_idx: Optional[int], score: float) -> int:
+        self.last_pos, self.last_scale_idx, self.last_score = pos, scale_idx, score
+        self.last_seat = int(self._labels[pos[1], pos[0]])
+        return self.last_seat
+
+_TRACKER: Optional[DealerTracker] = None
+_TRACKER_SIG: Optional[str] = None
+
+def get_dealer_tracker(cfg: Optional[dict] = None) -> DealerTracker:
+    """Tracker process-wide; reconstruit si les seuils dealer_tracker du cfg changent."""
+    global _TRACKER, _TRACKER_SIG
+    sig = _cfg_sig((cfg or {}).get("dealer_tracker", {}) or {})
+    if _TRACKER is None or sig != _TRACKER_SIG:
+        _TRACKER, _TRACKER_SIG = DealerTracker(cfg), sig
+    return _TRACKER
@@ -0,0 +1,208 @@
+# src/state/hand_tracker.py
+from __future__ import annotations
+import os, cv2
+import numpy as np
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Dict, Optional, Set
+
+from src.ocr.preprocess import card_presence_score
+
+HERO_ROIS    = ["hero_card_left", "hero_card_right"]
+BOARD_ROIS   = ["board_card_1", "board_card_2", "board_card_3", "board_card_4", "board_card_5"]
+AMOUNT_ROIS  = ["pot_amount", "hero_stack", "action_strip"]
+
+class Phase(str, Enum):
+    WAITING       = "waiting"
+    PREFLOP       = "preflop"
+    FLOP          = "flop"
+    TURN          = "turn"
+    RIVER         = "river"
+    SHOWDOWN      = "showdown"
+    BETWEEN_HANDS = "between_hands"
+
+IN_HAND = {Phase.PREFLOP, Phase.FLOP, Phase.TURN, Phase.RIVER}
+STREET_BY_BOARD = {0: Phase.PREFLOP, 3: Phase.FLOP, 4: Phase.TURN, 5: Phase.RIVER}
+
+# Seuils des sondes (surchargeables via YAML: hand_tracker: {...})
+DEFAULTS = {
+    "min_button_ratio": 0.08,   # part de pixels saturés/lumineux dans action_strip (boutons héros)
+    "min_card_score": 0.25,     # card_presence_score pour une carte posée
+    "idle_amount_period": 4,    # montants relus tous les N ticks hors tour du héros
+    "debounce": 2,              # frames concordantes avant changement de phase (hors progression)
+}
+
+@dataclass
+class Probes:
+    hero_present: bool = False
+    board_n: int = 0
+    hero_turn: bool = False
+
+def _crop(cfg: dict, table_rgb, name: str):
+    roi = (cfg.get("rois_hint", {}).get(name) or {}).get("rel")
+    if not roi:
+        return None
+    H, W = table_rgb.shape[:2]
+    rx, ry, rw, rh = roi
+    x, y = int(rx * W), int(ry * H)
+    w, h = max(1, int(rw * W)), max(1, int(rh * H))
+    c = table_rgb[y:y+h, x:x+w]
+    return c if c.size else None
+
+def _card_present(crop, min_score: float) -> bool:
+    if crop is None:
+        return False
+    score, ok = card_presence_score(crop)
+    return bool(ok and score >= min_score)
+
+def _buttons_visible(crop, min_ratio: float) -> bool:
+    """Boutons d'action = zones colorées et lumineuses (fold/call/raise)."""
+    if crop is None:
+        return False
+    hsv = cv2.cvtColor(crop, cv2.COLOR_RGB2HSV)
+    mask = (hsv[..., 1] > 80) & (hsv[..., 2] > 80)
+    return float(np.count_nonzero(mask)) / float(mask.size) >= min_ratio
+
+def probe_frame(table_rgb, cfg: dict, th: Optional[dict] = None) -> Probes:
+    """Sondes pixel bon marché (pas d'OCR): présence cartes héros, slots board, boutons."""
+    th = th or DEFAULTS
+    hero = all(_card_present(_crop(cfg, table_rgb, n), th["min_card_score"]) for n in HERO_ROIS)
+    board_n = 0
+    for n in BOARD_ROIS:  # slots remplis de gauche à droite
+        if not _card_present(_crop(cfg, table_rgb, n), th["min_card_score"]):
+            break
+        board_n += 1
+    turn = hero and _buttons_visible(_crop(cfg, table_rgb, "action_strip"), th["min_button_ratio"])
+    return Probes(hero_present=hero, board_n=board_n, hero_turn=turn)
+
+class HandTracker:
+    """
+    Machine à états du cycle d'une main, pilotée par probe_frame().
+      - phase → quelles ROIs lire (cartes déjà lues non relues, montants espacés hors tour)
+      - may_query_policy() → uniquement quand c'est au héros d'agir
+    Les lectures des ROIs non relues sont reprises de la frame précédente (merge).
+    """
+    def __init__(self, cfg: Optional[dict] = None):
+        self.th = dict(DEFAULTS)
+        self.th.update((cfg or {}).get("hand_tracker", {}) or {})
+        self.phase = Phase.WAITING
+        self.probes = Probes()
+        self.hand_id = 0
+        self.tick = 0
+        self._pending: Optional[Phase] = None
+        self._pending_n = 0
+        self._last: Dict[str, Any] = {}
+
+    # ---------- transitions ----------
+    def _target(self, p: Probes) -> Phase:
+        if p.hero_present:
+            # board 1-2 = distribution du flop en cours → on reste sur la street précédente
+            return STREET_BY_BOARD.get(p.board_n, self.phase if self.phase in IN_HAND else Phase.PREFLOP)
+        if p.board_n >= 3 and self.phase in IN_HAND | {Phase.SHOWDOWN}:
+            return Phase.SHOWDOWN
+        if self.phase == Phase.WAITING:
+            return Phase.WAITING
+        return Phase.BETWEEN_HANDS
+
+    def _is_progress(self, new: Phase) -> bool:
+        order = [Phase.PREFLOP, Phase.FLOP, Phase.TURN, Phase.RIVER]
+        return self.phase in order and new in order and order.index(new) > order.index(self.phase)
+
+    def _enter(self, new: Phase):
+        # tout (re)passage en PREFLOP = nouvelle main, y compris un retour depuis
+        # FLOP/TURN/RIVER (board vidé sans frame BETWEEN_HANDS)
+        if new == Phase.PREFLOP and self.phase != Phase.PREFLOP:
+            self.hand_id += 1
+            self._last = {}  # nouvelle main → on oublie les lectures
+        self.phase = new
+        self._pending, self._pending_n = None, 0
+
+    def update(self, probes: Probes) -> Phase:
+        self.tick += 1
+        self.probes = probes
+        new = self._target(probes)
+        if new == self.phase:
+            self._pending, self._pending_n = None, 0
+        elif self._is_progress(new):
+            self._enter(new)
+        else:
+            self._pending_n = self._pending_n + 1 if new == self._pending else 1
+            self._pending = new
+            if self._pending_n >= int(self.th["debounce"]):
+                self._enter(new)
+        # slots vidés → lecture obsolète
+        for i, n in enumerate(BOARD_ROIS):
+            if i >= probes.board_n:
+                self._last.pop(n, None)
+        if not probes.hero_present:
+            for n in HERO_ROIS:
+                self._last.pop(n, None)
+        return self.phase
+
+    def observe(self, table_rgb, cfg: dict) -> Phase:
+        return self.update(probe_frame(table_rgb, cfg, self.th))
+
+    # ---------- plan de lecture ----------
+    def _have_card(self, name: str) -> bool:
+        val = self._last.get(name)
+        return bool(val and val[0])
+
+    def absent_rois(self) -> Set[str]:
+        """ROIs cartes vides d'après les sondes (slots board non remplis, héros sans cartes)."""
+        out = set(BOARD_ROIS[self.probes.board_n:])
+        if not self.probes.hero_present:
+            out |= set(HERO_ROIS)
+        return out
+
+    def rois_to_read(self, stable: Optional[Set[str]] = None) -> Set[str]:
+        """
+        ROIs à lire pour cette frame. `stable` (StateStabilizer.stable_fields) :
+        une carte n'est plus relue qu'une fois stable; montants stables relus 2× moins souvent.
+        """
+        p = self.probes
+        out: Set[str] = set()
+        if self.phase in (Phase.WAITING, Phase.BETWEEN_HANDS):
+            return out  # seules les sondes tournent
+        done = (lambda n: n in stable) if stable is not None else self._have_card
+        if p.hero_present:
+            out |= {n for n in HERO_ROIS if not done(n)}
+        out |= {n for n in BOARD_ROIS[:p.board_n] if not done(n)}
+        if self.phase == Phase.SHOWDOWN:
+            return out
+        period = 1 if p.hero_turn else max(1, int(self.th["idle_amount_period"]))
+        if stable is not None and not p.hero_turn and {"pot_amount", "hero_stack"} <= stable:
+            period *= 2
+        if self.tick % period == 0 or "pot_amount" not in self._last:
+            out |= {"pot_amount", "hero_stack"}
+            if p.hero_turn:
+                out.add("action_strip")
+        if self._last.get("dealer") is None:
+            out.add("dealer")
+        return out
+
+    def merge(self, res: Dict[str, Any]) -> Dict[str, Any]:
+        """Ajoute les lectures fraîches à l'état connu et renvoie la vue complète."""
+        self._last.update(res)
+        if not self.probes.hero_turn and "action_strip" not in res:
+            # hors tour du héros, bandeau non lu: montant inconnu (et non un check certain)
+            self._last["action_strip"] = (None, 0.0)
+        return dict(self._last)
+
+    def may_query_policy(self) -> bool:
+        return self.phase in IN_HAND and self.probes.hero_turn
+
+def policy_allowed(state) -> bool:
+    """True si la policy peut tourner pour cet état (phase inconnue = pas de tracker → oui)."""
+    phase = getattr(state, "phase", "unknown")
+    return phase == "unknown" or bool(getattr(state, "hero_turn", False))
+
+_TRACKER: Optional[HandTracker] = None
+
+def get_hand_tracker(cfg: Optional[dict] = None) -> Optional[HandTracker]:
+    """Tracker process-wide, ou None si POKERIA_HAND_TRACKER=0."""
+    global _TRACKER
+    if os.getenv("POKERIA_HAND_TRACKER", "1") != "1":
+        return None
+    if _TRACKER is None:
+        _TRACKER = HandTracker(cfg)
+    return _TRACKER
@@ -13,3 +13,11 @@ class TableState:
     stacks: Dict[int, float] = field(default_factory=dict)
     actions: List[str] = field(default_factory=list)
     to_call: float = 0.0    # <<< montant à payer (€, si dispo)
+    phase: str = "unknown"  # phase HandTracker (waiting/preflop/.../between_hands)
+    hero_turn: bool = False # boutons d'action du héros visibles
+    confidences: Dict[str, float] = field(default_factory=dict)  # ROI -> conf fusionnée [0..1]
+
+    def compact(self):
+        """Vue compacte (cartes 0..51, centimes, hashable) — cf. src/state/compact.py."""
+        from src.state.compact import CompactState
+        return CompactState.from_state(self)
@@ -0,0 +1,104 @@
+# src/state/motion_gate.py
+from __future__ import annotations
+import os, cv2
+import numpy as np
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Set, Tuple
+
+from src.state.hand_tracker import HERO_ROIS, BOARD_ROIS, AMOUNT_ROIS
+
+# ──────────────────────────
+# Porte "énergie de mouvement" par ROI
+#   - anneau des dernières frames, en gris et réduites (1 resize par frame)
+#   - énergie ROI = moyenne |Δ| entre frames consécutives de l'anneau (0..1)
+#   - ROI en transition (distribution, jetons qui glissent) → pas d'OCR cette frame
+#   - ROI sautée → relue en priorité dès qu'elle est posée (retry)
+# Env:
+#   POKERIA_MOTION_GATE=1   (0 = désactivé)
+# YAML: motion_gate: {min_energy, settle, scale}
+# ──────────────────────────
+GATED_ROIS = HERO_ROIS + BOARD_ROIS + AMOUNT_ROIS
+
+DEFAULTS = {
+    "min_energy": 0.04,   # moyenne |Δ|/255 au-delà de laquelle la ROI bouge
+    "settle": 1,          # nb de Δ calmes consécutifs exigés (anneau = settle+1 frames)
+    "scale": 0.25,        # réduction de la frame avant différence
+}
+
+class MotionGate:
+    def __init__(self, cfg: Optional[dict] = None):
+        self.th = dict(DEFAULTS)
+        self.th.update((cfg or {}).get("motion_gate", {}) or {})
+        self.ring: Deque[np.ndarray] = deque(maxlen=max(1, int(self.th["settle"])) + 1)
+        self.energy: Dict[str, float] = {}
+        self.moving: Set[str] = set()
+        self.deferred: Set[str] = set()
+        self._rects: Dict[str, Tuple[int, int, int, int]] = {}
+        self._held: Dict[str, Any] = {}
+        self._geom_key: Optional[Tuple[int, int]] = None
+
+    def _prepare(self, w: int, h: int, cfg: dict):
+        if (w, h) == self._geom_key:
+            return
+        self._geom_key = (w, h)
+        self.ring.clear()
+        self._rects = {}
+        for n in GATED_ROIS:
+            rel = (cfg.get("rois_hint", {}).get(n) or {}).get("rel")
+            if not rel:
+                continue
+            rx, ry, rw, rh = rel
+            x, y = int(rx * w), int(ry * h)
+            self._rects[n] = (x, y, max(1, int(rw * w)), max(1, int(rh * h)))
+
+    def observe(self, table_rgb, cfg: dict) -> Set[str]:
+        """Ajoute la frame à l'anneau et renvoie les ROIs en transition."""
+        s = float(self.th["scale"])
+        H, W = table_rgb.shape[:2]
+        small = cv2.resize(cv2.cvtColor(table_rgb, cv2.COLOR_RGB2GRAY),
+                           (max(1, int(W * s)), max(1, int(H * s))), interpolation=cv2.INTER_AREA)
+        self._prepare(small.shape[1], small.shape[0], cfg)
+        self.ring.append(small.astype(np.int16))
+
+        frames = list(self.ring)
+        thr = float(self.th["min_energy"]) * 255.0
+        self.energy, self.moving = {}, set()
+        for n, (x, y, w, h) in self._rects.items():
+            e = [float(np.mean(np.abs(b[y:y+h, x:x+w] - a[y:y+h, x:x+w]))) for a, b in zip(frames, frames[1:])]
+            self.energy[n] = max(e) / 255.0 if e else 0.0
+            if e and max(e) > thr:
+                self.moving.add(n)
+        return self.moving
+
+    def gate(self, wanted: Set[str]) -> Set[str]:
+        """ROIs à lire: demandées + posées depuis un report, moins celles qui bougent."""
+        retry = self.deferred - self.moving
+        self.deferred = (self.deferred - retry) | (set(wanted) & self.moving)
+        return (set(wanted) | retry) - self.moving
+
+    def hold(self, res: Dict[str, Any]) -> Dict[str, Any]:
+        """Sans HandTracker: reprend la dernière lecture des ROIs sautées (le tracker fait déjà ce merge)."""
+        self._held.update(res)
+        out = dict(res)
+        for n in self.moving:
+            if n not in out and n in self._held:
+                out[n] = self._held[n]
+        return out
+
+    def in_motion(self) -> bool:
+        return bool(self.moving)
+
+    def reset(self):
+        self.ring.clear()
+        self.energy, self.moving, self.deferred, self._held = {}, set(), set(), {}
+
+_GATE: Optional[MotionGate] = None
+
+def get_motion_gate(cfg: Optional[dict] = None) -> Optional[MotionGate]:
+    """Porte process-wide, ou None si POKERIA_MOTION_GATE=0."""
+    global _GATE
+    if os.getenv("POKERIA_MOTION_GATE", "1") != "1":
+        return None
+    if _GATE is None:
+        _GATE = MotionGate(cfg)
+    return _GATE
@@ -1,28 +1,67 @@
+import os
 from collections import deque, Counter
-from typing import Optional, Deque, Tuple, List
+from typing import Optional, Deque, Tuple, List, Dict, Any, Hashable, Iterable, Set
+
+from src.state.hand_tracker import HERO_ROIS, BOARD_ROIS
 
 class FieldStabilizer:
-    def __init__(self, k: int = 3):
+    """
+    Vote pondéré par confiance sur les k dernières lectures d'un champ.
+      - commit immédiat si conf >= commit_conf (et pas contredit par le buffer)
+      - en cas de conflit sans majorité, on garde la dernière valeur validée
+      - k lectures vides d'affilée → valeur oubliée
+      - `stable` = valeur validée confirmée `stable_n` fois d'affilée → relecture moins fréquente
+    """
+    def __init__(self, k: int = 3, commit_conf: float = 0.97, stable_n: int = 2):
         self.k = k
-        self.buf: Deque[Tuple[Optional[str], float]] = deque(maxlen=k)
-        self.last: Optional[str] = None
+        self.commit_conf = commit_conf
+        self.stable_n = stable_n
+        self.buf: Deque[Tuple[Optional[Hashable], float]] = deque(maxlen=k)
+        self.last: Optional[Hashable] = None
+        self.conf: float = 0.0
+        self.streak: int = 0
+
+    def reset(self):
+        self.buf.clear()
+        self.last, self.conf, self.streak = None, 0.0, 0
+
+    def _weights(self) -> Counter:
+        cnt = Counter()
+        for v,c in self.buf:
+            if v is not None: cnt[v] += 1 + c*0.5
+        return cnt
 
-    def push(self, val: Optional[str], conf: float) -> Optional[str]:
+    def push(self, val: Optional[Hashable], conf: float) -> Optional[Hashable]:
         if val is None: conf = 0.0
         self.buf.append((val, conf))
         # vote majoritaire pondéré par conf
-        cnt = Counter()
-        for v,c in self.buf:
-            if v: cnt[v] += 1 + c*0.5
-        if not cnt: return self.last
-        best, score = cnt.most_common(1)[0]
-        # exige au moins 2 occurrences ou conf moyenne > 0.75
-        occ = sum(1 for v,_ in self.buf if v==best)
-        avgc = sum(c for v,c in self.buf if v==best)/max(1,occ)
-        if occ >= 2 or avgc >= 0.75:
-            self.last = best
+        cnt = self._weights()
+        if not cnt and len(self.buf) == self.k:
+            # k lectures vides d'affilée → le champ a réellement disparu (fin de main)
+            self.last, self.conf, self.streak = None, 0.0, 0
+        if cnt:
+            best, score = cnt.most_common(1)[0]
+            # lecture très sûre: commit direct, sauf si le buffer soutient davantage la valeur en place
+            if val is not None and conf >= self.commit_conf and cnt[val] >= cnt.get(self.last, 0.0):
+                best = val
+            # exige au moins 2 occurrences ou conf moyenne > 0.75 (ou lecture très sûre)
+            occ = sum(1 for v,_ in self.buf if v==best)
+            avgc = sum(c for v,c in self.buf if v==best)/max(1,occ)
+            if occ >= 2 or avgc >= 0.75 or (best == val and conf >= self.commit_conf):
+                self.last = best
+        # confiance de la valeur validée + série de confirmations
+        if self.last is not None:
+            confs = [c for v,c in self.buf if v==self.last]
+            if confs:
+                self.conf = sum(confs)/len(confs)
+            self.streak = self.streak + 1 if val == self.last else 0
         return self.last
 
+    @property
+    def stable(self) -> bool:
+        return self.last is not None and (self.streak >= self.stable_n or
+                                          (self.streak >= 1 and self.conf >= self.commit_conf))
+
 class CardsStabilizer:
     def __init__(self, k: int = 3):
         self.hero = [FieldStabilizer(k), FieldStabilizer(k)]
@@ -41,3 +80,76 @@ class CardsStabilizer:
             val, conf = cards[i] if i<len(cards) else (None,0.0)
             out.append(self.board[i].push(val, conf))
         return out
+
+# ──────────────────────────
+# Fusion temporelle des lectures ROI (format recognize_frame)
+#   cartes   : name -> (card|None, meta)   conf = min(rank_conf, suit_conf)
+#   montants : name -> (value, conf)
+# ──────────────────────────
+CARD_FIELDS   = HERO_ROIS + BOARD_ROIS
+AMOUNT_FIELDS = ["pot_amount", "hero_stack", "action_strip"]
+
+def card_conf(meta: Optional[Dict[str, Any]]) -> float:
+    meta = meta or {}
+    return float(min(meta.get("rank_conf", 0.0) or 0.0, meta.get("suit_conf", 0.0) or 0.0))
+
+class StateStabilizer:
+    """Un FieldStabilizer par ROI; `push` renvoie les valeurs validées des champs lus."""
+    def __init__(self, k: int = 3, commit_conf: float = 0.97, stable_n: int = 2):
+        self.hand_id = 0
+        self.phase: Optional[str] = None
+        self.hero_turn = False
+        self.fields: Dict[str, FieldStabilizer] = {
+            n: FieldStabilizer(k, commit_conf, stable_n) for n in CARD_FIELDS + AMOUNT_FIELDS
+        }
+
+    def reset(self, names: Optional[Iterable[str]] = None):
+        for n in (self.fields if names is None else names):
+            if n in self.fields:
+                self.fields[n].reset()
+
+    def sync(self, hand_id: int, phase: Optional[str], hero_turn: bool):
+        """
+        Contexte du tracker: nouvelle main → tout repart de zéro; nouvelle street ou début du
+        tour du héros → montants réinitialisés (pot / to_call d'avant ne votent plus contre la
+        nouvelle lecture, validée dès la 1re frame sûre).
+        """
+        if hand_id != self.hand_id:
+            self.reset()
+        elif phase != self.phase or (hero_turn and not self.hero_turn):
+            self.reset(AMOUNT_FIELDS)
+        self.hand_id, self.phase, self.hero_turn = hand_id, phase, bool(hero_turn)
+
+    def push(self, res: Dict[str, Any]) -> Dict[str, Any]:
+        out = dict(res)
+        for n, r in res.items():
+            fs = self.fields.get(n)
+            if fs is None or r is None:
+                continue
+            if n in CARD_FIELDS:
+                val, meta = r
+                card = fs.push(val, card_conf(meta) if val else 0.0)
+                out[n] = (card, {**(meta or {}), "fused_conf": fs.conf if card else 0.0, "stable": fs.stable})
+            else:
+                val, conf = r
+                ok = val is not None and float(conf or 0.0) > 0.0  # lecture ratée → ne vote pas
+                v = fs.push(round(float(val), 2) if ok else None, float(conf or 0.0))
+                out[n] = (v, fs.conf if v is not None else 0.0)
+        return out
+
+    def stable_fields(self) -> Set[str]:
+        return {n for n, fs in self.fields.items() if fs.stable}
+
+_STAB: Optional[StateStabilizer] = None
+
+def get_state_stabilizer() -> Optional[StateStabilizer]:
+    """Stabiliseur process-wide, ou None si POKERIA_STABILIZE=0."""
+    global _STAB
+    if os.getenv("POKERIA_STABILIZE", "1") != "1":
+        return None
+    if _STAB is None:
+        _STAB = StateStabilizer(
+            k=int(os.getenv("POKERIA_STAB_K", "3")),
+            commit_conf=float(os.getenv("POKERIA_STAB_COMMIT_CONF", "0.97")),
+        )
+    return _STAB
@@ -0,0 +1,34 @@
+# src/tools/bench_eval.py
+# Bench évaluateur de mains (API numpy) sur mains 7 cartes aléatoires.
+#   python -m src.tools.bench_eval --n 2000000
+import argparse, time
+import numpy as np
+
+from src.featurize.evaluator import evaluate_batch, get_tables, hand_category, CATEGORY_NAMES
+
+def random_hands(n: int, k: int = 7, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return np.argsort(rng.random((n, 52)), axis=1)[:, :k].astype(np.int8)
+
+def main():
+    ap = argparse.ArgumentParser(description="Bench évaluateur 7 cartes")
+    ap.add_argument("--n", type=int, default=2_000_000)
+    ap.add_argument("--rounds", type=int, default=3)
+    args = ap.parse_args()
+
+    t0 = time.perf_counter(); get_tables()
+    print(f"tables: {(time.perf_counter() - t0) * 1000:.0f} ms")
+    base = random_hands(min(args.n, 100_000))
+    hands = np.tile(base, (max(1, args.n // len(base)), 1))
+    best = 0.0
+    for _ in range(args.rounds):
+        t0 = time.perf_counter()
+        vals = evaluate_batch(hands)
+        best = max(best, len(hands) / (time.perf_counter() - t0))
+    print(f"{len(hands)} mains: {best / 1e6:.1f} M évals/s")
+    cats = np.bincount(hand_category(vals), minlength=9) / len(vals)
+    for name, p in zip(CATEGORY_NAMES, cats):
+        print(f"  {name:<15} {p * 100:6.2f} %")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# src/tools/bench_ocr_pool.py
+# Benchmark OCR: in-process vs pool multi-process (1, 2, 4 workers) sur frames enregistrées.
+#   python -m src.tools.bench_ocr_pool --record 20          (capture 20 frames → logs/frames/)
+#   python -m src.tools.bench_ocr_pool --workers 1 2 4      (bench sur logs/frames/*.png)
+import argparse, time
+import cv2
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from src.config.settings import load_room_config, ACTIVE_ROOM
+from src.state.builder import crop_from_cfg, capture_frame, _read_amount_variants, _read_amount_pooled
+from src.ocr.cards import read_card
+from src.ocr.engine import EasyOCREngine
+from src.ocr.ocr_pool import OcrProcessPool, PooledEngine
+
+CARD_ROIS   = ["hero_card_left", "hero_card_right"] + [f"board_card_{k}" for k in range(1, 6)]
+AMOUNT_ROIS = ["pot_amount", "hero_stack"]
+
+def record(outdir: Path, n: int, period_s: float):
+    outdir.mkdir(parents=True, exist_ok=True)
+    for i in range(n):
+        rgb = capture_frame()
+        p = outdir / f"frame_{time.strftime('%Y%m%d_%H%M%S')}_{i:03d}.png"
+        cv2.imwrite(str(p), cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR))
+        time.sleep(period_s)
+    print(f"✅ {n} frames → {outdir}")
+
+def load_frames(d: Path):
+    out = []
+    for p in sorted(d.glob("*.png")):
+        bgr = cv2.imread(str(p), cv2.IMREAD_COLOR)
+        if bgr is not None:
+            out.append(cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB))
+    return out
+
+def run_frame(engine, read_amount, cfg, rgb, threads: ThreadPoolExecutor):
+    futs = []
+    for n in CARD_ROIS:
+        crop = crop_from_cfg(cfg, rgb, n)
+        if crop is not None:
+            futs.append(threads.submit(read_card, engine, crop, n, cfg))
+    for n in AMOUNT_ROIS:
+        crop = crop_from_cfg(cfg, rgb, n)
+        if crop is not None:
+            futs.append(threads.submit(read_amount, engine, crop))
+    return [f.result() for f in futs]
+
+def bench(label, engine, read_amount, cfg, frames, threads):
+    run_frame(engine, read_amount, cfg, frames[0], threads)  # warmup (hors mesure)
+    t0 = time.perf_counter()
+    for rgb in frames:
+        run_frame(engine, read_amount, cfg, rgb, threads)
+    dt = time.perf_counter() - t0
+    ms = dt * 1000.0 / len(frames)
+    print(f"{label:<14} {ms:8.1f} ms/frame   {len(frames)/dt:6.2f} fps")
+    return ms
+
+def main():
+    ap = argparse.ArgumentParser(description="Bench pool OCR multi-process")
+    ap.add_argument("--frames", default="logs/frames", help="dossier de frames table (PNG)")
+    ap.add_argument("--record", type=int, default=0, help="capturer N frames puis quitter")
+    ap.add_argument("--period", type=float, default=0.5, help="pause entre captures (s)")
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = ap.parse_args()
+
+    d = Path(args.frames)
+    if args.record > 0:
+        record(d, args.record, args.period)
+        return
+
+    frames = load_frames(d)
+    if not frames:
+        print(f"❌ Aucune frame dans {d} (utilise --record N).")
+        return
+    cfg = load_room_config(ACTIVE_ROOM)
+    print(f"=== OCR bench: {len(frames)} frames, {len(CARD_ROIS)} cartes + {len(AMOUNT_ROIS)} montants ===")
+
+    with ThreadPoolExecutor(max_workers=len(CARD_ROIS) + len(AMOUNT_ROIS)) as threads:
+        base = bench("in-process", EasyOCREngine(gpu=False), _read_amount_variants, cfg, frames, threads)
+        for n in args.workers:
+            pool = OcrProcessPool(n)
+            pool.warmup()
+            try:
+                ms = bench(f"pool x{n}", PooledEngine(pool), _read_amount_pooled, cfg, frames, threads)
+                print(f"{'':<14} speedup ×{base / max(1e-6, ms):.2f}")
+            finally:
+                pool.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+# src/tools/build_preflop_table.py
+# Génère la table d'équité preflop 169 × 9 (moteur src/featurize/equity.py).
+#   python -m src.tools.build_preflop_table --samples 50000 --procs 8
+import argparse, os, sys, time
+
+from src.featurize.preflop import TABLE_PATH, build_table, save_table, class_label
+
+def main():
+    ap = argparse.ArgumentParser(description="Table d'équité preflop 169 classes × 1..9 adversaires")
+    ap.add_argument("--samples", type=int, default=50_000, help="tirages Monte Carlo par cellule")
+    ap.add_argument("--procs", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", default=str(TABLE_PATH))
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    def progress(done, total):
+        if done % 50 == 0 or done == total:
+            sys.stdout.write(f"\r{done}/{total} cellules ({time.perf_counter() - t0:.0f} s)")
+            sys.stdout.flush()
+    table = build_table(args.samples, args.procs, args.seed, progress)
+    print()
+    path = save_table(table, args.out)
+    print(f"→ {path} ({path.stat().st_size} octets)")
+    for c in (168, 167, 155, 0):  # AA, AKs, AKo, 22
+        print(f"  {class_label(c):<4} " + " ".join(f"{e:.3f}" for e in table[c]))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+# src/tools/compact_decisions.py
+# Compacte logs/decisions*.csv en colonnes numpy (src/policy/decision_store.py).
+#   python -m src.tools.compact_decisions --summary
+import argparse, time
+from pathlib import Path
+
+from src.policy.decision_store import STORE_DIR, DecisionStore, compact_decisions, log_files
+from src.policy.logger import LOG_DIR
+
+def main():
+    ap = argparse.ArgumentParser(description="Journal des décisions CSV → store colonnes (mmap)")
+    ap.add_argument("--logs", default=str(LOG_DIR), help="dossier des decisions*.csv")
+    ap.add_argument("--out", default=str(STORE_DIR))
+    ap.add_argument("--summary", action="store_true", help="affiche quelques agrégats")
+    args = ap.parse_args()
+
+    files = log_files(Path(args.logs))
+    t0 = time.perf_counter()
+    meta = compact_decisions(files, Path(args.out))
+    print(f"{meta['rows']} décisions, {len(files)} fichier(s) → {args.out} ({time.perf_counter() - t0:.2f} s)")
+    if not args.summary or not meta["rows"]:
+        return
+    st = DecisionStore.open(Path(args.out))
+    t0 = time.perf_counter()
+    fold = st.rate("position", action="fold")
+    conf = st.mean("confidence", by="street")
+    acts = st.count(by="action")
+    ms = (time.perf_counter() - t0) * 1000.0
+    print("fold % par position : " + "  ".join(f"{k}={100 * v:.0f}" for k, v in sorted(fold.items())))
+    print("confiance par street: " + "  ".join(f"{k}={v:.2f}" for k, v in sorted(conf.items())))
+    print("actions             : " + "  ".join(f"{k or '?'}={v}" for k, v in sorted(acts.items())))
+    print(f"({ms:.1f} ms)")
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import cv2, numpy as np
+from functools import lru_cache
 from pathlib import Path
 from src.capture.screen import capture_table
 from src.config.settings import get_table_roi, load_room_config, ACTIVE_ROOM
@@ -19,10 +20,14 @@ def match_template(img_bgr, templ_bgr):
             best = (res, maxVal, maxLoc, s)
     return best  # (res, score, topLeft, scale)
 
+@lru_cache(maxsize=1)
+def _load_template():
+    return cv2.imread(str(TEMPLATE_PATH)) if TEMPLATE_PATH.exists() else None
+
 def detect_by_template(img_bgr):
-    if not TEMPLATE_PATH.exists():
+    templ = _load_template()
+    if templ is None:
         return None
-    templ = cv2.imread(str(TEMPLATE_PATH))
     _, score, topLeft, s = match_template(img_bgr, templ)
     if score < 0.55:
         return None
@@ -55,8 +60,37 @@ def detect_by_hough(img_bgr):
         return (best[0], best[1]), best[2]/255.0
     return None
 
+def bench(table_rgb, cfg, n: int = 20):
+    """Compare la détection plein cadre (template puis Hough) au DealerTracker (fenêtres sièges)."""
+    import time
+    from src.state.dealer_tracker import DealerTracker
+    img_bgr = cv2.cvtColor(table_rgb, cv2.COLOR_RGB2BGR)
+    t0 = time.perf_counter()
+    for _ in range(n):
+        detect_by_template(img_bgr) or detect_by_hough(img_bgr)
+    full_ms = (time.perf_counter() - t0) * 1000.0 / n
+
+    tr = DealerTracker(cfg)
+    t0 = time.perf_counter(); seat = tr.detect(table_rgb, cfg)
+    first_ms = (time.perf_counter() - t0) * 1000.0
+    t0 = time.perf_counter()
+    for _ in range(n):
+        tr.detect(table_rgb, cfg)
+    track_ms = (time.perf_counter() - t0) * 1000.0 / n
+    print(f"plein cadre : {full_ms:7.2f} ms/frame")
+    print(f"tracker     : {first_ms:7.2f} ms (1re frame, géométrie incluse) puis {track_ms:.2f} ms/frame"
+          f"  → ×{full_ms / max(1e-6, track_ms):.1f}  (seat={seat})")
+
 def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="Détection bouton dealer")
+    ap.add_argument("--bench", type=int, default=0, help="N itérations: plein cadre vs DealerTracker")
+    args = ap.parse_args()
+
     table_rgb = capture_table(get_table_roi(ACTIVE_ROOM))
+    if args.bench > 0:
+        bench(table_rgb, load_room_config(ACTIVE_ROOM), args.bench)
+        return
     img_bgr = cv2.cvtColor(table_rgb, cv2.COLOR_RGB2BGR)
     H, W = img_bgr.shape[:2]
 
@@ -3,18 +3,23 @@ from PySide6 import QtCore, QtGui, QtWidgets
 import os, time
 
 from src.state.builder import build_state
+from src.state.hand_tracker import policy_allowed
+from src.state.motion_gate import get_motion_gate
 from src.ocr.engine_singleton import get_engine
 from src.featurize.features import featurize
-from src.policy.ollama_client import ask_policy
-from src.policy.postprocess import finalize_action
+from src.featurize.cards_utils import canonical_cards
+from src.policy.decision_cache import PolicyCache
+from src.policy.fast_policy import race_policy, finalize_raced
 from src.runtime.window_lock import LOCK  # suivi fenêtres/lock
+from src.runtime.refresh import RefreshScheduler
 
 # ---------- Config ----------
-REFRESH_MS        = int(os.getenv("POKERIA_REFRESH_MS", "1000"))
+REFRESH_MS        = int(os.getenv("POKERIA_REFRESH_MS", "1000"))  # cadence normale (adaptative, cf. runtime/refresh.py)
 POLICY_PERIOD_S   = float(os.getenv("POKERIA_POLICY_PERIOD", "2.5"))
 MANUAL_ONLY       = os.getenv("POKERIA_MANUAL_ONLY", "0") == "1"
 FOLLOW_ROI        = os.getenv("POKERIA_OVERLAY_FOLLOW_ROI", "1") == "1"
 COLORBLIND        = os.getenv("POKERIA_COLORBLIND", "0") == "1"
+USE_PIPELINE      = os.getenv("POKERIA_PIPELINE", "0") == "1"  # capture/OCR/policy en étages
 
 # ☑️ Fond configurable
 PANEL_RGB_STR     = os.getenv("POKERIA_PANEL_RGB", "0,0,0")  # ex: "20,20,24"
@@ -82,7 +87,8 @@ class Worker(QtCore.QObject):
                     action={"type":"none","size_bb":0.0,"percent":0.0,"confidence":0.0,"rationale":"paused"},
                     signature="(paused)", policy_queried=False,
                     ocr_ms=0.0, policy_ms=0.0,
-                    debug_rois=[], table_rect=LOCK.get_rect()
+                    debug_rois=[], table_rect=LOCK.get_rect(),
+                    phase="unknown", hero_turn=False, background=True, motion=False
                 ))
                 self.finished.emit()
                 return
@@ -98,7 +104,8 @@ class Worker(QtCore.QObject):
             to_call = float(getattr(st, "to_call", 0.0) or 0.0)
             dealer  = getattr(st, "dealer_seat", None)
 
-            sig = f"{' '.join(hero)}|{' '.join(board)}|{to_call:.2f}|{pot:.2f}"
+            c_hero, c_board = canonical_cards(hero, board)  # cache policy insensible aux couleurs
+            sig = f"{' '.join(c_hero)}|{' '.join(c_board)}|{to_call:.2f}|{pot:.2f}"
 
             debug_rois = []
             if self.want_debug_rois:
@@ -118,10 +125,21 @@ class Worker(QtCore.QObject):
             except Exception:
                 table_rect = None
 
-            do_policy = self.force_policy or (self.allow_policy and (sig != self.last_sig) and len(hero) >= 2)
+            do_policy = self.force_policy or (self.allow_policy and (sig != self.last_sig) and len(hero) >= 2
+                                              and policy_allowed(st))
+
+            ocr_ms = (time.perf_counter() - ocr_t0) * 1000.0
+            motion = bool(get_motion_gate() and get_motion_gate().in_motion())
+
+            def emit(action, policy_ms=0.0):
+                self.resultReady.emit(WorkResult(
+                    hero=hero, board=board, pot=pot, stack=stack, to_call=to_call, dealer=dealer,
+                    action=action, signature=sig, policy_queried=bool(do_policy),
+                    ocr_ms=ocr_ms, policy_ms=policy_ms,
+                    debug_rois=debug_rois, table_rect=table_rect,
+                    phase=st.phase, hero_turn=st.hero_turn, background=False, motion=motion
+                ))
 
-            action = None
-            policy_ms = 0.0
             if do_policy:
                 pol_t0 = time.perf_counter()
                 x, _, dbg = featurize(st)
@@ -130,24 +148,42 @@ class Worker(QtCore.QObject):
                 dbg["pot_size"]    = pot
                 dbg["hero_stack"]  = stack
                 dbg["to_call"]     = to_call
-                raw = ask_policy(x, dbg)
-                action = finalize_action(raw, dbg)
-                policy_ms = (time.perf_counter() - pol_t0) * 1000.0
-
-            ocr_ms = (time.perf_counter() - ocr_t0) * 1000.0
-
-            self.resultReady.emit(WorkResult(
-                hero=hero, board=board, pot=pot, stack=stack, to_call=to_call, dealer=dealer,
-                action=action, signature=sig, policy_queried=bool(do_policy),
-                ocr_ms=ocr_ms, policy_ms=policy_ms,
-                debug_rois=debug_rois, table_rect=table_rect
-            ))
+                # réponse rapide affichée tout de suite, remplacée si le LLM répond avant l'échéance
+                raw, source = race_policy(x, dbg, on_fast=lambda fast: emit(
+                    finalize_raced(fast, dbg, "fast"), (time.perf_counter() - pol_t0) * 1000.0))
+                emit(finalize_raced(raw, dbg, source), (time.perf_counter() - pol_t0) * 1000.0)
+            else:
+                emit(None)
         except Exception as e:
             self.error.emit(f"{type(e).__name__}: {e}")
         finally:
             self.finished.emit()
 
 
+# ---------- Pipeline (threads) → UI ----------
+class PipelineBridge(QtCore.QObject):
+    """Relaye les callbacks du FramePipeline (threads) vers le thread UI via signaux."""
+    stateReady  = QtCore.Signal(object)  # WorkResult
+    actionReady = QtCore.Signal(object)  # (fid, sig, action, policy_ms)
+    error       = QtCore.Signal(str)
+
+    def on_state(self, fid, st, sig):
+        self.stateReady.emit(WorkResult(
+            fid=fid, hero=st.hero_cards[:], board=st.community_cards[:],
+            pot=float(st.pot_size or 0.0), stack=float(st.hero_stack or 0.0),
+            to_call=float(st.to_call or 0.0), dealer=st.dealer_seat,
+            action=None, signature=sig, policy_queried=False,
+            ocr_ms=0.0, policy_ms=0.0, debug_rois=[], table_rect=None,
+            phase=st.phase, hero_turn=st.hero_turn, background=False, motion=False
+        ))
+
+    def on_action(self, fid, sig, action, policy_ms):
+        self.actionReady.emit((fid, sig, action, policy_ms))
+
+    def on_error(self, stage, e):
+        self.error.emit(f"{stage}: {type(e).__name__}: {e}")
+
+
 # ---------- Overlay UI ----------
 class Overlay(QtWidgets.QWidget):
     def __init__(self):
@@ -257,15 +293,53 @@ class Overlay(QtWidgets.QWidget):
         self.show_rois = False
         self._debug_rois = []
         self._last_table_rect = None
-        self._policy_cache = {}
+        self._policy_cache = PolicyCache(max_size=256)  # affichage: signature → action finalisée
 
         self._refresh_mode_label()
         self._tick_win_status(force=True)
 
-        # Timer principal
+        # Timer principal (ou pipeline par étages)
+        self.pipeline = None
+        self._last_res = None
+        self.refresh = RefreshScheduler(base_ms=REFRESH_MS)
         self.timer = QtCore.QTimer(self)
         self.timer.timeout.connect(self.tick)
-        self.timer.start(REFRESH_MS)
+        if USE_PIPELINE:
+            self._start_pipeline()
+        else:
+            self.timer.start(REFRESH_MS)
+
+    # ---------- pipeline ----------
+    def _start_pipeline(self):
+        from src.runtime.pipeline import FramePipeline
+        self.bridge = PipelineBridge()
+        self.bridge.stateReady.connect(self.on_result)
+        self.bridge.actionReady.connect(self.on_pipeline_action)
+        self.bridge.error.connect(self.on_error)
+        self.pipeline = FramePipeline(
+            on_state=self.bridge.on_state,
+            on_action=self.bridge.on_action,
+            on_error=self.bridge.on_error,
+            is_paused=lambda: self.paused,
+            allow_policy=lambda: self.auto_mode,
+        )
+        self.pipeline.start()
+
+    @QtCore.Slot(object)
+    def on_pipeline_action(self, payload):
+        _fid, sig, action, policy_ms = payload
+        self._policy_cache[sig] = action
+        self.last_policy_ts = time.monotonic()
+        if self._last_res is not None and self._last_res.signature == sig:
+            self._last_res.action = action
+            self._last_res.policy_queried = True
+            self._last_res.policy_ms = policy_ms
+            self.on_result(self._last_res)
+
+    def closeEvent(self, ev):
+        if self.pipeline is not None:
+            self.pipeline.stop()
+        super().closeEvent(ev)
 
     # ---------- Titlebar (interaction) ----------
     def _setup_titlebar(self):
@@ -392,6 +466,8 @@ class Overlay(QtWidgets.QWidget):
     @QtCore.Slot()
     def ask_now(self):
         self.force_policy_once = True
+        if self.pipeline is not None:
+            self.pipeline.request_policy()
         self.status.setText("⏳ Demande de conseil…")
 
     @QtCore.Slot()
@@ -447,6 +523,7 @@ class Overlay(QtWidgets.QWidget):
 
     @QtCore.Slot(object)
     def on_result(self, res: WorkResult):
+        self._last_res = res
         if res.table_rect:
             self._last_table_rect = res.table_rect
             self._maybe_follow_roi(res.table_rect)
@@ -465,7 +542,8 @@ class Overlay(QtWidgets.QWidget):
             self.last_policy_ts = time.monotonic()
         else:
             a = self._policy_cache.get(res.signature)
-        self.last_sig = res.signature
+        if res.policy_queried:  # comme pipeline._queried_sig: hors tour du héros, la signature n'avance pas
+            self.last_sig = res.signature
 
         if not a:
             self.action.setText("Action: —")
@@ -485,19 +563,40 @@ class Overlay(QtWidgets.QWidget):
             self.action.setText(text)
             self._apply_action_theme(typ, cf)
 
-        if res.policy_queried:
+        if res.policy_queried and a and a.get("source") == "fast":
+            self.status.setText("⚡ Conseil rapide (IA en attente)")
+        elif res.policy_queried:
             self.status.setText("✅ Conseil mis à jour")
         else:
             self.status.setText("")
 
-        self.perf_lbl.setText(
-            f"⏱ OCR {res.ocr_ms:.0f} ms" + (f" • IA {res.policy_ms:.0f} ms" if res.policy_ms else "")
-        )
+        if self.pipeline is not None:
+            snap = self.pipeline.snapshot()
+            q = snap["queues"]
+            self.perf_lbl.setText(
+                f"⏱ {snap['fps']:.1f} fps • files {q['recognize']}/{q['fuse']}/{q['policy']}"
+                + (f" • IA {res.policy_ms:.0f} ms" if res.policy_ms else "")
+                + f" • {snap['refresh']['label']}"
+            )
+        else:
+            self._reschedule(res)
+            self.perf_lbl.setText(
+                f"⏱ OCR {res.ocr_ms:.0f} ms" + (f" • IA {res.policy_ms:.0f} ms" if res.policy_ms else "")
+                + f" • {self.refresh.label()}"
+            )
 
         self._debug_rois = res.debug_rois if isinstance(res.debug_rois, list) else []
         if self.show_rois:
             self.update()
 
+    def _reschedule(self, res: WorkResult):
+        """Période du timer principal selon l'état lu (tour héros, changement, idle, fond)."""
+        ms, _why = self.refresh.update(res.signature, getattr(res, "phase", "unknown"),
+                                       getattr(res, "hero_turn", False), getattr(res, "background", False),
+                                       motion=getattr(res, "motion", False))
+        if self.timer.isActive() and self.timer.interval() != ms:
+            self.timer.setInterval(ms)
+
     @QtCore.Slot(str)
     def on_error(self, msg: str):
         self.status.setText(f"ERR: {msg}")
@@ -26,7 +26,8 @@
 #   POKERIA_PANEL_RGB="16,18,24"  (fond RGB)
 #   POKERIA_PANEL_OPACITY=0.60     (0..1)
 #   POKERIA_COLORBLIND=0/1         (palette dalto-friendly)
-#   POKERIA_REFRESH_MS=800         (si ON_DEMAND=0)
+#   POKERIA_REFRESH_MS=800         (si ON_DEMAND=0; cadence normale, adaptative cf. runtime/refresh.py)
+#   POKERIA_ADAPTIVE_REFRESH=1     (0 = période fixe)
 #   POKERIA_POLICY_PERIOD=2.5      (intervalle min en AUTO)
 #   POKERIA_REQUIRE_FOREGROUND=1   (pause si fenêtre poker pas au 1er plan)
 #   POKERIA_THEME=default          (default, light, dark, green)
@@ -36,11 +37,15 @@ import os, time, json
 from pathlib import Path
 
 from src.state.builder import build_state
+from src.state.hand_tracker import policy_allowed
+from src.state.motion_gate import get_motion_gate
 from src.ocr.engine_singleton import get_engine
 from src.featurize.features import featurize
-from src.policy.ollama_client import ask_policy
-from src.policy.postprocess import finalize_action
+from src.featurize.cards_utils import canonical_cards
+from src.policy.decision_cache import PolicyCache
+from src.policy.fast_policy import race_policy, finalize_raced
 from src.runtime.window_lock import LOCK
+from src.runtime.refresh import RefreshScheduler
 
 # ---------- Config ----------
 REFRESH_MS      = int(os.getenv("POKERIA_REFRESH_MS", "800"))
@@ -180,7 +185,8 @@ class Worker(QtCore.QObject):
                     signature="(paused)", policy_queried=False,
                     ocr_ms=0.0, policy_ms=0.0,
                     debug_rois=[], table_rect=LOCK.get_rect(),
-                    players_count=0, blinds=(0, 0), player_actions={}
+                    players_count=0, blinds=(0, 0), player_actions={},
+                    phase="unknown", hero_turn=False, background=True, motion=False
                 ))
                 self.finished.emit(); return
         try:
@@ -207,7 +213,8 @@ class Worker(QtCore.QObject):
                     action_info.get('hand_strength')
                 )
 
-            sig = f"{' '.join(hero)}|{' '.join(board)}|{to_call:.2f}|{pot:.2f}"
+            c_hero, c_board = canonical_cards(hero, board)  # cache policy insensible aux couleurs
+            sig = f"{' '.join(c_hero)}|{' '.join(c_board)}|{to_call:.2f}|{pot:.2f}"
 
             debug_rois = []
             if self.want_debug_rois:
@@ -227,10 +234,22 @@ class Worker(QtCore.QObject):
             except Exception:
                 table_rect = None
 
-            do_policy = self.force_policy or (self.allow_policy and (sig != self.last_sig) and len(hero) >= 2)
+            do_policy = self.force_policy or (self.allow_policy and (sig != self.last_sig) and len(hero) >= 2
+                                              and policy_allowed(st))
+
+            ocr_ms = (time.perf_counter() - ocr_t0) * 1000.0
+            motion = bool(get_motion_gate() and get_motion_gate().in_motion())
+
+            def emit(action, policy_ms=0.0):
+                self.resultReady.emit(WorkResult(
+                    hero=hero, board=board, pot=pot, stack=stack, to_call=to_call, dealer=dealer,
+                    action=action, signature=sig, policy_queried=bool(do_policy),
+                    ocr_ms=ocr_ms, policy_ms=policy_ms,
+                    debug_rois=debug_rois, table_rect=table_rect,
+                    players_count=players_count, blinds=blinds, player_actions=player_actions,
+                    phase=st.phase, hero_turn=st.hero_turn, background=False, motion=motion
+                ))
 
-            action = None
-            policy_ms = 0.0
             if do_policy:
                 pol_t0 = time.perf_counter()
                 x, _, dbg = featurize(st)
@@ -239,19 +258,12 @@ class Worker(QtCore.QObject):
                     "pot_size": pot, "hero_stack": stack, "to_call": to_call,
                     "players_count": players_count, "blinds": blinds
                 })
-                raw = ask_policy(x, dbg)
-                action = finalize_action(raw, dbg)
-                policy_ms = (time.perf_counter() - pol_t0) * 1000.0
-
-            ocr_ms = (time.perf_counter() - ocr_t0) * 1000.0
-
-            self.resultReady.emit(WorkResult(
-                hero=hero, board=board, pot=pot, stack=stack, to_call=to_call, dealer=dealer,
-                action=action, signature=sig, policy_queried=bool(do_policy),
-                ocr_ms=ocr_ms, policy_ms=policy_ms,
-                debug_rois=debug_rois, table_rect=table_rect,
-                players_count=players_count, blinds=blinds, player_actions=player_actions
-            ))
+                # réponse rapide affichée tout de suite, remplacée si le LLM répond avant l'échéance
+                raw, source = race_policy(x, dbg, on_fast=lambda fast: emit(
+                    finalize_raced(fast, dbg, "fast"), (time.perf_counter() - pol_t0) * 1000.0))
+                emit(finalize_raced(raw, dbg, source), (time.perf_counter() - pol_t0) * 1000.0)
+            else:
+                emit(None)
         except Exception as e:
             self.error.emit(f"{type(e).__name__}: {e}")
         finally:
@@ -416,9 +428,10 @@ class CompactOverlay(QtWidgets.QWidget):
         self.detailed_mode = False
         self._debug_rois = []
         self._last_table_rect = None
-        self._policy_cache = {}
+        self._policy_cache = PolicyCache(max_size=256)  # affichage: signature → action finalisée
 
         # Timer principal OU mode on-demand
+        self.refresh = RefreshScheduler(base_ms=REFRESH_MS)
         self.timer = QtCore.QTimer(self)
         self.timer.timeout.connect(self.tick)
         if not ON_DEMAND:
@@ -624,7 +637,8 @@ class CompactOverlay(QtWidgets.QWidget):
             self.last_policy_ts = time.monotonic()
         else:
             a = self._policy_cache.get(res.signature)
-        self.last_sig = res.signature
+        if res.policy_queried:  # comme pipeline._queried_sig: hors tour du héros, la signature n'avance pas
+            self.last_sig = res.signature
 
         if not a:
             self.action.setText("—")
@@ -642,10 +656,18 @@ class CompactOverlay(QtWidgets.QWidget):
             if typ == "raise":
                 txt += f"  ({sz:.2f} bb ~ {int(pr*100)}% pot)"
             txt += f"  • {int(cf*100)}%"
+            if a.get("source") == "fast":
+                txt += "  ⚡"  # réponse rapide, IA en attente / en retard
             self.action.setText(txt)
             self._apply_action_theme(typ, cf)
 
-        self.perf_lbl.setText(f"⏱ OCR {res.ocr_ms:.0f} ms" + (f" • IA {res.policy_ms:.0f} ms" if res.policy_ms else ""))
+        perf = f"⏱ OCR {res.ocr_ms:.0f} ms" + (f" • IA {res.policy_ms:.0f} ms" if res.policy_ms else "")
+        if self.timer.isActive():
+            ms, _why = self.refresh.update(res.signature, res.phase, res.hero_turn, res.background, motion=res.motion)
+            if self.timer.interval() != ms:
+                self.timer.setInterval(ms)
+            perf += f" • {self.refresh.label()}"
+        self.perf_lbl.setText(perf)
 
         self._debug_rois = res.debug_rois if isinstance(res.debug_rois, list) else []
         if self.show_rois:
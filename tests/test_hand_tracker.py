@@ -0,0 +1,60 @@
+"""
+Tests for the hand-cycle state machine (HandTracker).
+Covers new-hand detection and what merge() reports for unread ROIs.
+"""
+
+import unittest
+
+try:
+    from src.state.hand_tracker import HandTracker, Phase, Probes
+except ImportError:  # dépendances runtime absentes (cv2)
+    HandTracker = None
+
+
+def _feed(tr, probes, n=1):
+    for _ in range(n):
+        tr.update(probes)
+    return tr.phase
+
+
+@unittest.skipIf(HandTracker is None, "cv2 non installé")
+class TestHandTracker(unittest.TestCase):
+
+    def test_back_to_preflop_from_river_starts_new_hand(self):
+        """Board vidé sans frame BETWEEN_HANDS: nouvelle main, cartes héros oubliées."""
+        tr = HandTracker()
+        self.assertEqual(_feed(tr, Probes(hero_present=True, board_n=0), 2), Phase.PREFLOP)
+        first = tr.hand_id
+        tr.merge({"hero_card_left": ("Ah", {}), "hero_card_right": ("Kd", {})})
+        for n in (3, 4, 5):
+            _feed(tr, Probes(hero_present=True, board_n=n))
+        self.assertEqual(tr.phase, Phase.RIVER)
+        self.assertEqual(tr.hand_id, first)
+
+        self.assertEqual(_feed(tr, Probes(hero_present=True, board_n=0), 2), Phase.PREFLOP)
+        self.assertEqual(tr.hand_id, first + 1)
+        view = tr.merge({})
+        self.assertNotIn("hero_card_left", view)
+        self.assertNotIn("hero_card_right", view)
+        self.assertIn("hero_card_left", tr.rois_to_read())
+
+    def test_preflop_debounce_keeps_hand(self):
+        """Une seule frame board vide (glitch) ne change pas de main."""
+        tr = HandTracker()
+        _feed(tr, Probes(hero_present=True, board_n=0), 2)
+        _feed(tr, Probes(hero_present=True, board_n=3))
+        hand = tr.hand_id
+        _feed(tr, Probes(hero_present=True, board_n=0))
+        _feed(tr, Probes(hero_present=True, board_n=3))
+        self.assertEqual((tr.phase, tr.hand_id), (Phase.FLOP, hand))
+
+    def test_merge_does_not_invent_to_call(self):
+        tr = HandTracker()
+        _feed(tr, Probes(hero_present=True, board_n=0, hero_turn=False), 2)
+        self.assertEqual(tr.merge({})["action_strip"], (None, 0.0))
+        _feed(tr, Probes(hero_present=True, board_n=0, hero_turn=True))
+        self.assertEqual(tr.merge({"action_strip": (2.0, 0.9)})["action_strip"], (2.0, 0.9))
+
+
+if __name__ == "__main__":
+    unittest.main()
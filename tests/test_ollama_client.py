@@ -0,0 +1,179 @@
+"""
+Tests for the Ollama policy client against a local mock server.
+Covers streamed early termination, incremental JSON scanning, keep-alive reuse
+and hedged requests across two models.
+"""
+
+import json
+import threading
+import time
+import unittest
+import unittest.mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import requests  # noqa: F401
+    from src.policy import ollama_client
+except ImportError:  # dépendances runtime absentes
+    ollama_client = None
+
+
+class _MockOllama(BaseHTTPRequestHandler):
+    """/api/chat: NDJSON streamé, un fragment de contenu toutes les `delay` s."""
+    protocol_version = "HTTP/1.1"
+    fragments = []
+    delay = 0.0
+    bodies = []
+    ports = []
+    sent = 0
+    models = {}   # modèle → (fragments, delay) pour le mode hedge
+    sent_by = {}
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        cls = type(self)
+        cls.bodies.append(body)
+        cls.ports.append(self.client_address[1])
+        fragments, delay = cls.models.get(body.get("model"), (cls.fragments, cls.delay))
+        if not body.get("stream"):
+            content = "".join(fragments)
+            data = json.dumps({"message": {"role": "assistant", "content": content}, "done": True}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for i, frag in enumerate(fragments + [""]):
+                line = json.dumps({"message": {"content": frag}, "done": i == len(fragments)}) + "\n"
+                raw = line.encode()
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(raw), raw))
+                self.wfile.flush()
+                cls.sent += 1
+                cls.sent_by[body.get("model")] = cls.sent_by.get(body.get("model"), 0) + 1
+                time.sleep(delay)
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass  # connexions coupées par le client (arrêt anticipé)
+
+
+META = {"street": 1, "position": "BTN", "spr": 3.0, "hero_cards": ["Ah", "Kh"], "board_cards": []}
+
+
+@unittest.skipIf(ollama_client is None, "requests non installé")
+class TestOllamaClient(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = _QuietServer(("127.0.0.1", 0), _MockOllama)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls._host, cls._stream = ollama_client.OLLAMA, ollama_client.STREAM
+        cls._hedge_cfg = ollama_client.HEDGE_MODEL, ollama_client.HEDGE_MS
+        ollama_client.OLLAMA = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        ollama_client.OLLAMA, ollama_client.STREAM = cls._host, cls._stream
+        ollama_client.HEDGE_MODEL, ollama_client.HEDGE_MS = cls._hedge_cfg
+        ollama_client.close_session()
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        ollama_client.STREAM = True
+        _MockOllama.bodies, _MockOllama.ports, _MockOllama.sent = [], [], 0
+        _MockOllama.delay = 0.0
+        _MockOllama.models, _MockOllama.sent_by = {}, {}
+        ollama_client.HEDGE_MODEL, ollama_client.HEDGE_MS = "", 100.0
+
+    def test_stream_stops_after_complete_action(self):
+        """Le flux est fermé dès que l'objet action est complet, sans attendre la fin."""
+        _MockOllama.fragments = ['{"action": "ra', 'ise", "reason": "a } b"', '}'] + [" ..."] * 40
+        _MockOllama.delay = 0.05
+        t0 = time.perf_counter()
+        out = ollama_client.ask_policy([0.0] * 40, META)
+        elapsed = time.perf_counter() - t0
+        self.assertEqual(out, {"action": "raise", "reason": "a } b"})
+        self.assertLess(elapsed, 1.0)
+        time.sleep(0.2)
+        self.assertLess(_MockOllama.sent, 20)
+
+    def test_request_sets_keep_alive_and_num_predict(self):
+        _MockOllama.fragments = ['{"action": "call"}']
+        ollama_client.ask_policy([0.0] * 40, META)
+        body = _MockOllama.bodies[-1]
+        self.assertTrue(body["stream"])
+        self.assertEqual(body["keep_alive"], ollama_client.KEEP_ALIVE)
+        self.assertEqual(body["options"]["num_predict"], ollama_client.NUM_PREDICT)
+
+    def test_session_reuses_connection(self):
+        """Réponses complètes: la même connexion TCP sert plusieurs décisions."""
+        ollama_client.STREAM = False
+        _MockOllama.fragments = ['{"action": "fold"}']
+        for _ in range(3):
+            self.assertEqual(ollama_client.ask_policy([0.0] * 40, META)["action"], "fold")
+        self.assertEqual(len(set(_MockOllama.ports)), 1)
+
+    def test_unparsable_output_falls_back_to_none(self):
+        _MockOllama.fragments = ["pas de json ici"]
+        self.assertEqual(ollama_client.ask_policy([0.0] * 40, META)["action"], "none")
+
+    def test_scanner_handles_split_strings_and_nesting(self):
+        sc = ollama_client.JsonObjectScanner()
+        got = []
+        for piece in ['xx {"a": "{\\"', '", "b": {"c": 1}}', ' {"d": 2}']:
+            got += sc.feed(piece)
+        self.assertEqual(got, [{"a": '{"', "b": {"c": 1}}, {"d": 2}])
+
+    # ---------- mode hedge ----------
+    def _hedge(self, fast, slow):
+        ollama_client.HEDGE_MODEL = "slow"
+        _MockOllama.models = {"fast": fast, "slow": slow}
+        with unittest.mock.patch.dict("os.environ", {"OLLAMA_MODEL": "fast"}):
+            return ollama_client.ask_policy([0.0] * 40, META)
+
+    def test_hedge_confident_fast_answer_skips_slow_model(self):
+        out = self._hedge((['{"action": "fold", "confidence": 0.9}'], 0.0),
+                          (['{"action": "call"}'], 0.0))
+        self.assertEqual(out["action"], "fold")
+        self.assertEqual([b["model"] for b in _MockOllama.bodies], ["fast"])
+
+    def test_hedge_slow_fast_model_is_cancelled(self):
+        """Le rapide traîne: le lent est lancé, gagne, et le flux du rapide est coupé."""
+        before = ollama_client.hedge_stats()["models"].get("slow", {}).get("wins", 0)
+        out = self._hedge((["  "] * 40 + ['{"action": "fold"}'], 0.05),
+                          (['{"action": "raise", "confidence": 0.8}'], 0.0))
+        self.assertEqual(out["action"], "raise")
+        time.sleep(0.3)
+        self.assertLess(_MockOllama.sent_by.get("fast", 0), 20)
+        self.assertEqual(ollama_client.hedge_stats()["models"]["slow"]["wins"], before + 1)
+
+    def test_hedge_low_confidence_fast_answer_defers_to_slow(self):
+        stats0 = ollama_client.hedge_stats()
+        out = self._hedge((['{"action": "call", "confidence": 0.2}'], 0.0),
+                          (['{"action": "call", "confidence": 0.9}'], 0.0))
+        self.assertEqual(out["confidence"], 0.9)
+        stats = ollama_client.hedge_stats()
+        self.assertEqual(stats["compared"], stats0["compared"] + 1)
+        self.assertEqual(stats["agree"], stats0["agree"] + 1)
+        self.assertIsNotNone(stats["models"]["fast"]["p50_ms"])
+
+
+if __name__ == "__main__":
+    unittest.main()